@@ -0,0 +1,70 @@
+"""
+전종목 시세 로드: long OHLCV CSV 가져오기(ohlcv_import) vs 바이너리 아카이브(price_archive, memmap)
+
+같은 종목 × 봉 데이터를 두 형식으로 써 두고, 시작할 때처럼 처음부터 {code: 시세} 를 만드는 시간과
+아카이브 종목 시세가 원본과 같은지(지표 값 포함) 확인합니다.
+
+실행:
+    python -m benchmarks.bench_archive [--stocks 2500] [--bars 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import ohlcv_import
+import price_archive
+import price_store
+from benchmarks.suite import synthetic_market
+
+
+def timed(fn):
+    started = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - started, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stocks", type=int, default=2500)
+    ap.add_argument("--bars", type=int, default=500)
+    args = ap.parse_args()
+
+    market = synthetic_market(args.stocks, args.bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "prices.csv")
+        archive_path = os.path.join(tmp, "prices.pxa")
+        pd.concat(
+            pd.DataFrame({"code": code, "date": s.dates, "open": s.open, "high": s.close, "low": s.close,
+                          "close": s.close, "volume": s.volume})
+            for code, s in market.items()
+        ).to_csv(csv_path, index=False)
+        price_archive.write_archive(archive_path, market)
+
+        with open(csv_path, "rb") as f:
+            payload = [("prices.csv", f.read())]
+        t_csv, from_csv = timed(lambda: {
+            code: price_store.as_price_data(page).compact()
+            for code, page in ohlcv_import.import_ohlcv(payload).pages.items()
+        })
+        t_open, archive = timed(lambda: price_archive.PriceArchive(archive_path))
+        t_all, from_archive = timed(lambda: dict(archive))
+
+        for code in list(market)[:: max(1, args.stocks // 20)]:
+            a, b = from_csv[code], from_archive[code]
+            assert np.array_equal(a.close, b.close) and np.array_equal(a.volume, b.volume), f"시세 불일치: {code}"
+            assert indicators.source_for(code, a).row() == indicators.source_for(code, b).row(), f"지표 불일치: {code}"
+
+        print(f"stocks: {args.stocks}  bars: {args.bars}")
+        print(f"CSV        : {os.path.getsize(csv_path) / 1e6:7.1f} MB  {t_csv * 1000:9.1f} ms  (파싱 + 종목별 분리)")
+        print(f"archive    : {os.path.getsize(archive_path) / 1e6:7.1f} MB  {t_open * 1000:9.1f} ms  (열기)")
+        print(f"{'':<11}  {'':>10}  {(t_open + t_all) * 1000:9.1f} ms  (열기 + 전 종목 view)")
+        print(f"속도 비   : {t_csv / (t_open + t_all):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+증분 지표 상태(IndicatorState / sync_state): 배치 엔진·기존 calculate_* 와 값이 같은지 + 새 봉 반영 비용
+
+합성 종가 묶음(짧은 이력, NaN, 보합 포함)마다 아래 경로의 row() 가
+compute_batch 와 calculate_rsi / calculate_macd / check_macd_crossover 에 비트 단위로 같은지 확인합니다.
+    from_prices → update() 로 나머지 봉 / to_dict()·from_dict() (JSON 왕복) 후 이어서 계산 /
+    sync_state 에 뒤처진(stale)·최신(matching)·정정된(corrected) 체크포인트
+그다음 마지막 봉 하나를 반영하는 시간을 전체 재계산과 비교합니다.
+
+실행:
+    python -m benchmarks.bench_indicator_state [--cases 300] [--bars 500]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+import indicators
+import screener_core
+from benchmarks.suite import legacy_row, same_row
+from benchmarks.synthetic import indicator_cases, random_walk_ohlcv
+
+
+def trading_dates(n: int) -> list:
+    """price_store.sync_state 와 같은 'YYYY-MM-DD' 문자열"""
+    return np.datetime_as_string(np.datetime64("2020-01-02") + np.arange(n), unit="D").tolist()
+
+
+def round_trip(state: indicators.IndicatorState) -> indicators.IndicatorState:
+    """price_store 에 저장했다 읽은 것과 같게 (JSON 직렬화)"""
+    return indicators.IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+
+def final_row(checkpoint: indicators.IndicatorState, closes, dates) -> dict:
+    """price_store.sync_state 처럼 체크포인트에 마지막 봉을 더한 값"""
+    return checkpoint.copy().update(closes[-1], dates[-1]).row()
+
+
+def state_rows(closes, dates) -> dict:
+    """{경로 이름: row()} — 모두 같은 이력 전체를 반영한 결과"""
+    n = len(closes)
+    half = n // 2
+    rows = {"from_prices": indicators.IndicatorState.from_prices(closes, dates).row()}
+
+    state = indicators.IndicatorState.from_prices(closes[:half], dates[:half])
+    for c, d in zip(closes[half:], dates[half:]):
+        state.update(c, d)
+    rows["update"] = state.row()
+    rows["round_trip"] = round_trip(indicators.IndicatorState.from_prices(closes[:half], dates[:half])).extend(
+        closes[half:], dates[half:]).row()
+
+    if n >= 2:
+        # 뒤처진 / 최신 체크포인트는 다시 계산하지 않고 그 객체를 이어 써야 함 (NaN 종가면 비교가 안 돼 재계산)
+        stale = round_trip(indicators.IndicatorState.from_prices(closes[:max(1, half - 1)], dates[:max(1, half - 1)]))
+        synced = indicators.sync_state(stale, dates, closes)
+        assert synced is stale or stale.last_close != stale.last_close, "stale 체크포인트를 이어 쓰지 않음"
+        rows["sync_stale"] = final_row(synced, closes, dates)
+        matching = round_trip(indicators.IndicatorState.from_prices(closes[:-1], dates[:-1]))
+        synced = indicators.sync_state(matching, dates, closes)
+        assert synced is matching or matching.last_close != matching.last_close, "최신 체크포인트를 이어 쓰지 않음"
+        rows["sync_matching"] = final_row(synced, closes, dates)
+        # 체크포인트 이후 이력이 정정됨 (체크포인트 종가가 이력과 다름) → 처음부터 다시 계산해야 함
+        wrong = list(closes[:-1])
+        wrong[-1] = (wrong[-1] if wrong[-1] == wrong[-1] else 0.0) + 1.0
+        corrected = round_trip(indicators.IndicatorState.from_prices(wrong, dates[:-1]))
+        rows["sync_corrected"] = final_row(indicators.sync_state(corrected, dates, closes), closes, dates)
+    return rows
+
+
+def check_parity(cases: dict) -> int:
+    screener = screener_core.StockScreener()
+    items = list(cases.items())
+    batch = indicators.compute_for_prices([closes for _, closes in items])
+    checked = 0
+    for i, (code, closes) in enumerate(items):
+        closes = closes.tolist()
+        dates = trading_dates(len(closes))
+        expected = legacy_row(screener, closes)
+        assert same_row(batch.row(i), expected), f"compute_batch 불일치: {code}"
+        for path, row in state_rows(closes, dates).items():
+            assert same_row(row, expected), f"{path} 불일치: {code} ({len(closes)} bars) {row} != {expected}"
+            checked += 1
+    return checked
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cases", type=int, default=300)
+    ap.add_argument("--bars", type=int, default=500)
+    args = ap.parse_args()
+
+    checked = check_parity(indicator_cases(args.cases))
+    print(f"일치 확인: {args.cases} series, {checked} 경로 = compute_batch = calculate_*")
+
+    closes = random_walk_ohlcv(args.bars, seed=1)["close"].tolist()
+    dates = trading_dates(args.bars)
+    checkpoint = indicators.IndicatorState.from_prices(closes[:-1], dates[:-1])
+    t_update = timed(lambda: checkpoint.copy().update(closes[-1], dates[-1]).row(), 200)
+    t_state = timed(lambda: indicators.IndicatorState.from_prices(closes).row(), 5)
+    t_batch = timed(lambda: indicators.compute_for_prices([closes]).row(0), 5)
+    print(f"bars: {args.bars}")
+    print(f"체크포인트 + 새 봉 1개 : {t_update * 1e6:9.1f} us")
+    print(f"상태 처음부터          : {t_state * 1e6:9.1f} us")
+    print(f"배치 엔진 재계산       : {t_batch * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+sise_day.naver 파싱 벤치마크: 전용 파서 vs 기존 pd.read_html 경로
+
+실행:
+    python -m benchmarks.bench_naver_parser [--pages 200]
+"""
+import argparse
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+import naver_parser
+from benchmarks.synthetic import random_walk_ohlcv, sise_day_html
+
+
+def legacy_parse(html: str):
+    """기존 get_stock_data_live 의 페이지 처리와 같은 작업"""
+    df = pd.read_html(StringIO(html))[0].dropna()
+    return df["종가"].astype(float).tolist(), df["거래량"].astype(float).tolist(), df["시가"].astype(float).tolist()
+
+
+def fast_parse(html: str):
+    page = naver_parser.parse_sise_day(html)
+    return page.close.tolist(), page.volume.astype(float).tolist(), page.open.tolist()
+
+
+def timeit(fn, pages):
+    started = time.perf_counter()
+    out = [fn(h) for h in pages]
+    return time.perf_counter() - started, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=200)
+    args = ap.parse_args()
+
+    pages = [sise_day_html(random_walk_ohlcv(10, seed=i)) for i in range(args.pages)]
+
+    t_legacy, out_legacy = timeit(legacy_parse, pages)
+    t_fast, out_fast = timeit(fast_parse, pages)
+    assert out_legacy == out_fast, "전용 파서 결과가 read_html 경로와 다릅니다"
+
+    # 구조가 바뀐 페이지 → read_html 대체 경로가 같은 값을 내는지
+    changed = pages[0].replace('class="tah p10 gray03"', 'class="date"')
+    assert naver_parser.parse_sise_day_fast(changed) is None
+    fallback = naver_parser.parse_sise_day(changed)
+    assert np.array_equal(fallback.close, naver_parser.parse_sise_day(pages[0]).close)
+
+    print(f"pages: {args.pages}")
+    print(f"read_html : {t_legacy * 1000 / args.pages:8.3f} ms/page")
+    print(f"전용 파서 : {t_fast * 1000 / args.pages:8.3f} ms/page")
+    print(f"속도 향상 : {t_legacy / t_fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
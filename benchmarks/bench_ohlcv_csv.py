@@ -0,0 +1,76 @@
+"""
+대용량 OHLCV CSV 파싱: 기존 parse_ohlcv_csv(전체 컬럼 read_csv + 리스트 변환) vs
+ohlcv_import.read_ohlcv_tail(필요 컬럼·고정 dtype·청크·최근 봉만 유지)
+
+실행:
+    python -m benchmarks.bench_ohlcv_csv [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import ohlcv_import
+from benchmarks.synthetic import random_walk_ohlcv
+
+
+def legacy_parse(path: str) -> dict:
+    """기존 parse_ohlcv_csv 의 읽기·변환 부분"""
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"]).sort_values("date")
+    closes = df["close"].astype(float).tolist()
+    vols = df["volume"].astype(float).tolist()
+    openp = float(df["open"].astype(float).iloc[-1])
+    return {"close_prices": closes, "volumes": vols, "open": openp}
+
+
+def streaming_parse(path: str) -> dict:
+    df, _ = ohlcv_import.read_ohlcv_tail(path)
+    return {"close_prices": df["close"].to_numpy(), "volumes": df["volume"].to_numpy(), "open": df["open"].iloc[-1]}
+
+
+def measure(fn, path):
+    tracemalloc.start()
+    started = time.perf_counter()
+    out = fn(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    df = random_walk_ohlcv(args.rows, seed=1, start="2020-01-02 09:00", freq="min", vol=0.001)  # 분봉 수년치
+    df["change"] = df["close"].diff().fillna(0)  # 쓰지 않는 컬럼 (전일비 등)
+    df["amount"] = df["close"] * df["volume"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ohlcv.csv")
+        df.to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 1e6
+
+        t_old, m_old, old = measure(legacy_parse, path)
+        t_new, m_new, new = measure(streaming_parse, path)
+
+    a = indicators.compute_for_prices([old["close_prices"]]).row(0)
+    b = indicators.compute_for_prices([new["close_prices"]]).row(0)
+    assert a["cross"] == b["cross"] and old["open"] == new["open"]
+    diff = max(abs(a[k] - b[k]) for k in ("rsi", "macd", "signal", "hist"))
+
+    print(f"rows: {args.rows:,}  file: {size_mb:.1f} MB  kept: {len(new['close_prices'])} bars")
+    print(f"기존  : {t_old:7.2f} s  peak {m_old:8.1f} MB")
+    print(f"스트림: {t_new:7.2f} s  peak {m_new:8.1f} MB")
+    print(f"지표 최대 차이(전체 이력 대비): {diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
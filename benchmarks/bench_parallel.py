@@ -0,0 +1,54 @@
+"""
+업로드/스냅샷 시세 평가: 단일 프로세스 vs 프로세스 풀(parallel_eval) 처리량
+
+프로세스 수를 늘려 가며 같은 종목을 평가하고, 결과가 단일 프로세스와 같은지 확인합니다.
+프로세스 시작 비용까지 포함한 시간이라 종목 수가 적으면 병렬이 더 느릴 수 있음.
+
+실행:
+    python -m benchmarks.bench_parallel [--stocks 5000] [--bars 500] [--processes 1 2 4 8 16]
+"""
+import argparse
+import time
+
+import indicators
+import parallel_eval
+import screener_core
+import screening
+from benchmarks.suite import FILTERS, synthetic_market
+
+
+def run(stocks, market, evaluate, processes) -> tuple[float, list]:
+    indicators.clear_bundle_cache()
+    started = time.perf_counter()
+    events = screening.iter_screening(stocks, fetch=lambda code: None, evaluate=evaluate, preloaded=market,
+                                      processes=processes)
+    result = sorted((e.code, e.status, str(e.row)) for e in events)
+    return time.perf_counter() - started, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stocks", type=int, default=5000)
+    ap.add_argument("--bars", type=int, default=500)
+    ap.add_argument("--processes", type=int, nargs="+", default=None)
+    args = ap.parse_args()
+
+    cores = parallel_eval.default_processes()
+    counts = args.processes or sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    market = synthetic_market(args.stocks, args.bars)
+    stocks = [(code, code, "기타") for code in market]
+    evaluate = screener_core.ConditionEvaluator(FILTERS)
+
+    base, expected = run(stocks, market, evaluate, None)
+    print(f"stocks: {args.stocks}  bars: {args.bars}  cores: {cores}  "
+          f"chunk(auto): {parallel_eval.auto_chunk_size(args.stocks, cores)}")
+    print(f"{'processes':>10} {'seconds':>9} {'stocks/s':>10} {'speedup':>8}")
+    print(f"{'serial':>10} {base:9.2f} {args.stocks / base:10.0f} {1.0:8.2f}")
+    for n in counts:
+        elapsed, result = run(stocks, market, evaluate, n)
+        assert result == expected, f"결과 불일치: processes={n}"
+        print(f"{n:>10} {elapsed:9.2f} {args.stocks / elapsed:10.0f} {base / elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+전종목 시세 보관 메모리: 기존 시세 dict(파이썬 float 리스트) vs PriceSeries(NumPy 배열)
+
+실행:
+    python -m benchmarks.bench_price_series [--stocks 2500] [--bars 250]
+"""
+import argparse
+import tracemalloc
+
+import indicators
+from benchmarks.synthetic import random_walk_ohlcv
+from price_series import PriceSeries
+
+
+def as_legacy_dict(df) -> dict:
+    """기존 parse_ohlcv_csv / get_stock_data_live 반환 형태"""
+    closes = df["close"].astype(float).tolist()
+    vols = df["volume"].astype(float).tolist()
+    return {
+        "current": closes[-1],
+        "open": float(df["open"].iloc[-1]),
+        "prev_close": closes[-2],
+        "volume": vols[-1],
+        "close_prices": closes,
+        "volumes": vols,
+    }
+
+
+def as_series(df) -> PriceSeries:
+    return PriceSeries(df["close"], df["volume"], open=df["open"], high=df["high"], low=df["low"],
+                       dates=df["date"]).compact()
+
+
+def measure(frames, convert) -> tuple[float, dict]:
+    tracemalloc.start()
+    held = {i: convert(df) for i, df in enumerate(frames)}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1e6, held
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stocks", type=int, default=2500)
+    ap.add_argument("--bars", type=int, default=250)
+    args = ap.parse_args()
+
+    frames = [random_walk_ohlcv(args.bars, seed=i) for i in range(args.stocks)]
+
+    mb_dict, legacy = measure(frames, as_legacy_dict)
+    mb_series, series = measure(frames, as_series)
+
+    # 같은 지표 값이 나오는지 (일부 종목)
+    for i in range(0, args.stocks, max(1, args.stocks // 20)):
+        a = indicators.source_for(str(i), legacy[i]).row()
+        b = indicators.source_for(str(i), series[i]).row()
+        assert a == b, f"지표 불일치: {i}"
+
+    print(f"stocks: {args.stocks}  bars: {args.bars}")
+    print(f"시세 dict    : {mb_dict:8.1f} MB  (종가·거래량만)")
+    print(f"PriceSeries  : {mb_series:8.1f} MB  (OHLCV + 날짜)")
+    print(f"비율         : {mb_series / mb_dict:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+종목 검색 지연시간 벤치마크: 검색 인덱스 vs 기존 전체 스캔(str.contains)
+
+실행:
+    python -m benchmarks.bench_search [--stocks 2500] [--repeat 200]
+"""
+import argparse
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+import stock_search
+import stock_universe
+from benchmarks.synthetic import stock_universe_csv
+
+QUERIES = ["삼성전자", "삼전", "ㅅㅅㅈㅈ", "네이버", "NAVER", "현대로봇", "한화에너지", "삼성전쟈", "바이오", "SK하이닉스"]
+
+
+def legacy_search(df: pd.DataFrame, query: str, limit: int = 20) -> pd.DataFrame:
+    """기존 search_candidates (정확 일치 → 부분 문자열 스캔)"""
+    q2 = stock_universe.search_key(query)
+    keys = df[stock_universe.SEARCH_KEY]
+    exact = df[keys == q2]
+    if not exact.empty:
+        return exact.head(limit)
+    return df[keys.str.contains(q2, na=False, regex=False)].head(limit)
+
+
+def measure(fn, query, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn(query)
+        times.append(time.perf_counter() - started)
+    return np.array(times) * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stocks", type=int, default=2500)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    embedded = pd.read_csv(StringIO(stock_universe.EMBEDDED_MINI_CSV), dtype={"종목코드": str})
+    raw = pd.concat([embedded, stock_universe_csv(args.stocks)], ignore_index=True)
+    universe = stock_universe.build_universe(raw)
+
+    started = time.perf_counter()
+    index = stock_search.StockSearchIndex(universe)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"stocks: {len(universe)}  index build: {build_ms:.1f} ms")
+    print(f"{'query':<12} {'legacy p50':>11} {'index p50':>10} {'index p99':>10}  hits  top")
+    worst = 0.0
+    for q in QUERIES:
+        t_old, _ = measure(lambda x: legacy_search(universe, x), q, args.repeat)
+        t_new, hits = measure(index.search, q, args.repeat)
+        worst = max(worst, np.percentile(t_new, 99))
+        top = universe["회사명"].iloc[hits[0][0]] if hits else "-"
+        print(f"{q:<12} {np.median(t_old):9.3f}ms {np.median(t_new):8.3f}ms {np.percentile(t_new, 99):8.3f}ms"
+              f"  {len(hits):>4}  {top}")
+    print(f"index worst p99: {worst:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+네트워크 경로 부하 테스트 (로컬 대역 서버 사용, 인터넷 불필요)
+
+benchmarks/standin_server.py 를 같은 프로세스에서 띄우고 NAVER_FINANCE_URL / KRX_BASE_URL /
+PRICE_STORE_PATH(임시 파일)를 그쪽으로 돌린 뒤 실제 코드 경로를 그대로 실행합니다.
+
+시나리오
+- screen: get_stock_data_live → screening.iter_screening 전체 스크리닝 (종목 수 × 패스)
+    cold        저장소 비어 있음 → 종목마다 LIVE_PAGES 페이지
+    incremental 저장소 이력 있음(갱신 시각만 오래됨) → 종목마다 1페이지
+    fresh       방금 갱신 → 네트워크 없음
+- stocklist: update_stock_list 의 KRX OTP / KRX JSON / 네이버 시가총액 방법
+- snapshot: krx_snapshot.load_market_histories (거래일 수만큼 요청)
+
+클라이언트 쪽(http_client on_request 훅)에서 시도 수 / 재시도 / 상태 코드 / 지연 백분위를 모으고
+서버 쪽 카운터(주입된 오류, 429)와 같이 출력합니다. 장애 주입은 시드 고정이라 실행마다 같은 패턴.
+서버가 같은 프로세스라 클라이언트 지연에는 파싱·저장 CPU(GIL 대기)도 섞여 있음 → 처리량 비교용으로 볼 것
+
+실행:
+    python -m benchmarks.load_test [--scenario screen stocklist snapshot] [--symbols 200] [--workers 8]
+                                   [--latency 0.02] [--jitter 0.01] [--error-rate 0.05] [--throttle 0]
+                                   [--out load_results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.standin_server import add_fault_args, server_from_args
+
+FILTERS = ["RSI 과매도 (30 이하)", "MACD 0선 돌파"]
+SCENARIOS = ["screen", "stocklist", "snapshot"]
+
+
+class RequestLog:
+    """http_client.HttpClient.on_request 콜백 — 시도별 상태/지연 기록"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latencies = []
+            self.statuses = Counter()
+            self.retries = 0
+
+    def __call__(self, method, url, status, latency, attempt):
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[str(status)] += 1
+            if attempt:
+                self.retries += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            lat = np.array(self.latencies) * 1000
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (0.0, 0.0, 0.0)
+            return {
+                "attempts": len(lat),
+                "retries": self.retries,
+                "statuses": dict(self.statuses),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+            }
+
+
+def run_screen(server, log, symbols: int, workers: int) -> list:
+    import price_store
+    import screener_core
+    import screening
+
+    screener = screener_core.StockScreener()
+    stocks = server.market.stocks()[:symbols]
+    store = price_store.get_store()
+
+    def evaluate(code, name, sector, data, ind):
+        return screener.check_conditions(code, name, sector, data, FILTERS, {}, ind=ind)
+
+    def age_store():
+        conn = store._conn()
+        with conn:
+            conn.execute("UPDATE meta SET updated_at = 0")
+
+    results = []
+    for label, prepare in (("cold", None), ("incremental", age_store), ("fresh", None)):
+        if prepare:
+            prepare()
+        screener_core.clear_live_cache()
+        log.reset()
+        server.reset()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            events = list(screening.iter_screening(
+                stocks, fetch=screener.get_stock_data_live, evaluate=evaluate, max_workers=workers,
+            ))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "scenario": f"screen/{label}",
+            "items": len(stocks),
+            "seconds": elapsed,
+            "per_sec": len(stocks) / elapsed if elapsed else float("inf"),
+            "events": dict(Counter(e.status for e in events)),
+            "client": log.summary(),
+            "server": server.stats(),
+        })
+    return results
+
+
+def run_stocklist(server, log) -> list:
+    import update_stock_list
+
+    results = []
+    for name in ("method1_krx_otp", "method2_krx_json", "method5_naver_finance"):
+        log.reset()
+        server.reset()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = getattr(update_stock_list, name)()
+        elapsed = time.perf_counter() - started
+        rows = 0 if df is None else len(df)
+        results.append({
+            "scenario": f"stocklist/{name}",
+            "items": rows,
+            "seconds": elapsed,
+            "per_sec": rows / elapsed if elapsed else float("inf"),
+            "events": {"ok": int(df is not None)},
+            "client": log.summary(),
+            "server": server.stats(),
+        })
+    return results
+
+
+def run_snapshot(server, log, days: int, workers: int) -> list:
+    import krx_snapshot
+
+    log.reset()
+    server.reset()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        histories = krx_snapshot.load_market_histories(days=days, end_date=server.market.dates[-1],
+                                                       max_workers=workers)
+    elapsed = time.perf_counter() - started
+    return [{
+        "scenario": "snapshot",
+        "items": len(histories),
+        "seconds": elapsed,
+        "per_sec": len(histories) / elapsed if elapsed else float("inf"),
+        "events": {"symbols": len(histories)},
+        "client": log.summary(),
+        "server": server.stats(),
+    }]
+
+
+def print_row(r: dict):
+    c, s = r["client"], r["server"]
+    injected = sum(v for k, v in s.items() if k in ("status:429", "status:500", "status:503"))
+    print(
+        f"{r['scenario']:<32} {r['items']:>6} {r['seconds']:8.2f}s {r['per_sec']:9.1f}/s  "
+        f"req {c['attempts']:>5} retry {c['retries']:>4} injected {injected:>4}  "
+        f"p50 {c['p50_ms']:6.1f} p95 {c['p95_ms']:6.1f} p99 {c['p99_ms']:6.1f} ms  {r['events']}"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--days", type=int, default=60, help="snapshot 시나리오 조회 일수")
+    ap.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    add_fault_args(ap)
+    ap.set_defaults(symbols=200, latency=0.02, jitter=0.01, error_rate=0.05)
+    args = ap.parse_args()
+
+    server = server_from_args(args)
+    base_url = server.start()
+    tmp = tempfile.TemporaryDirectory()
+    # 앱/스크립트 모듈은 import 시점에 환경변수를 읽으므로 import 전에 지정
+    os.environ["NAVER_FINANCE_URL"] = base_url
+    os.environ["KRX_BASE_URL"] = base_url
+    os.environ["PRICE_STORE_PATH"] = os.path.join(tmp.name, "price_store.sqlite")
+
+    import http_client
+
+    log = RequestLog()
+    http_client.get_client().on_request = log
+    print(f"[INFO] stand-in {base_url} — latency {args.latency}s ± {args.jitter}s, "
+          f"error rate {args.error_rate}, throttle {args.throttle or '-'} rps, seed {args.seed}")
+
+    results = []
+    try:
+        for scenario in args.scenario:
+            if scenario == "screen":
+                rows = run_screen(server, log, args.symbols, args.workers)
+            elif scenario == "stocklist":
+                rows = run_stocklist(server, log)
+            else:
+                rows = run_snapshot(server, log, args.days, args.workers)
+            for r in rows:
+                print_row(r)
+            results += rows
+    finally:
+        server.stop()
+        tmp.cleanup()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+네이버 금융 / KRX 로컬 대역(stand-in) 서버 — 네트워크 경로 부하 테스트용
+
+앱과 update_stock_list.py 가 호출하는 엔드포인트를 같은 경로·같은 응답 형식으로 흉내냅니다.
+    GET  /item/sise_day.naver?code=&page=                 일별 시세 (10행/페이지, EUC-KR HTML)
+    GET  /sise/sise_market_sum.naver?sosok=&page=         시가총액 목록 (50종목/페이지)
+    GET  /contents/MDC/MDI/mdiLoader/index.cmd            KRX 메인 (쿠키)
+    POST /comm/fileDn/GenerateOTP/generate.cmd            KRX OTP
+    POST /comm/fileDn/download_csv/download.cmd           KRX 전종목 CSV (EUC-KR)
+    POST /comm/bldAttendant/getJsonData.cmd               KRX JSON (MDCSTAT01901 종목 목록 / MDCSTAT01501 일별 시세)
+    GET  /__stats  /  POST /__reset                       서버 쪽 카운터
+
+응답은 fixtures 디렉터리에 녹화된 파일이 있으면 그대로 재생하고, 없으면 합성 시장(시드 고정)에서 만듭니다.
+녹화: 네트워크가 되는 곳에서 record 로 실제 응답을 받아 저장 → 네트워크 없는 곳에서 재생
+    fixtures/naver/sise_day/<code>_<page>.html
+    fixtures/naver/sise_market_sum/<sosok>_<page>.html
+    fixtures/krx/download.csv
+    fixtures/krx/<bld 마지막 부분>_<trdDd 또는 ALL>.json
+
+장애 주입 (요청마다, 시드 고정 난수)
+- latency / jitter: 응답 전 지연(초) = latency + U(0, jitter)
+- error_rate: 이 비율로 500/503 응답
+- throttle_rps: 초당 허용 요청 수(토큰 버킷). 넘으면 429 + Retry-After
+
+실행:
+    python -m benchmarks.standin_server serve [--port 8765] [--fixtures DIR] [--latency 0.02] [--error-rate 0.05] [--throttle 50]
+    python -m benchmarks.standin_server record --out DIR [--codes 005930 000660] [--pages 4] [--dates 20240102 ...]
+    → 앱/스크립트 쪽은 NAVER_FINANCE_URL, KRX_BASE_URL 을 http://127.0.0.1:<port> 로 지정
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import sise_day_html, stock_universe_csv
+
+SISE_DAY_ROWS = 10
+MARKET_SUM_ROWS = 50
+LISTING_BLD = "MDCSTAT01901"
+DAILY_PRICE_BLD = "MDCSTAT01501"
+
+NAVER_CHARSET = "euc-kr"
+KRX_CHARSET = "euc-kr"
+
+
+class SyntheticMarket:
+    """
+    시드 고정 합성 시장: 종목 DB + 종목 × 영업일 OHLCV 행렬
+    마지막 봉은 end(기본 오늘) 이전 마지막 영업일 → 앱/krx_snapshot 기본 날짜 범위와 맞음
+    """
+
+    def __init__(self, symbols: int = 500, bars: int = 400, seed: int = 0, end=None):
+        db = stock_universe_csv(symbols, seed=seed)
+        self.codes = db["종목코드"].tolist()
+        self.names = db["회사명"].tolist()
+        self.sectors = db["섹터"].tolist()
+        self.markets = ["KOSPI" if i < symbols // 2 else "KOSDAQ" for i in range(symbols)]
+        self.row_of = {c: i for i, c in enumerate(self.codes)}
+
+        end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.dates = pd.bdate_range(end=end, periods=bars)
+        self.date_index = {d.strftime("%Y%m%d"): j for j, d in enumerate(self.dates)}
+
+        rng = np.random.default_rng(seed)
+        close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, bars)), axis=1)))
+        self.close = close
+        self.open = np.round(close * (1 + rng.normal(0, 0.01, (symbols, bars))))
+        self.high = np.maximum(self.open, close) + np.round(rng.uniform(0, 200, (symbols, bars)))
+        self.low = np.minimum(self.open, close) - np.round(rng.uniform(0, 200, (symbols, bars)))
+        self.volume = rng.integers(10_000, 5_000_000, (symbols, bars))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def stocks(self) -> list:
+        """[(종목코드, 종목명, 섹터), ...] — 스크리닝 입력 형식"""
+        return list(zip(self.codes, self.names, self.sectors))
+
+    def market_codes(self, sosok: int) -> list:
+        """sosok 0 = 코스피(앞 절반), 1 = 코스닥(뒤 절반)"""
+        want = "KOSPI" if sosok == 0 else "KOSDAQ"
+        return [i for i, m in enumerate(self.markets) if m == want]
+
+    # ---- 응답 본문 (같은 요청은 같은 내용 → 렌더링 결과 캐시) ----
+    @functools.lru_cache(maxsize=8192)
+    def sise_day(self, code: str, page: int) -> str:
+        """최신순 page 번째 10행 (이력을 넘어가면 행 없는 표)"""
+        i = self.row_of.get(code)
+        end = len(self.dates) - (page - 1) * SISE_DAY_ROWS
+        if i is None or end <= 0:
+            return sise_day_html(pd.DataFrame(columns=["date", "open", "high", "low", "close", "volume"]))
+        sl = slice(max(0, end - SISE_DAY_ROWS), end)
+        df = pd.DataFrame({
+            "date": self.dates[sl], "open": self.open[i, sl], "high": self.high[i, sl],
+            "low": self.low[i, sl], "close": self.close[i, sl], "volume": self.volume[i, sl],
+        })
+        return sise_day_html(df)
+
+    @functools.lru_cache(maxsize=256)
+    def market_sum(self, sosok: int, page: int) -> str:
+        rows = self.market_codes(sosok)[(page - 1) * MARKET_SUM_ROWS:page * MARKET_SUM_ROWS]
+        links = "\n".join(
+            f'<tr><td class="no">{n}</td><td><a href="/item/main.naver?code={self.codes[i]}" class="tltle">'
+            f'{self.names[i]}</a></td><td class="number">{self.close[i, -1]:,.0f}</td></tr>'
+            for n, i in enumerate(rows, start=(page - 1) * MARKET_SUM_ROWS + 1)
+        )
+        return (
+            '<html lang="ko"><head><meta charset="euc-kr"><title>시가총액 : 네이버 증권</title></head><body>'
+            f'<table class="type_2">\n<tr><th>N</th><th>종목명</th><th>현재가</th></tr>\n{links}\n</table>'
+            '</body></html>'
+        )
+
+    def listing_rows(self) -> list:
+        return [
+            {"ISU_SRT_CD": c, "ISU_ABBRV": n, "MKT_NM": m, "SECT_TP_NM": s}
+            for c, n, m, s in zip(self.codes, self.names, self.markets, self.sectors)
+        ]
+
+    def listing_csv(self) -> bytes:
+        df = pd.DataFrame(self.listing_rows()).rename(columns={
+            "ISU_SRT_CD": "단축코드", "ISU_ABBRV": "한글 종목약명", "MKT_NM": "시장구분", "SECT_TP_NM": "업종명",
+        })
+        return df.to_csv(index=False).encode(KRX_CHARSET)
+
+    def daily_rows(self, trade_date: str) -> list:
+        """trade_date 전종목 시세 (합성 영업일이 아니면 빈 목록 = 휴장일)"""
+        j = self.date_index.get(trade_date)
+        if j is None:
+            return []
+        return [
+            {
+                "ISU_SRT_CD": c, "ISU_ABBRV": n,
+                "TDD_CLSPRC": f"{self.close[i, j]:,.0f}", "TDD_OPNPRC": f"{self.open[i, j]:,.0f}",
+                "TDD_HGPRC": f"{self.high[i, j]:,.0f}", "TDD_LWPRC": f"{self.low[i, j]:,.0f}",
+                "ACC_TRDVOL": f"{self.volume[i, j]:,}",
+            }
+            for i, (c, n) in enumerate(zip(self.codes, self.names))
+        ]
+
+
+class Faults:
+    """요청마다 지연 / 오류 / 429 를 결정 (스레드 안전, 시드 고정)"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rps: float = 0.0, retry_after: int = 1, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rps = throttle_rps
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = throttle_rps
+        self._refilled = time.monotonic()
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.throttle_rps, self._tokens + (now - self._refilled) * self.throttle_rps)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def decide(self) -> tuple[float, int | None]:
+        """(지연 초, 강제 상태 코드 또는 None)"""
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.throttle_rps and not self._take_token():
+                return 0.0, 429
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return delay, self._rng.choice((500, 503))
+        return delay, None
+
+
+class StandInServer:
+    """
+    합성 시장 + 녹화 응답 + 장애 주입을 묶은 스레드 HTTP 서버
+    start() → base_url ("http://127.0.0.1:<port>"), stop() 으로 종료
+    """
+
+    def __init__(self, market: SyntheticMarket | None = None, fixtures_dir: str | None = None,
+                 faults: Faults | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.market = market or SyntheticMarket()
+        self.fixtures_dir = fixtures_dir
+        self.faults = faults or Faults()
+        self.counters = Counter()
+        self._counter_lock = threading.Lock()
+        self._otps = {}
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def count(self, key: str, n: int = 1):
+        with self._counter_lock:
+            self.counters[key] += n
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            return dict(self.counters)
+
+    def reset(self):
+        with self._counter_lock:
+            self.counters.clear()
+
+    def fixture(self, *parts) -> bytes | None:
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, *parts)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    # ---- 라우팅: (상태, content-type, 본문, 추가 헤더) ----
+    def route(self, method: str, path: str, query: dict, form: dict):
+        m = self.market
+        if method == "GET" and path == "/item/sise_day.naver":
+            code, page = query.get("code", ""), int(query.get("page", 1) or 1)
+            body = self.fixture("naver", "sise_day", f"{code}_{page}.html")
+            if body is None:
+                body = m.sise_day(code, page).encode(NAVER_CHARSET)
+            return 200, f"text/html;charset={NAVER_CHARSET}", body, {}
+
+        if method == "GET" and path == "/sise/sise_market_sum.naver":
+            sosok, page = int(query.get("sosok", 0) or 0), int(query.get("page", 1) or 1)
+            body = self.fixture("naver", "sise_market_sum", f"{sosok}_{page}.html")
+            if body is None:
+                body = m.market_sum(sosok, page).encode(NAVER_CHARSET)
+            return 200, f"text/html;charset={NAVER_CHARSET}", body, {}
+
+        if method == "GET" and path == "/contents/MDC/MDI/mdiLoader/index.cmd":
+            cookie = {"Set-Cookie": f"JSESSIONID={secrets.token_hex(16)}; Path=/"}
+            return 200, "text/html;charset=utf-8", b"<html><body>KRX Data Marketplace</body></html>", cookie
+
+        if method == "POST" and path == "/comm/fileDn/GenerateOTP/generate.cmd":
+            otp = secrets.token_urlsafe(48)
+            self._otps[otp] = form.get("url", "")
+            return 200, "text/plain;charset=utf-8", otp.encode(), {}
+
+        if method == "POST" and path == "/comm/fileDn/download_csv/download.cmd":
+            if self._otps.pop(form.get("code", ""), None) is None:
+                return 200, "text/plain;charset=utf-8", b"LOGOUT", {}
+            body = self.fixture("krx", "download.csv")
+            if body is None:
+                body = m.listing_csv()
+            return 200, f"text/csv;charset={KRX_CHARSET}", body, {}
+
+        if method == "POST" and path == "/comm/bldAttendant/getJsonData.cmd":
+            bld = form.get("bld", "").rsplit("/", 1)[-1]
+            trade_date = form.get("trdDd", "ALL")
+            body = self.fixture("krx", f"{bld}_{trade_date}.json")
+            if body is None:
+                if bld == LISTING_BLD:
+                    rows = m.listing_rows()
+                elif bld == DAILY_PRICE_BLD:
+                    rows = m.daily_rows(trade_date)
+                else:
+                    return 404, "text/plain", b"unknown bld", {}
+                body = json.dumps({"OutBlock_1": rows}, ensure_ascii=False).encode()
+            return 200, "application/json;charset=utf-8", body, {}
+
+        if method == "GET" and path == "/__stats":
+            return 200, "application/json", json.dumps(self.stats()).encode(), {}
+
+        if method == "POST" and path == "/__reset":
+            self.reset()
+            return 200, "application/json", b"{}", {}
+
+        return 404, "text/plain", b"not found", {}
+
+
+def _make_handler(server: StandInServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (http_client 커넥션 풀 재사용)
+
+        def log_message(self, *args):
+            pass
+
+        def _handle(self, method):
+            parsed = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(parsed.query))
+            form = {}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                form = dict(urllib.parse.parse_qsl(self.rfile.read(length).decode("utf-8", "replace")))
+
+            internal = parsed.path.startswith("/__")
+            if not internal:
+                server.count("requests")
+                server.count(f"path:{parsed.path}")
+                delay, forced = server.faults.decide()
+                if delay:
+                    time.sleep(delay)
+                if forced is not None:
+                    server.count(f"status:{forced}")
+                    headers = {"Retry-After": str(server.faults.retry_after)} if forced == 429 else {}
+                    return self._send(forced, "text/plain", b"injected", headers)
+
+            try:
+                status, ctype, body, headers = server.route(method, parsed.path, query, form)
+            except Exception as e:
+                status, ctype, body, headers = 500, "text/plain", str(e).encode(), {}
+            if not internal:
+                server.count(f"status:{status}")
+            self._send(status, ctype, body, headers)
+
+        def _send(self, status, ctype, body, headers):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+    return Handler
+
+
+# =============================
+# 녹화 (네트워크 필요)
+# =============================
+def record(out_dir: str, codes, pages: int = 4, market_pages: int = 2, dates=()):
+    """실제 네이버/KRX 응답을 fixtures 구조로 저장 (원본 바이트 그대로)"""
+    import http_client  # 녹화할 때만 필요
+
+    client = http_client.get_client()
+    naver = "https://finance.naver.com"
+    krx = "http://data.krx.co.kr"
+    headers = {"Referer": "https://finance.naver.com/"}
+    krx_headers = {
+        "Referer": f"{krx}/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201",
+        "X-Requested-With": "XMLHttpRequest",
+    }
+
+    def save(content, *parts):
+        path = os.path.join(out_dir, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        print(f"[INFO] recorded {path} ({len(content):,} bytes)")
+
+    for code in codes:
+        for page in range(1, pages + 1):
+            r = client.get(f"{naver}/item/sise_day.naver", params={"code": code, "page": page}, headers=headers)
+            save(r.content, "naver", "sise_day", f"{code}_{page}.html")
+    for sosok in (0, 1):
+        for page in range(1, market_pages + 1):
+            r = client.get(f"{naver}/sise/sise_market_sum.naver", params={"sosok": sosok, "page": page}, headers=headers)
+            save(r.content, "naver", "sise_market_sum", f"{sosok}_{page}.html")
+
+    client.get(f"{krx}/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201", headers=krx_headers)
+    listing = {"locale": "ko_KR", "mktId": "ALL", "share": "1", "csvxls_isNo": "false"}
+    otp = client.post(f"{krx}/comm/fileDn/GenerateOTP/generate.cmd", headers=krx_headers,
+                      data={**listing, "name": "fileDown", "url": f"dbms/MDC/STAT/standard/{LISTING_BLD}"}).text.strip()
+    r = client.post(f"{krx}/comm/fileDn/download_csv/download.cmd", data={"code": otp}, headers=krx_headers)
+    save(r.content, "krx", "download.csv")
+    r = client.post(f"{krx}/comm/bldAttendant/getJsonData.cmd", headers=krx_headers,
+                    data={**listing, "bld": f"dbms/MDC/STAT/standard/{LISTING_BLD}"})
+    save(r.content, "krx", f"{LISTING_BLD}_ALL.json")
+    for d in dates:
+        r = client.post(f"{krx}/comm/bldAttendant/getJsonData.cmd", headers=krx_headers,
+                        data={**listing, "bld": f"dbms/MDC/STAT/standard/{DAILY_PRICE_BLD}", "trdDd": d, "money": "1"})
+        save(r.content, "krx", f"{DAILY_PRICE_BLD}_{d}.json")
+
+
+def add_fault_args(ap: argparse.ArgumentParser):
+    ap.add_argument("--symbols", type=int, default=500, help="합성 시장 종목 수")
+    ap.add_argument("--bars", type=int, default=400, help="합성 시장 영업일 수")
+    ap.add_argument("--fixtures", default=None, help="녹화 응답 디렉터리 (있는 파일은 그대로 재생)")
+    ap.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="추가 지연 0~jitter 초 (균등분포)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="500/503 응답 비율 (0~1)")
+    ap.add_argument("--throttle", type=float, default=0.0, help="초당 허용 요청 수 (넘으면 429, 0 = 제한 없음)")
+    ap.add_argument("--seed", type=int, default=0)
+
+
+def server_from_args(args, port: int = 0) -> StandInServer:
+    return StandInServer(
+        market=SyntheticMarket(args.symbols, args.bars, seed=args.seed),
+        fixtures_dir=args.fixtures,
+        faults=Faults(args.latency, args.jitter, args.error_rate, args.throttle, seed=args.seed),
+        port=port,
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="대역 서버 실행")
+    serve.add_argument("--port", type=int, default=8765)
+    add_fault_args(serve)
+    rec = sub.add_parser("record", help="실제 응답 녹화")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--codes", nargs="+", default=["005930", "000660", "035420"])
+    rec.add_argument("--pages", type=int, default=4)
+    rec.add_argument("--market-pages", type=int, default=2)
+    rec.add_argument("--dates", nargs="*", default=[], help="KRX 일별 시세를 녹화할 날짜 (YYYYMMDD)")
+    args = ap.parse_args()
+
+    if args.command == "record":
+        record(args.out, args.codes, args.pages, args.market_pages, args.dates)
+        return
+
+    server = server_from_args(args, port=args.port)
+    print(f"[INFO] stand-in server: {server.base_url}")
+    print(f"       NAVER_FINANCE_URL={server.base_url} KRX_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+스크리너 계산 경로 오프라인 벤치마크 모음 (네트워크 없음)
+
+종목 수(기본 10 / 100 / 1000 / 5000)별로 합성 OHLCV 를 만들고 아래 함수들의 처리량과 최대 메모리를 잰다.
+    calculate_rsi, calculate_macd, check_macd_crossover, analyze_stock, check_conditions,
+    normalize_stock_db, search_candidates(검색 인덱스), parse_ohlcv_csv
+결과는 JSON 으로 저장 → --compare 로 이전 결과(다른 버전)와 비교
+종목 하나씩 지표를 구하는 경로(get_indicators)가 기존 calculate_* 세 함수보다 느려지면 실패(종료 코드 1)
+측정 전에 배치 엔진 / 종목별 경로의 지표 값이 calculate_* 와 비트 단위로 같은지 확인 (다르면 역시 실패)
+
+실행:
+    python -m benchmarks.suite [--sizes 10 100 1000] [--bars 120] [--out bench_results.json]
+                               [--compare old.json] [--no-memory]
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import screener_core
+import stock_search
+import stock_universe
+from benchmarks.synthetic import indicator_cases, stock_universe_csv
+from price_series import PriceSeries
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+DEFAULT_BARS = 120
+SEARCH_QUERIES = ["삼성전자", "삼전", "ㅅㅅㅈㅈ", "바이오", "현대로봇", "한화에너쥐"]
+FILTERS = ["RSI 과매도 (30 이하)", "MACD 0선 돌파"]
+# get_indicators(종목 하나씩) 처리량 / legacy_indicators 처리량 이 이보다 낮으면 회귀로 실패
+SINGLE_SYMBOL_MIN_RATIO = 1.0
+
+
+def synthetic_market(symbols: int, bars: int, seed: int = 0) -> dict:
+    """종목 수 × 봉 수 랜덤워크를 한 번에 생성 → {code: PriceSeries}"""
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, (symbols, bars)), axis=1)))
+    open_ = np.round(close * (1 + rng.normal(0, 0.01, (symbols, bars))))
+    volume = rng.integers(10_000, 5_000_000, (symbols, bars))
+    dates = np.arange(np.datetime64("2024-01-02"), np.datetime64("2024-01-02") + bars)
+    return {
+        f"{100000 + i:06d}": PriceSeries(close[i], volume[i], open=open_[i], dates=dates).compact()
+        for i in range(symbols)
+    }
+
+
+def ohlcv_csv_files(market: dict) -> list:
+    """종목별 업로드 CSV (BytesIO, name 속성 포함)"""
+    files = []
+    for code, s in market.items():
+        df = pd.DataFrame({"date": s.dates, "open": s.open, "close": s.close, "volume": s.volume})
+        f = io.BytesIO(df.to_csv(index=False).encode())
+        f.name = f"{code}.csv"
+        files.append(f)
+    return files
+
+
+def build_cases(market: dict):
+    """(이름, 준비 함수 → 실행 함수, 처리 항목 수)"""
+    screener = screener_core.StockScreener()
+    items = list(market.items())
+    n = len(items)
+
+    def per_symbol(fn):
+        def run():
+            indicators.clear_bundle_cache()
+            for code, data in items:
+                fn(code, data)
+        return run
+
+    def search():
+        universe = stock_universe.build_universe(stock_universe_csv(n))
+        index = stock_search.StockSearchIndex(universe)
+        for q in SEARCH_QUERIES:
+            index.search_frame(q, 20)
+
+    def parse():
+        for f in files:
+            f.seek(0)
+            screener_core.parse_ohlcv_csv(f)
+
+    raw_db = stock_universe_csv(n)
+    files = ohlcv_csv_files(market)
+    return [
+        ("calculate_rsi", per_symbol(lambda c, d: screener.calculate_rsi(d["close_prices"])), n),
+        ("calculate_macd", per_symbol(lambda c, d: screener.calculate_macd(d["close_prices"])), n),
+        ("check_macd_crossover", per_symbol(lambda c, d: screener.check_macd_crossover(d["close_prices"])), n),
+        ("legacy_indicators", per_symbol(lambda c, d: legacy_indicators(screener, d["close_prices"])), n),
+        ("get_indicators", per_symbol(lambda c, d: screener.get_indicators(c, d).row()), n),
+        ("analyze_stock", per_symbol(lambda c, d: screener.analyze_stock(c, c, "기타", d)), n),
+        ("check_conditions", per_symbol(lambda c, d: screener.check_conditions(c, c, "기타", d, FILTERS, {})), n),
+        ("normalize_stock_db", lambda: stock_universe.normalize_stock_db(raw_db), n),
+        ("search_candidates", search, len(SEARCH_QUERIES)),
+        ("parse_ohlcv_csv", parse, n),
+    ]
+
+
+def legacy_indicators(screener, prices):
+    """기존 종목별 경로: calculate_rsi + calculate_macd + check_macd_crossover"""
+    return screener.calculate_rsi(prices), screener.calculate_macd(prices), screener.check_macd_crossover(prices)
+
+
+def legacy_row(screener, prices) -> dict:
+    """calculate_* 세 함수 결과를 row() 와 같은 형태로"""
+    macd, signal, hist = screener.calculate_macd(prices)
+    return {"rsi": screener.calculate_rsi(prices), "macd": macd, "signal": signal, "hist": hist,
+            "cross": screener.check_macd_crossover(prices)}
+
+
+def same_row(a: dict, b: dict) -> bool:
+    """지표 행이 비트 단위로 같은지 (NaN 은 NaN 끼리 같다고 봄)"""
+    if a.keys() != b.keys():
+        return False
+    for key in a:
+        x, y = a[key], b[key]
+        if isinstance(x, float) and isinstance(y, float) and x != x and y != y:
+            continue
+        if x != y or type(x) is not type(y):
+            return False
+    return True
+
+
+def parity_failures(cases: dict) -> list:
+    """
+    cases: {code: 종가 배열}
+    배치 엔진(get_bundles 한 번에) / 종목별 경로(get_bundle 하나씩) 의 row() 가
+    calculate_* 와 다른 (경로, 코드, 봉 수) 목록
+    """
+    screener = screener_core.StockScreener()
+    expected = {code: legacy_row(screener, list(closes)) for code, closes in cases.items()}
+    items = list(cases.items())
+    assert not indicators.prefer_per_series(len(items), max(len(c) for _, c in items)), "배치 경로가 아님"
+
+    failed = []
+    indicators.clear_bundle_cache()
+    for (code, closes), bundle in zip(items, indicators.get_bundles(items)):
+        if not same_row(bundle.row(), expected[code]):
+            failed.append(("batch", code, len(closes)))
+    indicators.clear_bundle_cache()
+    for code, closes in items:
+        if not same_row(indicators.get_bundle(code, closes).row(), expected[code]):
+            failed.append(("per_series", code, len(closes)))
+    indicators.clear_bundle_cache()
+    return failed
+
+
+def single_symbol_regressions(results: list) -> list:
+    """종목 수별 get_indicators / legacy_indicators 처리량 비가 SINGLE_SYMBOL_MIN_RATIO 미만인 것"""
+    per_sec = {(r["case"], r["symbols"]): r["per_sec"] for r in results}
+    failed = []
+    for (case, size), value in per_sec.items():
+        legacy = per_sec.get(("legacy_indicators", size))
+        if case == "get_indicators" and legacy and value / legacy < SINGLE_SYMBOL_MIN_RATIO:
+            failed.append((size, value / legacy))
+    return failed
+
+
+def measure(run, memory: bool) -> tuple[float, float | None]:
+    """(실행 시간 초, 최대 메모리 MB) — 메모리는 tracemalloc 로 한 번 더 실행해서 잰다"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        peak = None
+        if memory:
+            tracemalloc.start()
+            run()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak = peak_bytes / 1e6
+    return elapsed, peak
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(results: list, old_path: str):
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["case"], r["symbols"]): r for r in json.load(f)["results"]}
+    print(f"\n이전 결과 대비 ({old_path}):")
+    for r in results:
+        prev = old.get((r["case"], r["symbols"]))
+        if prev:
+            print(f"  {r['case']:<22} {r['symbols']:>6}  x{r['per_sec'] / prev['per_sec']:6.2f} 처리량")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    ap.add_argument("--bars", type=int, default=DEFAULT_BARS)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", default=None, help="이전 결과 JSON")
+    ap.add_argument("--no-memory", action="store_true", help="최대 메모리 측정 생략 (실행 1회)")
+    args = ap.parse_args()
+
+    mismatched = parity_failures(indicator_cases())
+    for path, code, bars in mismatched[:10]:
+        print(f"[ERROR] 지표 값이 calculate_* 와 다름: {path} {code} ({bars} bars)")
+    if mismatched:
+        return 1
+    print("지표 일치 확인: 배치 / 종목별 경로 = calculate_*")
+
+    results = []
+    print(f"{'case':<22} {'symbols':>7} {'items':>6} {'seconds':>9} {'items/s':>11} {'peak MB':>8}")
+    for size in args.sizes:
+        market = synthetic_market(size, args.bars)
+        for name, run, items in build_cases(market):
+            elapsed, peak = measure(run, memory=not args.no_memory)
+            row = {
+                "case": name,
+                "symbols": size,
+                "items": items,
+                "seconds": elapsed,
+                "per_sec": items / elapsed if elapsed else float("inf"),
+                "peak_mb": peak,
+            }
+            results.append(row)
+            peak_txt = f"{peak:8.1f}" if peak is not None else "       -"
+            print(f"{name:<22} {size:>7} {items:>6} {elapsed:9.3f} {row['per_sec']:11.1f} {peak_txt}")
+
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "bars": args.bars,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"\n저장: {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    failed = single_symbol_regressions(results)
+    for size, ratio in failed:
+        print(f"[ERROR] get_indicators 가 기존 종목별 계산보다 느림: {size} symbols, x{ratio:.2f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+벤치마크용 합성 데이터 생성기
+- 네이버 sise_day.naver 페이지와 같은 구조의 HTML
+- 전종목 규모의 종목 DB (한글 회사명)
+- 지표 일치 검사용 종가 묶음 (짧은 이력, NaN, 보합 구간 포함)
+"""
+import numpy as np
+import pandas as pd
+
+
+def random_walk_ohlcv(bars: int, seed: int = 0, start="2024-01-02", freq: str = "B", vol: float = 0.02) -> pd.DataFrame:
+    """OHLCV 랜덤워크 (date, open, high, low, close, volume) — 기본은 영업일, freq="min" 이면 분봉"""
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, vol, bars))))
+    open_ = np.round(close * (1 + rng.normal(0, 0.01, bars)))
+    high = np.maximum(open_, close) + np.round(rng.uniform(0, 200, bars))
+    low = np.minimum(open_, close) - np.round(rng.uniform(0, 200, bars))
+    volume = rng.integers(10_000, 5_000_000, bars)
+    dates = pd.date_range(start, periods=bars, freq=freq)
+    return pd.DataFrame({"date": dates, "open": open_, "high": high, "low": low, "close": close, "volume": volume})
+
+
+# 지표 일치 검사 길이: RSI(15) / MACD(35) 경계 전후 + 일반 길이
+PARITY_LENGTHS = (1, 2, 5, 14, 15, 16, 25, 26, 30, 34, 35, 36, 60, 120, 500)
+
+
+def indicator_cases(count: int = 300, seed: int = 0) -> dict:
+    """
+    {코드: 종가 float64 배열} — 지표 구현끼리 값이 같은지 검사할 때 쓰는 종가 묶음
+    길이는 PARITY_LENGTHS 를 돌아가며, 일부는 중간 / 앞쪽 / 마지막 NaN 종가나 보합(같은 값 반복) 구간 포함
+    """
+    cases = {}
+    for i in range(count):
+        n = PARITY_LENGTHS[i % len(PARITY_LENGTHS)]
+        close = random_walk_ohlcv(n, seed=seed + i)["close"].to_numpy(dtype=np.float64)
+        if n > 3:
+            kind = i % 6
+            if kind == 1:
+                close[n // 2] = np.nan
+            elif kind == 2:
+                close[:2] = np.nan
+            elif kind == 3:
+                close[-1] = np.nan
+            elif kind == 4:
+                close[n // 3:] = close[n // 3]
+        cases[f"{100000 + i:06d}"] = close
+    return cases
+
+
+def _num(v) -> str:
+    return f"{int(v):,}"
+
+
+def sise_day_html(ohlcv: pd.DataFrame) -> str:
+    """OHLCV(최신순으로 표시) → sise_day.naver 와 같은 마크업"""
+    rows = []
+    df = ohlcv.iloc[::-1].reset_index(drop=True)
+    for i, r in df.iterrows():
+        prev = df["close"].iloc[i + 1] if i + 1 < len(df) else r["close"]
+        diff = r["close"] - prev
+        if diff > 0:
+            em = '<em class="bu_p bu_pup"><span class="blind">상승</span></em><span class="tah p11 red02">'
+        elif diff < 0:
+            em = '<em class="bu_p bu_pdn"><span class="blind">하락</span></em><span class="tah p11 nv01">'
+        else:
+            em = '<span class="tah p11">'
+        rows.append(f"""<tr onmouseover="mouseOver(this)" onmouseout="mouseOut(this)">
+<td align="center"><span class="tah p10 gray03">{r['date']:%Y.%m.%d}</span></td>
+<td class="num"><span class="tah p11">{_num(r['close'])}</span></td>
+<td class="num">
+\t\t\t\t{em}
+\t\t\t\t{_num(abs(diff))}
+\t\t\t\t</span>
+</td>
+<td class="num"><span class="tah p11">{_num(r['open'])}</span></td>
+<td class="num"><span class="tah p11">{_num(r['high'])}</span></td>
+<td class="num"><span class="tah p11">{_num(r['low'])}</span></td>
+<td class="num"><span class="tah p11">{_num(r['volume'])}</span></td>
+</tr>""")
+        if i % 5 == 4:
+            rows.append('<tr><td colspan="7" height="8"></td></tr>\n<tr><td colspan="7" height="1" bgcolor="#ebebeb"></td></tr>')
+
+    return f"""<html lang="ko"><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"><title>네이버 증권</title></head>
+<body>
+<table cellspacing="0" class="type2">
+<tr>
+<th>날짜</th><th>종가</th><th>전일비</th><th>시가</th><th>고가</th><th>저가</th><th>거래량</th>
+</tr>
+<tr><td colspan="7" height="8"></td></tr>
+{chr(10).join(rows)}
+<tr><td colspan="7" height="8"></td></tr>
+</table>
+<table summary="페이지 네비게이션 리스트" class="Nnavi" align="center">
+<tr>
+<td class="on"><a href="/item/sise_day.naver?code=005930&amp;page=1">1</a></td>
+<td><a href="/item/sise_day.naver?code=005930&amp;page=2">2</a></td>
+<td class="pgRR"><a href="/item/sise_day.naver?code=005930&amp;page=700">맨뒤</a></td>
+</tr>
+</table>
+</body></html>"""
+
+
+_NAME_HEADS = ["삼성", "현대", "엘지", "한화", "대한", "동양", "신한", "한국", "대우", "코리아",
+               "세원", "우리", "금호", "태광", "동원", "에스", "케이", "제일", "한미", "아이"]
+_NAME_TAILS = ["전자", "화학", "바이오", "제약", "로봇", "건설", "중공업", "에너지", "소재", "반도체",
+               "테크", "시스템", "증권", "holdings", "정밀", "통신", "물산", "식품", "SDS", "솔루션"]
+
+
+def stock_universe_csv(n: int = 2500, seed: int = 0) -> pd.DataFrame:
+    """회사명, 종목코드, 섹터 (전종목 규모의 합성 종목 DB)"""
+    rng = np.random.default_rng(seed)
+    names, seen = [], set()
+    while len(names) < n:
+        name = rng.choice(_NAME_HEADS) + rng.choice(_NAME_TAILS)
+        if name in seen:
+            name += str(len(names))
+        seen.add(name)
+        names.append(name)
+    codes = [f"{100000 + i:06d}" for i in range(n)]
+    sectors = rng.choice(["기타", "AI", "로봇", "의약품", "반도체"], n)
+    return pd.DataFrame({"회사명": names, "종목코드": codes, "섹터": sectors})
@@ -0,0 +1,190 @@
+"""
+라이브 시세 캐시 백그라운드 예열
+
+배포 직후나 캐시 만료(LIVE_TTL_SECONDS) 뒤 첫 '분석 시작' / 일괄 스크리닝이
+종목마다 get_stock_data_live 비용을 그대로 내지 않도록, 자주 보는 종목을 미리 받아 둡니다.
+
+- 대상: 세션들이 등록한 관심종목(watch) + 가장 많이 본 종목(record_view) 상위 WARM_TOP_VIEWED 개
+- 앱 시작 시 바로 한 번, 이후 WARM_CHECK_INTERVAL 초마다 확인해서
+  캐시에 없거나 만료까지 WARM_MARGIN 초도 안 남은 종목만 다시 로드 (만료 전에 갱신)
+- 전용 데몬 스레드 + 최대 WARM_WORKERS 개 동시 로드 → UI 스레드는 기다리지 않음
+- 관심종목/조회수는 WARMER_STATE_PATH(JSON)에 저장 → 재시작 직후에도 예열 대상 유지
+- 환경변수 CACHE_WARMER=0 이면 비활성화
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import screener_core
+
+WARMER_STATE_PATH = os.environ.get("WARMER_STATE_PATH", ".cache_warmer.json")
+WARM_WORKERS = 2  # 동시에 로드하는 종목 수 (사용자 요청과 네트워크를 나눠 쓰므로 작게)
+WARM_TOP_VIEWED = 20
+WARM_MARGIN = 60  # 만료까지 이 시간(초)보다 적게 남으면 갱신
+WARM_CHECK_INTERVAL = 30
+WATCH_FORGET_AFTER = 6 * 60 * 60  # 이 시간 동안 어느 세션도 다시 등록하지 않은 관심종목은 제외
+SAVE_INTERVAL = 60
+
+
+class CacheWarmer:
+    """
+    watch(codes): 관심종목 등록 (rerun 마다 호출해도 됨 — 사전 갱신만)
+    record_view(code): 개별 분석/미리 분석 조회 기록
+    start() / stop(): 백그라운드 스레드
+    """
+
+    def __init__(self, screener=None, workers: int = WARM_WORKERS, top_viewed: int = WARM_TOP_VIEWED,
+                 margin: float = WARM_MARGIN, interval: float = WARM_CHECK_INTERVAL,
+                 state_path: str | None = WARMER_STATE_PATH):
+        self.screener = screener or screener_core.StockScreener()
+        self.workers = max(1, int(workers))
+        self.top_viewed = top_viewed
+        self.margin = margin
+        self.interval = interval
+        self.state_path = state_path
+
+        self._lock = threading.Lock()
+        self._watch = {}  # {code: 마지막 등록 시각(epoch)}
+        self._views = Counter()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.last_run_at = None
+        self.last_refreshed = 0
+        self._load_state()
+
+    # ---- 등록 (UI 스레드에서 호출, 즉시 반환) ----
+    def watch(self, codes):
+        now = time.time()
+        new = False
+        with self._lock:
+            for code in codes:
+                new |= code not in self._watch
+                self._watch[code] = now
+            self._dirty = True
+        if new:
+            self._wake.set()
+
+    def record_view(self, code: str):
+        with self._lock:
+            self._views[code] += 1
+            self._dirty = True
+
+    def targets(self) -> list:
+        """예열 대상 종목 (관심종목 먼저, 그다음 조회수 순)"""
+        cutoff = time.time() - WATCH_FORGET_AFTER
+        with self._lock:
+            self._watch = {c: ts for c, ts in self._watch.items() if ts >= cutoff}
+            codes = list(self._watch)
+            codes += [c for c, _ in self._views.most_common(self.top_viewed) if c not in self._watch]
+        return codes
+
+    def due(self) -> list:
+        """캐시에 없거나 곧 만료되는 대상"""
+        cache = screener_core.live_cache()
+        return [c for c in self.targets() if (cache.expires_in(c) or 0) < self.margin]
+
+    # ---- 백그라운드 ----
+    def start(self) -> "CacheWarmer":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cache-warmer") as pool:
+            while not self._stop.is_set():
+                self.run_once(pool)
+                self._save_state()
+                self._wake.wait(self.interval)
+                self._wake.clear()
+        self._save_state(force=True)
+
+    def run_once(self, pool=None) -> int:
+        """만료 임박 종목을 다시 로드 (pool 이 없으면 현재 스레드에서 순서대로) → 실제로 갱신된 수"""
+        codes = self.due()
+        refreshed = 0
+        if codes:
+            started = time.perf_counter()
+            refreshed = sum((pool.map if pool is not None else map)(self._refresh, codes))
+            print(f"[INFO] Cache warmer: {refreshed}/{len(codes)} refreshed ({time.perf_counter() - started:.1f}s)")
+        self.last_run_at = time.time()
+        self.last_refreshed = refreshed
+        return refreshed
+
+    def _refresh(self, code: str) -> bool:
+        if self._stop.is_set():
+            return False
+        try:
+            data = self.screener.refresh_live(code)
+        except Exception as e:
+            print(f"[WARNING] Cache warmer failed ({code}): {e}")
+            metrics.incr("cache_warmer_refresh_total", result="error")
+            return False
+        metrics.incr("cache_warmer_refresh_total", result="ok" if data else "missing")
+        return data is not None
+
+    # ---- 상태 저장 ----
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self._watch = {str(c): float(ts) for c, ts in state.get("watch", {}).items()}
+            self._views = Counter({str(c): int(n) for c, n in state.get("views", {}).items()})
+        except Exception as e:
+            print(f"[WARNING] Cache warmer state load failed: {e}")
+
+    def _save_state(self, force: bool = False):
+        if not self.state_path or not self._dirty:
+            return
+        if not force and time.time() - self._saved_at < SAVE_INTERVAL:
+            return
+        with self._lock:
+            state = {"watch": dict(self._watch), "views": dict(self._views)}
+            self._dirty = False
+        try:
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            self._saved_at = time.time()
+        except Exception as e:
+            print(f"[WARNING] Cache warmer state save failed: {e}")
+
+
+_warmer = None
+_warmer_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.environ.get("CACHE_WARMER", "1") != "0"
+
+
+def get_warmer() -> CacheWarmer:
+    """프로세스 공용 예열기 (처음 호출 시 생성·시작, CACHE_WARMER=0 이면 시작하지 않음)"""
+    global _warmer
+    if _warmer is None:
+        with _warmer_lock:
+            if _warmer is None:
+                _warmer = CacheWarmer()
+                if enabled():
+                    _warmer.start()
+    return _warmer
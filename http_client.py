@@ -0,0 +1,129 @@
+"""
+공용 HTTP 클라이언트
+
+stock_screener_web.py / update_stock_list.py / krx_snapshot.py 가 함께 쓰는 연결 계층
+- 호스트별 커넥션 풀 + keep-alive (매 요청마다 TCP/TLS 재연결 안 함)
+- gzip/deflate 응답 압축
+- 지수 백오프 + 지터 재시도 (429 는 Retry-After 존중)
+- 요청별 지연시간을 응답 객체(response.latency)와 콜백으로 노출
+"""
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """
+    requests.Session 래퍼
+    - timeout: 기본 타임아웃(초) 또는 (connect, read) 튜플
+    - retries: 실패 시 추가 시도 횟수
+    - backoff: 첫 재시도 대기(초), 이후 2배씩 (backoff_max 상한), 0~대기 사이 무작위(full jitter)
+    - on_request: (method, url, status, latency, attempt) 콜백 — 계측용
+    """
+
+    def __init__(self, headers=None, timeout=10, retries=2, backoff=0.3, backoff_max=5.0,
+                 pool_connections=16, pool_maxsize=32, on_request=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.on_request = on_request
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _sleep_before_retry(self, attempt, backoff, response=None):
+        delay = None
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+        if delay is None:
+            cap = min(self.backoff_max, backoff * (2 ** attempt))
+            delay = random.uniform(0, cap)
+        time.sleep(min(delay, self.backoff_max))
+
+    def request(self, method, url, *, timeout=None, retries=None, backoff=None, **kwargs) -> requests.Response:
+        """
+        재시도 포함 요청. 성공 응답에는 latency(초), attempts 속성이 붙는다.
+        마지막 시도까지 실패하면 마지막 예외를 그대로 올린다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        backoff = self.backoff if backoff is None else backoff
+
+        last_exc = None
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+                latency = time.perf_counter() - started
+                response.latency = latency
+                response.attempts = attempt + 1
+                self._notify(method, url, response.status_code, latency, attempt)
+                if response.status_code in RETRY_STATUS and attempt < retries:
+                    last_exc = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+                    self._sleep_before_retry(attempt, backoff, response)
+                    continue
+                response.raise_for_status()
+                return response
+            except requests.HTTPError:
+                # 재시도 대상이 아닌 상태 코드(4xx 등)는 바로 실패
+                raise
+            except Exception as e:
+                last_exc = e
+                self._notify(method, url, None, time.perf_counter() - started, attempt)
+                if attempt < retries:
+                    self._sleep_before_retry(attempt, backoff)
+        raise last_exc
+
+    def _notify(self, method, url, status, latency, attempt):
+        if self.on_request is None:
+            return
+        try:
+            self.on_request(method, url, status, latency, attempt)
+        except Exception:
+            pass
+
+    def get(self, url, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """프로세스 공용 클라이언트 (처음 호출 시 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,666 @@
+"""
+기술적 지표 배치 엔진
+
+여러 종목의 종가를 (종목 × 봉) 2차원 NumPy 배열로 받아
+RSI / MACD / Signal / Histogram / 골든·데드크로스를 한 번에 계산합니다.
+
+- pandas `ewm(span, adjust=False).mean()` 과 `rolling(window).mean()` 의
+  내부 점화식(Kahan 보정 포함)을 그대로 옮겨서, 종목별 계산
+  (StockScreener.calculate_rsi / calculate_macd / check_macd_crossover)과
+  비트 단위로 같은 값을 냅니다.
+- 봉(시간) 축은 순차 루프, 종목 축은 벡터 연산이라 종목 수가 늘어도
+  파이썬 루프 횟수는 봉 개수만큼만 돕니다.
+- IndicatorBundle: 종목별 전체 RSI/EMA/MACD/Signal 시계열을
+  (종목코드, 데이터 버전) 단위로 한 번만 계산해 메모이즈합니다.
+  배치 엔진은 봉 수만큼 고정 비용이 있어, 계산할 종목이 적으면(미리 분석, 개별 분석 등)
+  종목별로 pandas rolling/ewm(C 구현, 같은 값)을 씁니다.
+- IndicatorState: 새 봉 하나를 O(1)로 반영하는 증분 상태 (배치 결과와 동일, JSON 직렬화 가능)
+"""
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+MIN_BARS = 35  # 크로스 판정 최소 길이 (check_macd_crossover 와 동일)
+
+GOLDEN_CROSS = "골든크로스"
+DEAD_CROSS = "데드크로스"
+
+_CROSS_LABELS = {1: GOLDEN_CROSS, -1: DEAD_CROSS}
+
+
+# =============================
+# 입력 정렬
+# =============================
+def stack_closes(price_lists) -> tuple[np.ndarray, np.ndarray]:
+    """
+    길이가 다른 종가 리스트들을 오른쪽 정렬(앞쪽 NaN 패딩)된 2차원 배열로 만든다.
+    반환: (closes[종목, 봉], lengths[종목])
+    """
+    lengths = np.array([len(p) for p in price_lists], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    closes = np.full((len(price_lists), width), np.nan, dtype=np.float64)
+    for i, prices in enumerate(price_lists):
+        n = lengths[i]
+        if n:
+            closes[i, width - n:] = np.asarray(prices, dtype=np.float64)
+    return closes, lengths
+
+
+# =============================
+# pandas 호환 이동평균 (종목 축 벡터화)
+# =============================
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """pandas `Series.ewm(span=span, adjust=False).mean()` 을 행마다 적용한 것과 동일"""
+    values = np.asarray(values, dtype=np.float64)
+    com = (span - 1) / 2.0
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    new_wt = alpha
+
+    rows, bars = values.shape
+    out = np.full((rows, bars), np.nan, dtype=np.float64)
+    if bars == 0:
+        return out
+
+    weighted = values[:, 0].copy()
+    old_wt = np.ones(rows, dtype=np.float64)
+    out[:, 0] = weighted
+
+    for i in range(1, bars):
+        cur = values[:, i]
+        is_obs = cur == cur
+        started = weighted == weighted
+
+        # 이미 시작된 행: 가중치 감쇠 후 관측치가 있으면 갱신
+        old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+        upd = started & is_obs & (weighted != cur)
+        blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+        weighted = np.where(upd, blended, weighted)
+        old_wt = np.where(started & is_obs, 1.0, old_wt)
+
+        # 아직 시작 전인 행(앞쪽 NaN 패딩): 첫 관측치로 시작
+        weighted = np.where(~started & is_obs, cur, weighted)
+        out[:, i] = weighted
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """pandas `Series.rolling(window).mean()` 을 행마다 적용한 것과 동일"""
+    values = np.asarray(values, dtype=np.float64)
+    rows, bars = values.shape
+    out = np.full((rows, bars), np.nan, dtype=np.float64)
+
+    nobs = np.zeros(rows, dtype=np.int64)
+    neg_ct = np.zeros(rows, dtype=np.int64)
+    sum_x = np.zeros(rows, dtype=np.float64)
+    comp_add = np.zeros(rows, dtype=np.float64)
+    comp_remove = np.zeros(rows, dtype=np.float64)
+    same_ct = np.zeros(rows, dtype=np.int64)
+    # pandas 는 첫 값으로 prev_value 를 잡는다 → 행마다 첫 유효값
+    valid = values == values
+    first_idx = np.where(valid.any(axis=1), valid.argmax(axis=1), 0)
+    prev_value = values[np.arange(rows), first_idx] if bars else np.zeros(rows)
+
+    for i in range(bars):
+        # 윈도우에서 빠지는 값
+        if i >= window:
+            val = values[:, i - window]
+            m = val == val
+            y = -val - comp_remove
+            t = sum_x + y
+            comp_remove = np.where(m, t - sum_x - y, comp_remove)
+            sum_x = np.where(m, t, sum_x)
+            nobs = nobs - m
+            neg_ct = neg_ct - (m & np.signbit(val))
+
+        # 윈도우에 들어오는 값
+        val = values[:, i]
+        m = val == val
+        y = val - comp_add
+        t = sum_x + y
+        comp_add = np.where(m, t - sum_x - y, comp_add)
+        sum_x = np.where(m, t, sum_x)
+        nobs = nobs + m
+        neg_ct = neg_ct + (m & np.signbit(val))
+        same = val == prev_value
+        same_ct = np.where(m, np.where(same, same_ct + 1, 1), same_ct)
+        prev_value = np.where(m, val, prev_value)
+
+        ok = nobs >= window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            res = sum_x / nobs
+        res = np.where((neg_ct == 0) & (res < 0), 0.0, res)
+        res = np.where((neg_ct == nobs) & (res > 0), 0.0, res)
+        res = np.where(same_ct >= nobs, prev_value, res)
+        out[:, i] = np.where(ok, res, np.nan)
+    return out
+
+
+# =============================
+# 배치 지표 계산
+# =============================
+class BatchIndicators:
+    """
+    배치 계산 결과 (종목 축 1차원 배열들)
+    - rsi, macd, signal, hist: 마지막 봉 기준 값 (데이터 부족 시 NaN)
+    - cross: +1 골든크로스 / -1 데드크로스 / 0 없음
+    """
+
+    def __init__(self, rsi, macd, signal, hist, cross, lengths):
+        self.rsi = rsi
+        self.macd = macd
+        self.signal = signal
+        self.hist = hist
+        self.cross = cross
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def row(self, i: int) -> dict:
+        """
+        i번째 종목 결과를 종목별 메서드와 같은 형태로 반환
+        (길이 부족이면 calculate_rsi / calculate_macd 처럼 None)
+        """
+        n = int(self.lengths[i])
+        has_rsi = n >= RSI_PERIOD + 1
+        has_macd = n >= MACD_SLOW + MACD_SIGNAL
+        return {
+            "rsi": float(self.rsi[i]) if has_rsi else None,
+            "macd": float(self.macd[i]) if has_macd else None,
+            "signal": float(self.signal[i]) if has_macd else None,
+            "hist": float(self.hist[i]) if has_macd else None,
+            "cross": _CROSS_LABELS.get(int(self.cross[i])) if n >= MIN_BARS else None,
+        }
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """평균 상승/하락폭 → RSI (하락폭 0이면 100)"""
+    avg_gain = np.asarray(avg_gain, dtype=np.float64)
+    avg_loss = np.asarray(avg_loss, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def series_lengths(closes: np.ndarray) -> np.ndarray:
+    """오른쪽 정렬 배열의 종목별 길이 (앞쪽 NaN 패딩을 뺀 봉 수 — 중간 / 끝의 NaN 은 포함)"""
+    observed = closes == closes
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), closes.shape[1])
+    return closes.shape[1] - first
+
+
+def gains_losses(closes: np.ndarray, lengths: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    pandas `d.where(d > 0, 0)` / `-d.where(d < 0, 0)` 와 같은 상승·하락폭.
+    앞쪽 패딩 구간(lengths 밖)만 NaN 으로 남겨 롤링 계산에서 제외한다.
+    종목 안의 NaN 종가는 pandas 처럼 상승·하락폭 0 으로 윈도우에 들어간다.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if lengths is None:
+        lengths = series_lengths(closes)
+    d = np.full(closes.shape, np.nan, dtype=np.float64)
+    d[:, 1:] = closes[:, 1:] - closes[:, :-1]
+    gain = np.where(d > 0, d, 0.0)
+    loss = -np.where(d < 0, d, 0.0)
+    pad = np.arange(closes.shape[1]) < (closes.shape[1] - np.asarray(lengths))[:, np.newaxis]
+    gain[pad] = np.nan
+    loss[pad] = np.nan
+    return gain, loss
+
+
+def macd_series(closes: np.ndarray, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """EMA(fast), EMA(slow), MACD, Signal 전체 시계열"""
+    ema_fast = ewm_mean(closes, fast)
+    ema_slow = ewm_mean(closes, slow)
+    macd_line = ema_fast - ema_slow
+    signal_line = ewm_mean(macd_line, signal)
+    return ema_fast, ema_slow, macd_line, signal_line
+
+
+def cross_codes(macd_line: np.ndarray, signal_line: np.ndarray) -> np.ndarray:
+    """마지막 두 봉으로 골든(+1)/데드(-1) 크로스 판정"""
+    cross = np.zeros(macd_line.shape[0], dtype=np.int8)
+    if macd_line.shape[1] < 2:
+        return cross
+    m_cur, m_prev = macd_line[:, -1], macd_line[:, -2]
+    s_cur, s_prev = signal_line[:, -1], signal_line[:, -2]
+    cross[(m_prev <= s_prev) & (m_cur > s_cur)] = 1
+    cross[(m_prev >= s_prev) & (m_cur < s_cur)] = -1
+    return cross
+
+
+def compute_series(closes: np.ndarray, lengths: np.ndarray | None = None) -> dict:
+    """
+    (종목 × 봉) 종가 → 지표 전체 시계열 (모두 같은 모양의 2차원 배열)
+    avg_gain, avg_loss, rsi, ema_fast, ema_slow, macd, signal, hist
+    lengths: 종목별 실제 봉 개수 (없으면 앞쪽 NaN 을 패딩으로 보고 계산)
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    gain, loss = gains_losses(closes, lengths)
+    avg_gain = rolling_mean(gain, RSI_PERIOD)
+    avg_loss = rolling_mean(loss, RSI_PERIOD)
+    ema_fast, ema_slow, macd_line, signal_line = macd_series(closes)
+    return {
+        "avg_gain": avg_gain,
+        "avg_loss": avg_loss,
+        "rsi": rsi_from_averages(avg_gain, avg_loss),
+        "ema_fast": ema_fast,
+        "ema_slow": ema_slow,
+        "macd": macd_line,
+        "signal": signal_line,
+        "hist": macd_line - signal_line,
+    }
+
+
+def compute_batch(closes: np.ndarray, lengths: np.ndarray | None = None) -> BatchIndicators:
+    """
+    closes: (종목 × 봉) 종가 배열. 길이가 다르면 앞쪽을 NaN 으로 채워 오른쪽 정렬.
+    lengths: 종목별 실제 봉 개수 (없으면 앞쪽 NaN 을 패딩으로 보고 계산)
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    if lengths is None:
+        lengths = series_lengths(closes)
+
+    series = compute_series(closes, lengths)
+    return BatchIndicators(
+        rsi=series["rsi"][:, -1],
+        macd=series["macd"][:, -1],
+        signal=series["signal"][:, -1],
+        hist=series["hist"][:, -1],
+        cross=cross_codes(series["macd"], series["signal"]),
+        lengths=np.asarray(lengths),
+    )
+
+
+def compute_for_prices(price_lists) -> BatchIndicators:
+    """종목별 종가 리스트 묶음 → 배치 지표"""
+    if not price_lists:
+        empty = np.zeros(0)
+        return BatchIndicators(empty, empty, empty, empty, np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int64))
+    closes, lengths = stack_closes(price_lists)
+    return compute_batch(closes, lengths)
+
+
+# =============================
+# 종목별 지표 묶음 (메모이즈)
+# =============================
+class IndicatorBundle:
+    """
+    한 종목의 지표 전체 시계열.
+    EMA(12/26), MACD, Signal 을 한 번만 계산하고 RSI/크로스 판정이 같이 쓴다.
+    """
+
+    __slots__ = (
+        "code", "version", "closes",
+        "avg_gain", "avg_loss", "rsi",
+        "ema_fast", "ema_slow", "macd", "signal", "hist",
+    )
+
+    def __init__(self, code, version, closes, series: dict):
+        self.code = code
+        self.version = version
+        self.closes = closes
+        for key in ("avg_gain", "avg_loss", "rsi", "ema_fast", "ema_slow", "macd", "signal", "hist"):
+            setattr(self, key, series[key])
+
+    def __len__(self):
+        return len(self.closes)
+
+    @property
+    def cross(self) -> str | None:
+        if len(self) < MIN_BARS:
+            return None
+        code = cross_codes(self.macd[np.newaxis, -2:], self.signal[np.newaxis, -2:])[0]
+        return _CROSS_LABELS.get(int(code))
+
+    def row(self) -> dict:
+        """마지막 봉 기준 값 (BatchIndicators.row 와 같은 형태)"""
+        n = len(self)
+        has_rsi = n >= RSI_PERIOD + 1
+        has_macd = n >= MACD_SLOW + MACD_SIGNAL
+        return {
+            "rsi": float(self.rsi[-1]) if has_rsi else None,
+            "macd": float(self.macd[-1]) if has_macd else None,
+            "signal": float(self.signal[-1]) if has_macd else None,
+            "hist": float(self.hist[-1]) if has_macd else None,
+            "cross": self.cross,
+        }
+
+
+BUNDLE_CACHE_SIZE = 4096
+# 배치 엔진: 봉 하나당 ~0.1ms 고정 비용(종목 수와 거의 무관), 종목별 pandas: 종목당 ~1ms (봉 수와 거의 무관)
+# → 종목 수가 max(SMALL_BATCH, 봉 수 // BARS_PER_SERIES) 이하면 종목별 계산이 더 빠름
+SMALL_BATCH = 8
+BARS_PER_SERIES = 10
+
+_bundle_cache: OrderedDict = OrderedDict()
+_bundle_lock = threading.Lock()
+
+
+def price_version(prices) -> str:
+    """종가 배열 내용 기반 데이터 버전 (같은 데이터면 같은 값)"""
+    arr = np.ascontiguousarray(prices, dtype=np.float64)
+    return hashlib.blake2b(arr.tobytes(), digest_size=8).hexdigest()
+
+
+def _cache_get(key):
+    with _bundle_lock:
+        bundle = _bundle_cache.get(key)
+        if bundle is not None:
+            _bundle_cache.move_to_end(key)
+        return bundle
+
+
+def _cache_put(key, bundle):
+    with _bundle_lock:
+        _bundle_cache[key] = bundle
+        _bundle_cache.move_to_end(key)
+        while len(_bundle_cache) > BUNDLE_CACHE_SIZE:
+            _bundle_cache.popitem(last=False)
+
+
+def compute_series_1d(closes) -> dict:
+    """
+    종목 하나의 지표 전체 시계열 (compute_series 와 같은 키, 1차원 배열, 비트 단위로 같은 값)
+    배치 엔진이 옮겨 온 pandas 구현을 그대로 호출 — 종목 수가 적을 때용
+    """
+    import pandas as pd  # 처음 쓸 때만 import (스크리너 시작 시간)
+
+    s = pd.Series(np.asarray(closes, dtype=np.float64))
+    d = s.diff()
+    avg_gain = d.where(d > 0, 0).rolling(window=RSI_PERIOD).mean().to_numpy()
+    avg_loss = (-d.where(d < 0, 0)).rolling(window=RSI_PERIOD).mean().to_numpy()
+    ema_fast = s.ewm(span=MACD_FAST, adjust=False).mean()
+    ema_slow = s.ewm(span=MACD_SLOW, adjust=False).mean()
+    macd_line = ema_fast - ema_slow
+    signal_line = macd_line.ewm(span=MACD_SIGNAL, adjust=False).mean()
+    macd_line, signal_line = macd_line.to_numpy(), signal_line.to_numpy()
+    return {
+        "avg_gain": avg_gain,
+        "avg_loss": avg_loss,
+        "rsi": rsi_from_averages(avg_gain, avg_loss),
+        "ema_fast": ema_fast.to_numpy(),
+        "ema_slow": ema_slow.to_numpy(),
+        "macd": macd_line,
+        "signal": signal_line,
+        "hist": macd_line - signal_line,
+    }
+
+
+def prefer_per_series(rows: int, bars: int) -> bool:
+    """rows 종목 × bars 봉을 계산할 때 종목별 계산이 배치 엔진보다 빠른지"""
+    return rows <= max(SMALL_BATCH, bars // BARS_PER_SERIES)
+
+
+def get_bundles(items) -> list[IndicatorBundle]:
+    """
+    items: [(종목코드, 종가 리스트), ...]
+    캐시에 없는 종목만 모아서 계산한다 (많으면 배치 엔진 한 번, 적으면 종목별).
+    """
+    items = list(items)
+    keys = [(code, price_version(prices)) for code, prices in items]
+    bundles = [_cache_get(key) for key in keys]
+
+    missing = [i for i, b in enumerate(bundles) if b is None]
+    metrics.cache_result("indicator_bundle", hit=True, n=len(items) - len(missing))
+    metrics.cache_result("indicator_bundle", hit=False, n=len(missing))
+    if missing and prefer_per_series(len(missing), max(len(items[i][1]) for i in missing)):
+        for i in missing:
+            closes = np.ascontiguousarray(items[i][1], dtype=np.float64)
+            bundle = IndicatorBundle(keys[i][0], keys[i][1], closes, compute_series_1d(closes))
+            _cache_put(keys[i], bundle)
+            bundles[i] = bundle
+    elif missing:
+        closes, lengths = stack_closes([items[i][1] for i in missing])
+        series = compute_series(closes, lengths)
+        for row, i in enumerate(missing):
+            n = int(lengths[row])
+            sliced = {k: v[row, v.shape[1] - n:] for k, v in series.items()}
+            bundle = IndicatorBundle(keys[i][0], keys[i][1], closes[row, closes.shape[1] - n:], sliced)
+            _cache_put(keys[i], bundle)
+            bundles[i] = bundle
+    return bundles
+
+
+def get_bundle(code, prices) -> IndicatorBundle:
+    """단일 종목 지표 묶음 (메모이즈)"""
+    return get_bundles([(code, prices)])[0]
+
+
+def clear_bundle_cache():
+    with _bundle_lock:
+        _bundle_cache.clear()
+
+
+# =============================
+# 증분(스트리밍) 지표 상태
+# =============================
+class _RollingMeanState:
+    """pandas rolling(window).mean() 의 add/remove(Kahan 보정) 상태를 그대로 보관"""
+
+    __slots__ = ("window", "buf", "nobs", "neg_ct", "sum_x", "comp_add", "comp_remove", "same_ct", "prev_value")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buf = []           # 윈도우 안의 값 (빠질 때 필요)
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev_value = None  # pandas 는 첫 값으로 시작
+
+    def push(self, val: float):
+        if len(self.buf) == self.window:
+            old = self.buf.pop(0)
+            y = -old - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            self.nobs -= 1
+            self.neg_ct -= math.copysign(1.0, old) < 0
+
+        if self.prev_value is None:
+            self.prev_value = val
+        y = val - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        self.nobs += 1
+        self.neg_ct += math.copysign(1.0, val) < 0
+        self.same_ct = self.same_ct + 1 if val == self.prev_value else 1
+        self.prev_value = val
+        self.buf.append(val)
+
+    def mean(self) -> float:
+        if self.nobs < self.window:
+            return math.nan
+        if self.same_ct >= self.nobs:
+            return self.prev_value
+        res = self.sum_x / self.nobs
+        if self.neg_ct == 0 and res < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and res > 0:
+            return 0.0
+        return res
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        obj = cls(d["window"])
+        for k in cls.__slots__:
+            setattr(obj, k, d[k])
+        obj.buf = list(d["buf"])
+        return obj
+
+
+def _ema_step(weighted, old_wt: float, cur: float, span: int) -> tuple:
+    """
+    ewm(span, adjust=False) 한 스텝 (ewm_mean 과 같은 식) → (weighted, old_wt)
+    NaN 종가는 값을 그대로 두고 이전 가중치만 감쇠 (pandas ignore_na=False)
+    """
+    if weighted is None or weighted != weighted:
+        return cur, old_wt  # 첫 관측치 전 (cur 이 NaN 이면 계속 시작 전)
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_wt *= 1.0 - alpha
+    if cur != cur:
+        return weighted, old_wt
+    if weighted != cur:
+        weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+    return weighted, 1.0
+
+
+class IndicatorState:
+    """
+    종목 하나의 증분 지표 상태
+    - update(close): 새 봉 하나 반영 (O(1))
+    - row(): BatchIndicators.row / IndicatorBundle.row 와 같은 값
+    - to_dict()/from_dict(): JSON 직렬화 (시세 저장소 옆에 보관)
+    """
+
+    __slots__ = ("bars", "last_date", "last_close", "ema_fast", "ema_slow", "signal",
+                 "fast_wt", "slow_wt", "signal_wt",
+                 "macd", "prev_macd", "prev_signal", "gain", "loss")
+    # 이 기능 이전에 저장된 체크포인트에 없는 키 (NaN 없이 쌓인 상태면 항상 1.0)
+    _DEFAULTS = {"fast_wt": 1.0, "slow_wt": 1.0, "signal_wt": 1.0}
+
+    def __init__(self):
+        self.bars = 0
+        self.last_date = None
+        self.last_close = None
+        self.ema_fast = None
+        self.ema_slow = None
+        self.signal = None
+        self.fast_wt = self.slow_wt = self.signal_wt = 1.0  # ewm 의 old_wt (NaN 종가 뒤 감쇠)
+        self.macd = None
+        self.prev_macd = None
+        self.prev_signal = None
+        self.gain = _RollingMeanState(RSI_PERIOD)
+        self.loss = _RollingMeanState(RSI_PERIOD)
+
+    def update(self, close: float, date=None) -> "IndicatorState":
+        close = float(close)
+        # d.where(d > 0, 0) / -d.where(d < 0, 0) — 첫 봉은 diff 가 NaN 이라 0
+        d = close - self.last_close if self.last_close is not None else math.nan
+        self.gain.push(d if d > 0 else 0.0)
+        self.loss.push(-(d if d < 0 else 0.0))
+
+        self.ema_fast, self.fast_wt = _ema_step(self.ema_fast, self.fast_wt, close, MACD_FAST)
+        self.ema_slow, self.slow_wt = _ema_step(self.ema_slow, self.slow_wt, close, MACD_SLOW)
+        self.prev_macd, self.prev_signal = self.macd, self.signal
+        self.macd = self.ema_fast - self.ema_slow
+        self.signal, self.signal_wt = _ema_step(self.signal, self.signal_wt, self.macd, MACD_SIGNAL)
+
+        self.last_close = close
+        self.last_date = date
+        self.bars += 1
+        return self
+
+    def extend(self, closes, dates=None) -> "IndicatorState":
+        if dates is None:
+            for c in closes:
+                self.update(c)
+        else:
+            for c, d in zip(closes, dates):
+                self.update(c, d)
+        return self
+
+    def __len__(self):
+        return self.bars
+
+    @property
+    def rsi(self) -> float:
+        return float(rsi_from_averages(self.gain.mean(), self.loss.mean()))
+
+    @property
+    def cross(self) -> str | None:
+        if self.bars < MIN_BARS:
+            return None
+        if self.prev_macd <= self.prev_signal and self.macd > self.signal:
+            return GOLDEN_CROSS
+        if self.prev_macd >= self.prev_signal and self.macd < self.signal:
+            return DEAD_CROSS
+        return None
+
+    def row(self) -> dict:
+        has_rsi = self.bars >= RSI_PERIOD + 1
+        has_macd = self.bars >= MACD_SLOW + MACD_SIGNAL
+        return {
+            "rsi": self.rsi if has_rsi else None,
+            "macd": self.macd if has_macd else None,
+            "signal": self.signal if has_macd else None,
+            "hist": self.macd - self.signal if has_macd else None,
+            "cross": self.cross,
+        }
+
+    def copy(self) -> "IndicatorState":
+        return IndicatorState.from_dict(self.to_dict())
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in self.__slots__ if k not in ("gain", "loss")}
+        d["gain"] = self.gain.to_dict()
+        d["loss"] = self.loss.to_dict()
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        obj = cls()
+        for k in cls.__slots__:
+            if k not in ("gain", "loss"):
+                setattr(obj, k, d[k] if k in d else cls._DEFAULTS[k])
+        obj.gain = _RollingMeanState.from_dict(d["gain"])
+        obj.loss = _RollingMeanState.from_dict(d["loss"])
+        return obj
+
+    @classmethod
+    def from_prices(cls, closes, dates=None) -> "IndicatorState":
+        return cls().extend(closes, dates)
+
+
+def sync_state(state: IndicatorState | None, dates, closes) -> IndicatorState:
+    """
+    저장된 체크포인트를 dates[:-1] 까지 따라잡는다.
+    마지막 봉은 장중에 값이 바뀔 수 있어 체크포인트에 넣지 않는다.
+    체크포인트 날짜/종가가 이력과 안 맞으면(정정 등) 처음부터 다시 계산.
+    dates: 'YYYY-MM-DD' 문자열 배열, closes: 같은 길이의 종가
+    """
+    dates = list(dates)
+    closes = list(closes)
+    final = len(dates) - 1  # 체크포인트에 포함할 봉 수
+
+    if state is not None and state.last_date is not None:
+        try:
+            idx = dates.index(state.last_date)
+        except ValueError:
+            idx = -1
+        if 0 <= idx < final and idx + 1 == state.bars and closes[idx] == state.last_close:
+            return state.extend(closes[idx + 1:final], dates[idx + 1:final])
+
+    return IndicatorState.from_prices(closes[:final], dates[:final])
+
+
+def source_for(code, data):
+    """
+    시세 dict 에 맞는 지표 원천
+    - 저장소에서 따라온 증분 상태가 있으면 그걸 (O(1))
+    - 없으면 메모이즈된 IndicatorBundle
+    둘 다 row() 로 같은 형태의 값을 준다.
+    """
+    state = data.get("indicator_state")
+    if isinstance(state, IndicatorState) and state.bars == len(data["close_prices"]):
+        return state
+    return get_bundle(code, data["close_prices"])
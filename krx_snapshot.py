@@ -0,0 +1,178 @@
+"""
+KRX 전종목 일별 시세(스냅샷) 데이터 소스
+
+종목마다 sise_day.naver 를 여러 페이지 긁는 대신,
+거래일마다 전종목 OHLCV 표를 한 번 받아 종목별 시계열로 피벗합니다.
+→ 요청 수가 종목 수가 아니라 '조회 일수'에 비례
+
+- update_stock_list.py 의 method2_krx_json 과 같은 getJsonData.cmd 엔드포인트 사용
+- base_url(또는 환경변수 KRX_BASE_URL)을 바꾸면 로컬 대역 서버로 테스트 가능
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import http_client
+import metrics
+from price_series import PriceSeries, lossless_float32
+
+KRX_BASE_URL = os.environ.get("KRX_BASE_URL", "http://data.krx.co.kr")
+LOADER_PATH = "/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201"
+JSON_PATH = "/comm/bldAttendant/getJsonData.cmd"
+DAILY_PRICE_BLD = "dbms/MDC/STAT/standard/MDCSTAT01501"  # 전종목 시세
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "X-Requested-With": "XMLHttpRequest",
+    "Referer": "http://data.krx.co.kr/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201",
+}
+
+# KRX 응답 필드 → 표준 컬럼
+FIELD_MAP = {
+    "ISU_SRT_CD": "code",
+    "TDD_OPNPRC": "open",
+    "TDD_HGPRC": "high",
+    "TDD_LWPRC": "low",
+    "TDD_CLSPRC": "close",
+    "ACC_TRDVOL": "volume",
+}
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+MIN_BARS = 35  # MACD 계산 최소 길이
+
+
+def new_session(base_url: str = KRX_BASE_URL) -> http_client.HttpClient:
+    """메인 페이지를 한 번 열어 쿠키를 받은 공용 클라이언트"""
+    client = http_client.get_client()
+    try:
+        client.get(base_url + LOADER_PATH, headers=HEADERS, timeout=30)
+    except Exception as e:
+        print(f"[WARNING] KRX loader page failed: {e}")
+    return client
+
+
+def parse_snapshot(json_result: dict, trade_date: str) -> pd.DataFrame:
+    """
+    getJsonData.cmd 응답(OutBlock_1) → 표준 long 포맷
+    컬럼: code, date, open, high, low, close, volume
+    """
+    rows = json_result.get("OutBlock_1") or []
+    if not rows:
+        return pd.DataFrame(columns=["code", "date"] + OHLCV_COLUMNS)
+
+    df = pd.DataFrame(rows)
+    missing = [k for k in FIELD_MAP if k not in df.columns]
+    if missing:
+        raise ValueError(f"KRX 응답 필드 누락: {missing}")
+
+    df = df[list(FIELD_MAP)].rename(columns=FIELD_MAP)
+    df["code"] = df["code"].astype(str).str.strip().str.zfill(6)
+    for c in OHLCV_COLUMNS:
+        # "71,000" / "-" 형태의 문자열 → 숫자
+        df[c] = pd.to_numeric(df[c].astype(str).str.replace(",", "", regex=False), errors="coerce")
+    df.insert(1, "date", pd.Timestamp(trade_date))
+    # 거래정지 등으로 종가가 없거나 0 인 행은 제외
+    return df[df["close"] > 0].reset_index(drop=True)
+
+
+def fetch_daily_snapshot(session, trade_date: str, base_url: str = KRX_BASE_URL, timeout: int = 30) -> pd.DataFrame:
+    """trade_date(YYYYMMDD)의 전종목 OHLCV (휴장일이면 빈 DataFrame)"""
+    form = {
+        "bld": DAILY_PRICE_BLD,
+        "locale": "ko_KR",
+        "mktId": "ALL",
+        "trdDd": trade_date,
+        "share": "1",
+        "money": "1",
+        "csvxls_isNo": "false",
+    }
+    with metrics.span("fetch"):
+        r = session.post(base_url + JSON_PATH, data=form, headers=HEADERS, timeout=timeout)
+    with metrics.span("parse"):
+        return parse_snapshot(r.json(), trade_date)
+
+
+def candidate_dates(end_date=None, limit: int = 120) -> list[str]:
+    """end_date 부터 거꾸로 평일(YYYYMMDD) 목록 — 공휴일은 빈 응답으로 걸러진다"""
+    day = pd.Timestamp(end_date or datetime.today()).normalize()
+    dates = []
+    while len(dates) < limit:
+        if day.weekday() < 5:
+            dates.append(day.strftime("%Y%m%d"))
+        day -= timedelta(days=1)
+    return dates
+
+
+def fetch_market_history(days: int = 60, end_date=None, base_url: str = KRX_BASE_URL,
+                         max_workers: int = 4, session=None) -> pd.DataFrame:
+    """
+    최근 거래일 days 개의 전종목 스냅샷을 모아 long 포맷으로 반환
+    (요청 수 ≈ days + 휴장일 수)
+    """
+    session = session or new_session(base_url)
+    dates = candidate_dates(end_date, limit=days * 2 + 10)
+    frames = []
+    found = 0
+
+    def fetch(d):
+        try:
+            return fetch_daily_snapshot(session, d, base_url=base_url)
+        except Exception as e:
+            print(f"[ERROR] KRX snapshot failed ({d}): {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for start in range(0, len(dates), max_workers):
+            chunk = dates[start:start + max_workers]
+            for df in pool.map(fetch, chunk):
+                if df is not None and not df.empty and found < days:
+                    frames.append(df)
+                    found += 1
+            if found >= days:
+                break
+
+    print(f"[INFO] KRX snapshot: {found} trading days fetched")
+    if not frames:
+        return pd.DataFrame(columns=["code", "date"] + OHLCV_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def pivot_histories(long_df: pd.DataFrame, min_bars: int = MIN_BARS) -> dict:
+    """
+    long 포맷(code, date, OHLCV) → {code: PriceSeries}
+    종목별 PriceSeries 는 정렬된 전체 배열의 view (종목마다 복사하지 않음)
+    """
+    if long_df.empty:
+        return {}
+    df = long_df.sort_values(["code", "date"], kind="mergesort")
+    codes = df["code"].to_numpy()
+    dates = df["date"].to_numpy().astype("datetime64[D]")
+    prices = {c: lossless_float32(df[c].to_numpy(dtype=np.float64)) for c in ("open", "high", "low", "close")}
+    vols = np.nan_to_num(df["volume"].to_numpy(dtype=np.float64)).astype(np.int64)
+
+    # 종목 경계에서 한 번에 자르기 (groupby 대신)
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(codes)]))
+
+    result = {}
+    for s, e in zip(starts, ends):
+        if e - s < min_bars:
+            continue
+        result[str(codes[s])] = PriceSeries(
+            prices["close"][s:e], vols[s:e],
+            open=prices["open"][s:e], high=prices["high"][s:e], low=prices["low"][s:e],
+            dates=dates[s:e], dtype=prices["close"].dtype,
+        )
+    return result
+
+
+def load_market_histories(days: int = 60, end_date=None, base_url: str = KRX_BASE_URL, max_workers: int = 4) -> dict:
+    """전종목 일별 스냅샷 days 개 → 종목별 시세 dict"""
+    long_df = fetch_market_history(days=days, end_date=end_date, base_url=base_url, max_workers=max_workers)
+    return pivot_histories(long_df)
@@ -0,0 +1,188 @@
+"""
+단계별 처리 시간 / 캐시 적중 / 데이터 출처 계측
+
+스크리닝이 느릴 때 시간이 어디(네트워크, 페이지 파싱, 지표 계산, 조건 필터, 화면 그리기)에
+쓰였는지 보기 위한 프로세스 공용 레지스트리입니다. 외부 의존성 없음 (앱 밖에서도 그대로 사용).
+
+- span(stage): with 블록 실행 시간을 단계별 히스토그램에 기록
+    fetch / parse / indicators / filter / render
+- incr(name, **labels): 카운터 (예: cache_requests_total{cache, result}, price_source_total{source})
+- snapshot() / to_json() / to_prometheus(): 사이드바 진단 패널, 대시보드 내보내기
+- write_textfile(path): Prometheus node_exporter textfile collector 용 파일 (원자적 교체)
+
+사용 예:
+    import metrics
+    with metrics.span("fetch"):
+        r = client.get(url)
+    metrics.incr("cache_requests_total", cache="price_store", result="hit")
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+STAGES = ("fetch", "parse", "indicators", "filter", "render")
+# 히스토그램 버킷 상한(초) — 페이지 파싱(~ms)부터 전체 시장 스크리닝 렌더(~s)까지
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SAMPLES = 2048  # 백분위 계산에 쓰는 최근 샘플 수 (단계별)
+PROMETHEUS_PREFIX = "stock_screener"
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        self.recent.append(seconds)
+
+
+class MetricsRegistry:
+    """스레드 안전 레지스트리 (스크리닝 워커 스레드에서 동시에 기록)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+            self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def incr(self, name: str, n: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def snapshot(self) -> dict:
+        """
+        {"uptime_seconds", "stages": {stage: {count, total_seconds, avg_ms, p50_ms, p95_ms, max_ms, buckets}},
+         "counters": [{"name", "labels", "value"}, ...]}
+        """
+        with self._lock:
+            stages = {}
+            for stage, h in self._stages.items():
+                recent = np.fromiter(h.recent, dtype=np.float64) * 1000
+                p50, p95 = np.percentile(recent, [50, 95]) if len(recent) else (0.0, 0.0)
+                stages[stage] = {
+                    "count": h.count,
+                    "total_seconds": h.total,
+                    "avg_ms": h.total / h.count * 1000 if h.count else 0.0,
+                    "p50_ms": float(p50),
+                    "p95_ms": float(p95),
+                    "max_ms": h.max * 1000,
+                    "buckets": dict(zip(map(str, BUCKETS), h.buckets)),
+                }
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            return {"uptime_seconds": time.time() - self.started_at, "stages": stages, "counters": counters}
+
+    def counter_value(self, name: str, **labels) -> int:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per screening stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, s in sorted(snap["stages"].items()):
+            label = f'stage="{_escape(stage)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, s["buckets"].values()):
+                cumulative += n
+                lines.append(f'{prefix}_stage_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{{label},le="+Inf"}} {s["count"]}')
+            lines.append(f"{prefix}_stage_seconds_sum{{{label}}} {s['total_seconds']:.6f}")
+            lines.append(f"{prefix}_stage_seconds_count{{{label}}} {s['count']}")
+
+        typed = set()
+        for c in snap["counters"]:
+            name = f"{prefix}_{c['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in c["labels"].items())
+            lines.append(f"{name}{{{labels}}} {c['value']}" if labels else f"{name} {c['value']}")
+
+        lines.append(f"# TYPE {prefix}_uptime_seconds gauge")
+        lines.append(f"{prefix}_uptime_seconds {snap['uptime_seconds']:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Prometheus 텍스트를 임시 파일에 쓰고 교체 (수집기가 반쯤 쓴 파일을 읽지 않게)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".prom")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """프로세스 공용 레지스트리"""
+    return _registry
+
+
+def span(stage: str):
+    return _registry.span(stage)
+
+
+def observe(stage: str, seconds: float):
+    _registry.observe(stage, seconds)
+
+
+def incr(name: str, n: int = 1, **labels):
+    _registry.incr(name, n, **labels)
+
+
+def cache_result(cache: str, hit: bool, n: int = 1):
+    """cache_requests_total{cache, result=hit|miss}"""
+    if n:
+        _registry.incr("cache_requests_total", n, cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,126 @@
+"""
+네이버 금융 일별 시세(sise_day.naver) 전용 파서
+
+pd.read_html 은 페이지의 모든 표를 lxml + pandas 타입 추론으로 DataFrame 으로 만든 뒤
+dropna / astype 을 다시 거칩니다. sise_day 표는 구조가 고정돼 있으므로
+정규식으로 행만 뽑아 바로 타입 배열(날짜, 시가, 고가, 저가, 종가, 거래량)로 만듭니다.
+
+표 구조(헤더 순서, 행당 숫자 개수)가 예상과 다르면 pd.read_html 경로로 자동 전환합니다.
+"""
+import re
+from io import StringIO
+
+import numpy as np
+
+EXPECTED_HEADERS = ["날짜", "종가", "전일비", "시가", "고가", "저가", "거래량"]
+
+_TABLE_RE = re.compile(r'<table[^>]*class="type2"[^>]*>(.*?)</table>', re.S)
+_HEADER_RE = re.compile(r"<th[^>]*>\s*([^<]*?)\s*</th>")
+_ROW_RE = re.compile(r'<span class="tah p10 gray03">(\d{4}\.\d{2}\.\d{2})</span>(.*?)</tr>', re.S)
+_NUM_RE = re.compile(r'<span class="tah p11[^"]*">\s*([\d,]+)\s*</span>')
+
+
+class SiseDayPage:
+    """일별 시세 (날짜 오름차순이 보장되지는 않음 — concat_pages 에서 정렬)"""
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, dates, open, high, low, close, volume):
+        self.dates = dates      # datetime64[D]
+        self.open = open        # float64
+        self.high = high        # float64
+        self.low = low          # float64
+        self.close = close      # float64
+        self.volume = volume    # int64
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def empty(cls):
+        f = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype="datetime64[D]"), f, f, f, f, np.empty(0, dtype=np.int64))
+
+
+def _to_dates(values) -> np.ndarray:
+    return np.array([v.replace(".", "-") for v in values], dtype="datetime64[D]")
+
+
+def parse_sise_day_fast(html: str) -> SiseDayPage | None:
+    """정규식 파서. 표 구조가 다르면 None"""
+    m = _TABLE_RE.search(html)
+    if m is None:
+        return None
+    table = m.group(1)
+    if _HEADER_RE.findall(table) != EXPECTED_HEADERS:
+        return None
+
+    dates, nums = [], []
+    for date, rest in _ROW_RE.findall(table):
+        values = _NUM_RE.findall(rest)
+        if len(values) != 6:  # 종가, 전일비, 시가, 고가, 저가, 거래량
+            return None
+        dates.append(date)
+        nums.append([v.replace(",", "") for v in values])
+
+    # 숫자 칸 수와 뽑아낸 행 수가 안 맞으면(날짜 마크업 변경 등) 구조 변경으로 본다
+    if table.count('class="num"') != 6 * len(dates):
+        return None
+    if not dates:
+        return SiseDayPage.empty()
+
+    arr = np.array(nums, dtype=np.int64)
+    return SiseDayPage(
+        dates=_to_dates(dates),
+        open=arr[:, 2].astype(np.float64),
+        high=arr[:, 3].astype(np.float64),
+        low=arr[:, 4].astype(np.float64),
+        close=arr[:, 0].astype(np.float64),
+        volume=arr[:, 5],
+    )
+
+
+def parse_sise_day_read_html(html: str) -> SiseDayPage:
+    """기존 방식(pd.read_html) — 구조 변경 시 대체 경로"""
+    import pandas as pd  # 대체 경로에서만 필요 (import 시간 절약)
+
+    df_list = pd.read_html(StringIO(html))
+    if not df_list:
+        return SiseDayPage.empty()
+    df = df_list[0].dropna()
+    if df.empty:
+        return SiseDayPage.empty()
+    return SiseDayPage(
+        dates=_to_dates(df["날짜"].astype(str)),
+        open=df["시가"].to_numpy(dtype=np.float64),
+        high=df["고가"].to_numpy(dtype=np.float64),
+        low=df["저가"].to_numpy(dtype=np.float64),
+        close=df["종가"].to_numpy(dtype=np.float64),
+        volume=df["거래량"].to_numpy(dtype=np.float64).astype(np.int64),
+    )
+
+
+def parse_sise_day(html: str) -> SiseDayPage:
+    """전용 파서 우선, 실패하면 pd.read_html"""
+    page = parse_sise_day_fast(html)
+    if page is not None:
+        return page
+    print("[WARNING] sise_day layout not recognized, falling back to read_html")
+    return parse_sise_day_read_html(html)
+
+
+def concat_pages(pages) -> SiseDayPage:
+    """여러 페이지를 합쳐 날짜 오름차순으로 정렬"""
+    pages = [p for p in pages if len(p)]
+    if not pages:
+        return SiseDayPage.empty()
+    dates = np.concatenate([p.dates for p in pages])
+    order = np.argsort(dates, kind="stable")
+    return SiseDayPage(
+        dates=dates[order],
+        open=np.concatenate([p.open for p in pages])[order],
+        high=np.concatenate([p.high for p in pages])[order],
+        low=np.concatenate([p.low for p in pages])[order],
+        close=np.concatenate([p.close for p in pages])[order],
+        volume=np.concatenate([p.volume for p in pages])[order],
+    )
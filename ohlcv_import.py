@@ -0,0 +1,291 @@
+"""
+오프라인 시세 일괄 가져오기
+
+한 파일(또는 zip)로 여러 종목의 일봉을 한 번에 등록합니다.
+- long 포맷 CSV / Parquet: code, date, open, high, low, close, volume (한글 컬럼명도 허용)
+- zip: 안의 CSV/Parquet 를 모두 읽음. 종목코드 컬럼이 없는 파일은 파일명의 6자리 코드 사용
+  (예: 005930.csv, samsung_005930.csv)
+- 전부 이어 붙인 뒤 한 번에 정규화 → 종목코드 경계로 잘라 price_store 에 upsert
+- 유니버스에 없는 종목코드는 버리지 않고 결과에 따로 보고
+
+read_ohlcv_tail: 종목 하나짜리 대용량 CSV 를 필요한 컬럼만, 고정 dtype, 청크 단위로 읽고
+지표 계산에 필요한 마지막 TAIL_BARS 봉만 남김 (parse_ohlcv_csv 에서 사용)
+파일이 TRACE_MEMORY_BYTES 이상이면 tracemalloc 으로 파싱 중 최대 메모리를 재서 로그에 남김
+"""
+import io
+import os
+import re
+import tracemalloc
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from naver_parser import SiseDayPage
+
+COLUMN_ALIASES = {
+    "code": ["code", "종목코드", "symbol", "ticker", "stock_code"],
+    "date": ["date", "날짜", "일자"],
+    "open": ["open", "시가"],
+    "high": ["high", "고가"],
+    "low": ["low", "저가"],
+    "close": ["close", "종가"],
+    "volume": ["volume", "거래량"],
+}
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+TABLE_EXTENSIONS = (".csv", ".parquet", ".pq")
+
+# 단일 종목 CSV 에서 남길 최근 봉 수.
+# EMA(26) 의 시작값 영향은 (25/27)^n 으로 줄어 1000봉이면 float64 정밀도 아래로 사라진다.
+TAIL_BARS = 1000
+CHUNK_ROWS = 200_000
+# 이 크기 이상인 CSV 만 파싱 최대 메모리 측정 (tracemalloc 은 할당마다 비용이 있어 작은 파일은 생략)
+TRACE_MEMORY_BYTES = 8 * 1024 * 1024
+
+_CODE_IN_NAME = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+
+
+class ImportResult:
+    """pages: {종목코드: SiseDayPage}, unknown: 유니버스에 없는 종목코드, errors: [(파일명, 사유)]"""
+
+    __slots__ = ("pages", "unknown", "errors", "rows")
+
+    def __init__(self, pages=None, unknown=None, errors=None, rows=0):
+        self.pages = pages or {}
+        self.unknown = unknown or []
+        self.errors = errors or []
+        self.rows = rows
+
+
+def read_table(data: bytes, name: str) -> pd.DataFrame:
+    """파일 내용 → DataFrame (확장자로 CSV / Parquet 구분)"""
+    ext = os.path.splitext(name.lower())[1]
+    if ext in (".parquet", ".pq"):
+        try:
+            return pd.read_parquet(io.BytesIO(data))
+        except ImportError as e:
+            raise ValueError("Parquet 를 읽으려면 pyarrow 가 필요합니다.") from e
+    return pd.read_csv(io.BytesIO(data), dtype={c: str for c in COLUMN_ALIASES["code"]})
+
+
+def standardize(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """컬럼명 표준화 + 종목코드 컬럼이 없으면 파일명에서"""
+    lower_cols = {str(c).strip().lower(): c for c in df.columns}
+    rename = {}
+    for std, cands in COLUMN_ALIASES.items():
+        for cand in cands:
+            if cand in lower_cols:
+                rename[lower_cols[cand]] = std
+                break
+    df = df.rename(columns=rename)
+
+    if "code" not in df.columns:
+        m = _CODE_IN_NAME.search(os.path.basename(name))
+        if m is None:
+            raise ValueError("종목코드 컬럼이 없고 파일명에도 6자리 코드가 없습니다.")
+        df["code"] = m.group(1)
+    missing = [c for c in ("date", "close", "volume") if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {missing}")
+    # 날짜 형식은 파일마다 다를 수 있어 파일 단위로 변환 (2024.01.02 / 20240102 / Timestamp)
+    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = pd.to_datetime(df["date"].astype(str).str.replace(".", "-", regex=False), errors="coerce")
+    return df[[c for c in COLUMN_ALIASES if c in df.columns]]
+
+
+def map_columns(columns, keys) -> dict:
+    """{표준 컬럼: 원본 컬럼} (COLUMN_ALIASES 기준, 대소문자 무시)"""
+    lower_cols = {str(c).strip().lower(): c for c in columns}
+    mapped = {}
+    for std in keys:
+        for cand in COLUMN_ALIASES[std]:
+            if cand in lower_cols:
+                mapped[std] = lower_cols[cand]
+                break
+    return mapped
+
+
+def file_size(file) -> int | None:
+    """경로 / 업로드 파일(size 속성) / seek 가능한 파일 객체의 바이트 수 (알 수 없으면 None)"""
+    if isinstance(file, (str, os.PathLike)):
+        return os.path.getsize(file)
+    if getattr(file, "size", None) is not None:
+        return int(file.size)
+    if hasattr(file, "seek") and hasattr(file, "tell"):
+        pos = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(pos)
+        return size
+    return None
+
+
+def read_ohlcv_tail(file, tail: int = TAIL_BARS, chunksize: int = CHUNK_ROWS) -> tuple[pd.DataFrame, int]:
+    """
+    단일 종목 OHLCV CSV → (날짜순 마지막 tail 행, 읽은 전체 행 수)
+    - date / open / close / volume 컬럼만 읽음 (가격·거래량은 float64 고정)
+    - 청크마다 날짜 변환 후 최근 tail 행만 유지 → 파일 크기와 무관하게 메모리 일정
+    - 날짜 컬럼이 없으면 파일 순서 그대로 마지막 tail 행
+    - 파일이 TRACE_MEMORY_BYTES 이상이면 파싱 중 최대 메모리(tracemalloc, numpy 배열 포함)를 로그에 출력
+    """
+    size = file_size(file)
+    if size is None or size < TRACE_MEMORY_BYTES:
+        return _read_tail(file, tail, chunksize)
+
+    # 다른 곳에서 이미 추적 중이면 끄지 않고 최대값만 초기화
+    owner = not tracemalloc.is_tracing()
+    if owner:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    try:
+        return _read_tail(file, tail, chunksize)
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        if owner:
+            tracemalloc.stop()
+        print(f"[INFO] Parse peak memory: {peak / 1e6:.1f} MB (file {size / 1e6:.1f} MB)")
+
+
+def _read_tail(file, tail: int, chunksize: int) -> tuple[pd.DataFrame, int]:
+    header = pd.read_csv(file, nrows=0)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    cols = map_columns(header.columns, ("date", "open", "close", "volume"))
+    print(f"[INFO] Columns found: {header.columns.tolist()}")
+    if "close" not in cols or "volume" not in cols:
+        raise ValueError("Missing required columns. Need 'close' and 'volume'")
+    print(f"[INFO] Mapped columns - {cols}")
+
+    dtype = {cols[c]: np.float64 for c in ("open", "close", "volume") if c in cols}
+    if "date" in cols:
+        dtype[cols["date"]] = str
+    reader = pd.read_csv(
+        file, usecols=list(cols.values()), dtype=dtype, thousands=",", chunksize=chunksize,
+    )
+
+    rows = 0
+    kept = None
+    for chunk in reader:
+        rows += len(chunk)
+        chunk = chunk.rename(columns={v: k for k, v in cols.items()})
+        if "date" in chunk.columns:
+            chunk["date"] = pd.to_datetime(chunk["date"], errors="coerce")
+            chunk = chunk.dropna(subset=["date"])
+        kept = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+        if "date" in kept.columns:
+            kept = kept.sort_values("date", kind="mergesort")
+        kept = kept.iloc[-tail:]
+    if kept is None:
+        kept = pd.DataFrame(columns=list(cols))
+    return kept.reset_index(drop=True), rows
+
+
+def iter_tables(data: bytes, name: str):
+    """업로드 파일 하나 → (이름, 원본 바이트) — zip 이면 안의 표 파일마다"""
+    if name.lower().endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(TABLE_EXTENSIONS):
+                    yield info.filename, zf.read(info)
+    else:
+        yield name, data
+
+
+def load_long(files) -> tuple[pd.DataFrame, list]:
+    """
+    files: [(파일명, 바이트), ...]
+    반환: (표준 컬럼 long DataFrame(정규화 전), [(파일명, 오류)])
+    """
+    frames, errors = [], []
+    for fname, data in files:
+        try:
+            tables = list(iter_tables(data, fname))
+        except zipfile.BadZipFile as e:
+            errors.append((fname, str(e)))
+            continue
+        for name, raw in tables:
+            try:
+                frames.append(standardize(read_table(raw, name), name))
+            except Exception as e:
+                errors.append((name, str(e)))
+    if not frames:
+        return pd.DataFrame(columns=list(COLUMN_ALIASES)), errors
+    return pd.concat(frames, ignore_index=True), errors
+
+
+def normalize_long(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    한 번에 타입 변환·정렬
+    - 종목코드 6자리, 날짜 datetime64[D], 가격 float64, 거래량 int64
+    - 날짜/종가가 없는 행 제거, (종목, 날짜) 중복은 마지막 값
+    - 시가가 없으면 전일 종가(첫 봉은 당일 종가), 고가/저가가 없으면 NaN
+    """
+    out = pd.DataFrame({
+        "code": df["code"].astype(str).str.extract(r"(\d+)")[0].str.zfill(6),
+        "date": pd.to_datetime(df["date"], errors="coerce"),
+    })
+    for c in PRICE_COLUMNS + ["volume"]:
+        if c in df.columns:
+            values = df[c]
+            if values.dtype == object:
+                values = values.astype(str).str.replace(",", "", regex=False)
+            out[c] = pd.to_numeric(values, errors="coerce")
+        else:
+            out[c] = np.nan
+
+    out = out.dropna(subset=["code", "date", "close"])
+    out = out.sort_values(["code", "date"], kind="mergesort")
+    out = out.drop_duplicates(subset=["code", "date"], keep="last").reset_index(drop=True)
+
+    if out["open"].isna().any():
+        prev_close = out.groupby("code", sort=False)["close"].shift(1).fillna(out["close"])
+        out["open"] = out["open"].fillna(prev_close)
+    out["volume"] = out["volume"].fillna(0).astype(np.int64)
+    return out
+
+
+def split_pages(long_df: pd.DataFrame) -> dict:
+    """정규화된 long DataFrame → {종목코드: SiseDayPage} (종목 경계에서 한 번에 자름)"""
+    if long_df.empty:
+        return {}
+    codes = long_df["code"].to_numpy()
+    dates = long_df["date"].to_numpy().astype("datetime64[D]")
+    cols = {c: long_df[c].to_numpy(dtype=np.float64) for c in PRICE_COLUMNS}
+    vols = long_df["volume"].to_numpy(dtype=np.int64)
+
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(codes)]))
+    return {
+        str(codes[s]): SiseDayPage(
+            dates=dates[s:e], open=cols["open"][s:e], high=cols["high"][s:e], low=cols["low"][s:e],
+            close=cols["close"][s:e], volume=vols[s:e],
+        )
+        for s, e in zip(starts, ends)
+    }
+
+
+def import_ohlcv(files, universe_codes=None, store=None) -> ImportResult:
+    """
+    files: [(파일명, 바이트), ...] — long CSV/Parquet, 종목별 파일, zip 섞어도 됨
+    universe_codes: 등록할 종목코드 집합 (None 이면 전부)
+    store: price_store.PriceStore (있으면 한 트랜잭션으로 upsert)
+    """
+    with metrics.span("parse"):
+        long_df, errors = load_long(files)
+        long_df = normalize_long(long_df)
+        pages = split_pages(long_df)
+
+    unknown = []
+    if universe_codes is not None:
+        universe_codes = set(universe_codes)
+        unknown = sorted(c for c in pages if c not in universe_codes)
+        for c in unknown:
+            del pages[c]
+
+    if store is not None and pages:
+        store.upsert_many(pages)
+
+    print(f"[INFO] OHLCV import: {len(long_df)} rows, {len(pages)} codes, {len(unknown)} unknown, {len(errors)} errors")
+    return ImportResult(pages=pages, unknown=unknown, errors=errors, rows=len(long_df))
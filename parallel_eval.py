@@ -0,0 +1,264 @@
+"""
+메모리에 있는 시세(업로드 / KRX 스냅샷)의 지표 계산 + 조건 평가를 여러 프로세스로 나눠 실행
+
+전체 시장 × 긴 이력 스크리닝은 지표 계산(봉 축 파이썬 루프)과 조건 평가가 CPU 를 쓰는데,
+스레드로는 GIL 때문에 코어 하나만 씁니다. 여기서는
+- 모든 종목의 close / open / volume 을 공유 메모리 블록 하나에 이어 붙여 두고
+  (종목별 시작 위치·길이만 인덱스로), 워커 프로세스는 블록에 붙어서 복사 없이 view 로 읽음
+  → 작업마다 시세를 pickle 하지 않고 (시작, 끝) 범위와 종목 정보만 보냄
+- 청크 크기는 종목 수 / (프로세스 수 × CHUNKS_PER_PROCESS) 로 자동 결정 (배치 지표 엔진이
+  청크 안에서는 종목 축 벡터 연산이므로 너무 잘게 나누지 않음, MIN_CHUNK 이상)
+- 길이가 비슷한 종목끼리 같은 청크에 묶어서 NaN 패딩(계산 낭비)을 줄임
+- 종목 수가 적거나, 프로세스가 1개이거나, evaluate 를 pickle 할 수 없거나,
+  공유 메모리/프로세스 생성이 안 되는 환경(일부 클라우드 샌드박스)이면 현재 스레드에서 순서대로 (serial)
+
+evaluate 는 다른 프로세스로 보내지므로 모듈 최상위 함수나 그런 클래스의 인스턴스여야 합니다
+(예: screener_core.ConditionEvaluator). 워커에서 잰 단계별 시간은 부모의 metrics 에 합산됩니다.
+"""
+import math
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import indicators
+import metrics
+import price_series
+import screening
+
+MIN_PARALLEL_ITEMS = 512  # 이보다 적으면 프로세스 시작 비용이 더 큼 → serial
+MIN_CHUNK = 256  # 지표 엔진은 호출마다 봉 수만큼 고정 비용 → 청크가 작으면 손해
+CHUNKS_PER_PROCESS = 2  # 프로세스마다 청크 몇 개 (끝부분 부하 불균형 완화)
+START_METHOD = "forkserver"  # Streamlit 처럼 스레드가 있는 프로세스에서 fork 는 위험 → 없으면 spawn
+
+
+def default_processes() -> int:
+    """SCREEN_PROCESSES 환경변수, 없으면 사용 가능한 코어 수"""
+    env = os.environ.get("SCREEN_PROCESSES")
+    if env:
+        return max(1, int(env))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def auto_chunk_size(n: int, processes: int) -> int:
+    return max(MIN_CHUNK, math.ceil(n / (processes * CHUNKS_PER_PROCESS)))
+
+
+# =============================
+# 공유 메모리 시세 블록
+# =============================
+class SharedPriceBlock:
+    """
+    종목 n 개, 전체 봉 수 total 인 블록 하나 (8바이트 정렬 구역)
+        close float64[total] | open float64[total] | volume int64[total] | offsets int64[n + 1] | has_open int64[n]
+    open 이 없는 종목은 has_open=0 (PriceSeries.open=None 과 같게 복원)
+    """
+
+    def __init__(self, shm, n: int, total: int, owner: bool):
+        self.shm = shm
+        self.n = n
+        self.total = total
+        self.owner = owner
+        buf = shm.buf
+        pos = 0
+
+        def section(dtype, count):
+            nonlocal pos
+            arr = np.ndarray((count,), dtype=dtype, buffer=buf, offset=pos)
+            pos += count * 8
+            return arr
+
+        self.close = section(np.float64, total)
+        self.open = section(np.float64, total)
+        self.volume = section(np.int64, total)
+        self.offsets = section(np.int64, n + 1)
+        self.has_open = section(np.int64, n)
+
+    @staticmethod
+    def nbytes(n: int, total: int) -> int:
+        return max(8, (3 * total + 2 * n + 1) * 8)
+
+    @classmethod
+    def create(cls, series_list) -> "SharedPriceBlock":
+        from multiprocessing import shared_memory
+
+        lengths = np.array([len(s) for s in series_list], dtype=np.int64)
+        n, total = len(series_list), int(lengths.sum())
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(n, total))
+        block = cls(shm, n, total, owner=True)
+        block.offsets[0] = 0
+        np.cumsum(lengths, out=block.offsets[1:])
+        for i, s in enumerate(series_list):
+            a, b = block.offsets[i], block.offsets[i + 1]
+            block.close[a:b] = s.close
+            block.volume[a:b] = s.volume
+            if s.open is not None:
+                block.open[a:b] = s.open
+            block.has_open[i] = s.open is not None
+        return block
+
+    @classmethod
+    def attach(cls, name: str, n: int, total: int) -> "SharedPriceBlock":
+        from multiprocessing import shared_memory
+
+        return cls(shared_memory.SharedMemory(name=name), n, total, owner=False)
+
+    @property
+    def spec(self) -> tuple:
+        """워커로 보내는 (이름, 종목 수, 전체 봉 수)"""
+        return self.shm.name, self.n, self.total
+
+    def series(self, i: int) -> price_series.PriceSeries:
+        """i번째 종목 (공유 메모리 view, 복사 없음)"""
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        out = price_series.PriceSeries.__new__(price_series.PriceSeries)
+        out.close = self.close[a:b]
+        out.open = self.open[a:b] if self.has_open[i] else None
+        out.volume = self.volume[a:b]
+        out.high = out.low = out.dates = None
+        out.indicator_state = None
+        return out
+
+    def close_block(self):
+        # view 가 남아 있으면 buf 를 놓을 수 없으므로 먼저 정리
+        self.close = self.open = self.volume = self.offsets = self.has_open = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# =============================
+# 워커 프로세스
+# =============================
+_block = None
+
+
+def _init_worker(spec):
+    global _block
+    _block = SharedPriceBlock.attach(*spec)
+
+
+def _evaluate_chunk(evaluate, items) -> tuple[list, float, float]:
+    """
+    items: [(블록 인덱스, 종목코드, 종목명, 섹터), ...]
+    반환: (ScreenEvent 목록, 지표 계산 시간, 조건 평가 시간)
+    """
+    return _evaluate_series(evaluate, [(code, name, sector, _block.series(i)) for i, code, name, sector in items])
+
+
+def _evaluate_series(evaluate, items) -> tuple[list, float, float]:
+    started = time.perf_counter()
+    bundles = indicators.get_bundles([(code, data["close_prices"]) for code, _, _, data in items])
+    indicator_seconds = time.perf_counter() - started
+
+    events = []
+    started = time.perf_counter()
+    for (code, name, sector, data), bundle in zip(items, bundles):
+        try:
+            row = evaluate(code, name, sector, data, bundle.row())
+        except Exception as e:
+            events.append(screening.ScreenEvent(code, name, sector, screening.ERROR, error=e))
+            continue
+        status = screening.MATCH if row else screening.NO_MATCH
+        events.append(screening.ScreenEvent(code, name, sector, status, row=row or None))
+    return events, indicator_seconds, time.perf_counter() - started
+
+
+def _record(indicator_seconds: float, filter_seconds: float):
+    metrics.observe("indicators", indicator_seconds)
+    metrics.observe("filter", filter_seconds)
+
+
+# =============================
+# 진입점
+# =============================
+def iter_evaluate(stocks, preloaded: dict, evaluate, processes: int | None = None, chunk_size: int | None = None,
+                  cancelled=None):
+    """
+    stocks: [(종목코드, 종목명, 섹터), ...] — 모두 preloaded 에 시세가 있어야 함
+    preloaded: {code: PriceSeries}
+    processes: 워커 프로세스 수 (None 이면 default_processes(), 1 이하면 serial)
+    cancelled: () -> bool, True 가 되면 남은 청크를 버리고 종료
+
+    끝난 청크 순서대로 ScreenEvent 를 yield 한다.
+    """
+    stocks = list(stocks)
+    cancelled = cancelled or (lambda: False)
+    processes = default_processes() if processes is None else max(1, int(processes))
+    processes = min(processes, math.ceil(len(stocks) / MIN_CHUNK))
+    remaining = range(len(stocks))
+
+    if processes > 1 and len(stocks) >= MIN_PARALLEL_ITEMS and _picklable(evaluate):
+        chunk_size = chunk_size or auto_chunk_size(len(stocks), processes)
+        # 길이가 비슷한 종목끼리 → 청크 안 패딩 최소화
+        order = sorted(remaining, key=lambda i: len(preloaded[stocks[i][0]]))
+        chunks = [order[i:i + chunk_size] for i in range(0, len(order), chunk_size)]
+        done = yield from _iter_parallel(stocks, preloaded, evaluate, processes, chunks, cancelled)
+        remaining = [i for n, chunk in enumerate(chunks) if n not in done for i in chunk]
+
+    # serial (또는 병렬 실패 후 남은 종목): 배치 하나로
+    if not remaining or cancelled():
+        return
+    items = [(*stocks[i], preloaded[stocks[i][0]]) for i in remaining]
+    events, ind_s, filt_s = _evaluate_series(evaluate, items)
+    _record(ind_s, filt_s)
+    yield from events
+
+
+def _picklable(evaluate) -> bool:
+    try:
+        pickle.dumps(evaluate)
+        return True
+    except Exception as e:
+        print(f"[WARNING] Parallel evaluation disabled (evaluate is not picklable: {e})")
+        return False
+
+
+def _iter_parallel(stocks, preloaded, evaluate, processes, chunks, cancelled):
+    """청크를 프로세스 풀에서 평가 → 끝난 청크 번호 집합 반환 (실패하면 그때까지 끝난 것만)"""
+    import multiprocessing
+
+    done = set()
+    try:
+        block = SharedPriceBlock.create([preloaded[code] for code, _, _ in stocks])
+    except Exception as e:
+        print(f"[WARNING] Shared memory unavailable, evaluating serially: {e}")
+        return done
+
+    try:
+        method = START_METHOD if START_METHOD in multiprocessing.get_all_start_methods() else "spawn"
+        ctx = multiprocessing.get_context(method)
+        if method == "forkserver":
+            # 워커가 numpy / 지표 엔진을 매번 import 하지 않고 미리 불러 둔 서버에서 fork
+            ctx.set_forkserver_preload(["parallel_eval", "screener_core"])
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(block.spec,)) as pool:
+            futures = {
+                pool.submit(_evaluate_chunk, evaluate, [(i, *stocks[i]) for i in chunk]): n
+                for n, chunk in enumerate(chunks)
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        events, ind_s, filt_s = fut.result()
+                        _record(ind_s, filt_s)
+                        done.add(futures[fut])
+                        yield from events
+                    if cancelled():
+                        break
+            finally:
+                for fut in pending:
+                    fut.cancel()
+    except (OSError, BrokenProcessPool, pickle.PicklingError) as e:
+        print(f"[WARNING] Process pool failed, evaluating the rest serially: {e}")
+    finally:
+        block.close_block()
+    return done
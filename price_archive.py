@@ -0,0 +1,305 @@
+"""
+전종목 일봉 바이너리 아카이브 (numpy.memmap, 복사 없이 로드)
+
+수천 종목 이력을 CSV / parse_ohlcv_csv 로 읽으면 시작할 때마다 텍스트 파싱과 객체 할당을 다시 합니다.
+아카이브는 모든 종목의 일봉을 고정 폭 열 배열로 한 파일에 이어 붙이고 종목코드 → (시작, 길이) 인덱스를 둡니다.
+열기는 파일을 memmap 하고 인덱스만 읽으므로 종목 수와 상관없이 거의 즉시 끝나고,
+종목 시세(PriceSeries)는 그 memmap 의 view 라 실제로 읽는 종목의 페이지만 디스크에서 올라옵니다.
+
+파일 구조 (리틀 엔디언, 열마다 64바이트 정렬)
+    header  : magic "KRXPXA01", 가격 dtype 크기(4 = float32, 8 = float64), 종목 수, 전체 봉 수
+    index   : 종목 수 × (code S12, offset int64, length int64, flags uint32) — 종목코드 순
+    dates   : datetime64[D][전체 봉 수]
+    open / high / low / close : float32 또는 float64 (모든 가격이 float32 로 정확하면 float32)
+    volume  : int64
+  flags: 종목에 open / high / low / dates 가 있는지 (없는 열은 NaN / 0 으로 채워 두고 None 으로 복원)
+
+만들기 (python price_archive.py build ...)
+- --ohlcv: 업로드용 OHLCV 파일 (long CSV/Parquet, 종목별 CSV, zip — ohlcv_import 와 같은 형식)
+- --store: 라이브 수집이 쌓아 둔 price_store(SQLite)
+- --fetch: 종목코드를 라이브로 받아서 (screener_core.StockScreener.load_live)
+쓰기는 임시 파일 → 교체라서, 앱이 열어 둔 이전 아카이브는 그대로 유효합니다.
+"""
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+from price_series import PriceSeries, lossless_float32
+
+MAGIC = b"KRXPXA01"
+_HEADER = struct.Struct("<8sIIqq")
+HEADER_SIZE = 64
+ALIGN = 64
+INDEX_DTYPE = np.dtype([("code", "S12"), ("offset", "<i8"), ("length", "<i8"), ("flags", "<u4")])
+
+HAS_OPEN, HAS_HIGH, HAS_LOW, HAS_DATES = 1, 2, 4, 8
+_OPTIONAL = (("open", HAS_OPEN), ("high", HAS_HIGH), ("low", HAS_LOW))
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+def _align(pos: int) -> int:
+    return -(-pos // ALIGN) * ALIGN
+
+
+def _layout(n: int, total: int, price_size: int) -> dict:
+    """열 이름 → (파일 내 위치, dtype)"""
+    pos = _align(HEADER_SIZE + n * INDEX_DTYPE.itemsize)
+    price = np.dtype(f"<f{price_size}")
+    layout = {}
+    for name, dtype in (("dates", np.dtype("<M8[D]")), *((c, price) for c in PRICE_COLUMNS),
+                        ("volume", np.dtype("<i8"))):
+        layout[name] = (pos, dtype)
+        pos = _align(pos + total * dtype.itemsize)
+    layout["_end"] = (pos, None)
+    return layout
+
+
+# =============================
+# 쓰기
+# =============================
+def write_archive(target, series: dict) -> int:
+    """
+    series: {종목코드: PriceSeries 또는 SiseDayPage} (날짜 오름차순)
+    target: 파일 경로(임시 파일에 쓰고 교체) 또는 쓰기 가능한 바이너리 파일 객체
+    반환: 기록한 종목 수
+    """
+    items = sorted((str(code), s) for code, s in series.items() if s is not None and len(s.close))
+    lengths = np.array([len(s.close) for _, s in items], dtype=np.int64)
+    n, total = len(items), int(lengths.sum())
+
+    # 모든 종목 가격이 float32 로 정확하면 float32 (원화 정수 가격이면 대부분 해당)
+    price_size = 4
+    for _, s in items:
+        for col in PRICE_COLUMNS:
+            arr = getattr(s, col, None)
+            if arr is not None and lossless_float32(np.asarray(arr, dtype=np.float64)).dtype != np.float32:
+                price_size = 8
+                break
+        if price_size == 8:
+            break
+    layout = _layout(n, total, price_size)
+
+    index = np.zeros(n, dtype=INDEX_DTYPE)
+    index["code"] = [code.encode() for code, _ in items]
+    index["length"] = lengths
+    index["offset"][1:] = np.cumsum(lengths)[:-1]
+    columns = {name: np.empty(total, dtype=dtype) for name, (_, dtype) in layout.items() if dtype is not None}
+    for i, (_, s) in enumerate(items):
+        a, b = int(index["offset"][i]), int(index["offset"][i] + lengths[i])
+        flags = 0
+        columns["close"][a:b] = s.close
+        columns["volume"][a:b] = s.volume
+        for col, bit in _OPTIONAL:
+            arr = getattr(s, col, None)
+            columns[col][a:b] = np.nan if arr is None else arr
+            flags |= 0 if arr is None else bit
+        if s.dates is not None:
+            columns["dates"][a:b] = s.dates
+            flags |= HAS_DATES
+        else:
+            columns["dates"][a:b] = np.datetime64("NaT")
+        index["flags"][i] = flags
+
+    def write(f):
+        f.write(_HEADER.pack(MAGIC, price_size, 0, n, total).ljust(HEADER_SIZE, b"\0"))
+        f.write(index.tobytes())
+        for name, (pos, dtype) in layout.items():
+            f.write(b"\0" * (pos - f.tell()))
+            if dtype is not None:
+                f.write(columns[name].tobytes())
+
+    if hasattr(target, "write"):
+        start = target.tell()
+        write(_Relative(target, start))
+    else:
+        directory = os.path.dirname(os.path.abspath(target))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".archive-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return n
+
+
+class _Relative:
+    """파일 객체 중간부터 쓸 때 tell() 을 아카이브 시작 기준으로 (정렬 패딩 계산용)"""
+
+    def __init__(self, f, start: int):
+        self.f = f
+        self.start = start
+
+    def write(self, data):
+        return self.f.write(data)
+
+    def tell(self) -> int:
+        return self.f.tell() - self.start
+
+
+def archive_bytes(series: dict) -> bytes:
+    """다운로드 버튼용 (메모리에서 아카이브 생성)"""
+    buf = io.BytesIO()
+    write_archive(buf, series)
+    return buf.getvalue()
+
+
+# =============================
+# 읽기
+# =============================
+class PriceArchive(Mapping):
+    """
+    읽기 전용 {종목코드: PriceSeries} 매핑 — StockScreener(offline=...) / screening preloaded 에 그대로 사용
+    archive[code] 는 memmap view (복사 없음, 쓰기 불가)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, price_size, _, n, total = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a price archive: {path}")
+        self.n = n
+        self.total = total
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        layout = _layout(n, total, price_size)
+        if len(self._mm) < layout["_end"][0]:
+            raise ValueError(f"Truncated price archive: {path}")
+
+        self.index = np.ndarray((n,), dtype=INDEX_DTYPE, buffer=self._mm, offset=HEADER_SIZE)
+        self._columns = {
+            name: np.ndarray((total,), dtype=dtype, buffer=self._mm, offset=pos)
+            for name, (pos, dtype) in layout.items() if dtype is not None
+        }
+        self._codes = [c.decode() for c in self.index["code"]]
+        self._pos = {code: i for i, code in enumerate(self._codes)}
+
+    @property
+    def price_dtype(self) -> np.dtype:
+        return self._columns["close"].dtype
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __contains__(self, code) -> bool:
+        return code in self._pos
+
+    def __getitem__(self, code) -> PriceSeries:
+        i = self._pos[code]
+        entry = self.index[i]
+        a, b, flags = int(entry["offset"]), int(entry["offset"] + entry["length"]), int(entry["flags"])
+        c = self._columns
+        return PriceSeries(
+            c["close"][a:b], c["volume"][a:b],
+            open=c["open"][a:b] if flags & HAS_OPEN else None,
+            high=c["high"][a:b] if flags & HAS_HIGH else None,
+            low=c["low"][a:b] if flags & HAS_LOW else None,
+            dates=c["dates"][a:b] if flags & HAS_DATES else None,
+            dtype=self.price_dtype,
+        )
+
+    def get(self, code, default=None):
+        return self[code] if code in self._pos else default
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+    def __repr__(self):
+        return f"PriceArchive({self.path!r}, {self.n} codes, {self.total} bars, {self.price_dtype})"
+
+
+# =============================
+# 만들기 (업로드 파일 / 저장소 / 라이브)
+# =============================
+def series_from_ohlcv(paths) -> dict:
+    """업로드 형식 OHLCV 파일들 → {code: SiseDayPage}"""
+    import ohlcv_import
+
+    payload = []
+    for path in paths:
+        with open(path, "rb") as f:
+            payload.append((os.path.basename(path), f.read()))
+    result = ohlcv_import.import_ohlcv(payload)
+    for name, err in result.errors:
+        print(f"[ERROR] {name}: {err}")
+    return result.pages
+
+
+def series_from_store(path: str | None = None, codes=None) -> dict:
+    """price_store(SQLite) 에 쌓인 종목 → {code: SiseDayPage}"""
+    import price_store
+
+    store = price_store.PriceStore(path) if path else price_store.get_store()
+    out = {}
+    for code in codes or store.codes():
+        page = store.load(code)
+        if page is not None and len(page):
+            out[code] = page
+    return out
+
+
+def series_from_live(codes, max_workers: int = 8) -> dict:
+    """라이브 수집(네이버 일별 시세 + 저장소) → {code: PriceSeries}"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import screener_core
+
+    screener = screener_core.StockScreener()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        loaded = dict(zip(codes, pool.map(screener.load_live, codes)))
+    return {code: data for code, data in loaded.items() if data is not None}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="전종목 일봉 바이너리 아카이브")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="아카이브 만들기 (여러 출처를 주면 뒤의 것이 우선)")
+    build.add_argument("--out", required=True, help="아카이브 파일 경로")
+    build.add_argument("--ohlcv", nargs="+", default=[], help="OHLCV 파일 (csv / parquet / zip)")
+    build.add_argument("--store", nargs="?", const="", default=None,
+                       help="price_store SQLite (경로 생략 시 PRICE_STORE_PATH)")
+    build.add_argument("--fetch", nargs="+", default=[], help="라이브로 받을 종목코드")
+    build.add_argument("--workers", type=int, default=8, help="--fetch 동시 수집 개수")
+
+    info = sub.add_parser("info", help="아카이브 요약")
+    info.add_argument("path")
+    args = ap.parse_args(argv)
+
+    if args.command == "info":
+        archive = PriceArchive(args.path)
+        lengths = archive.index["length"]
+        print(archive)
+        if len(archive):
+            print(f"bars/code: min {lengths.min()}, median {int(np.median(lengths))}, max {lengths.max()}")
+            print(f"size: {archive.nbytes / 1e6:.1f} MB")
+        return 0
+
+    series = {}
+    if args.store is not None:
+        series.update(series_from_store(args.store or None))
+    if args.ohlcv:
+        series.update(series_from_ohlcv(args.ohlcv))
+    if args.fetch:
+        series.update(series_from_live([str(c).zfill(6) for c in args.fetch], args.workers))
+    if not series:
+        print("[ERROR] No price data to archive")
+        return 1
+    n = write_archive(args.out, series)
+    print(f"[INFO] Price archive: {n} codes → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
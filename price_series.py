@@ -0,0 +1,149 @@
+"""
+종목 하나의 일봉 시계열 (NumPy 배열 기반)
+
+시세 dict({"current", "close_prices": [float, ...], ...})는 값마다 파이썬 float 객체라
+전종목 이력을 세션/캐시에 들고 있으면 메모리가 크게 늘어납니다.
+PriceSeries 는 연속 배열(가격 float64 또는 손실 없으면 float32, 거래량 int64, 날짜 datetime64[D])만 보관하고,
+기존 dict 키(data["current"], data["close_prices"] ...)로도 읽을 수 있어
+analyze_stock / check_conditions / 지표 엔진을 그대로 씁니다.
+
+- 슬라이스(series[-60:], tail)는 복사 없이 원본 배열의 view
+- compact(): 가격이 float32 로 정확히 표현되면(원화 정수 가격 등) float32 로 줄임
+"""
+import numpy as np
+
+# 기존 시세 dict 키 (호환용)
+KEYS = ("current", "open", "prev_close", "volume", "close_prices", "volumes", "indicator_state")
+
+
+def _as_float(values, dtype) -> np.ndarray | None:
+    if values is None:
+        return None
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def lossless_float32(arr: np.ndarray | None) -> np.ndarray | None:
+    """float32 로 바꿔도 값이 그대로면 float32, 아니면 원본"""
+    if arr is None or arr.dtype == np.float32:
+        return arr
+    small = arr.astype(np.float32)
+    if np.array_equal(small.astype(np.float64), arr, equal_nan=True):
+        return small
+    return arr
+
+
+class PriceSeries:
+    """
+    close / volume 필수, open / high / low / dates 는 없으면 None
+    indicator_state: 저장소에서 따라온 증분 지표 상태(IndicatorState) — 있으면 재계산 생략
+    """
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume", "indicator_state")
+
+    def __init__(self, close, volume, open=None, high=None, low=None, dates=None, indicator_state=None,
+                 dtype=np.float64):
+        self.close = _as_float(close, dtype)
+        self.volume = np.ascontiguousarray(volume, dtype=np.int64)
+        self.open = _as_float(open, dtype)
+        self.high = _as_float(high, dtype)
+        self.low = _as_float(low, dtype)
+        self.dates = None if dates is None else np.asarray(dates, dtype="datetime64[D]")
+        self.indicator_state = indicator_state
+
+    @classmethod
+    def from_page(cls, page, indicator_state=None) -> "PriceSeries":
+        """naver_parser.SiseDayPage → PriceSeries (배열 복사 없음)"""
+        return cls(page.close, page.volume, open=page.open, high=page.high, low=page.low,
+                   dates=page.dates, indicator_state=indicator_state)
+
+    # ---- 기존 시세 dict 호환 ----
+    @property
+    def current(self) -> float:
+        return float(self.close[-1])
+
+    @property
+    def prev_close(self) -> float:
+        return float(self.close[-2])
+
+    @property
+    def last_open(self) -> float:
+        # 시가가 없으면 전일 종가로 (parse_ohlcv_csv 기존 동작)
+        return float(self.open[-1]) if self.open is not None else self.prev_close
+
+    @property
+    def last_volume(self) -> float:
+        return float(self.volume[-1])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._slice(key)
+        if key == "current":
+            return self.current
+        if key == "open":
+            return self.last_open
+        if key == "prev_close":
+            return self.prev_close
+        if key == "volume":
+            return self.last_volume
+        if key == "close_prices":
+            return self.close
+        if key == "volumes":
+            return self.volume
+        if key == "indicator_state" and self.indicator_state is not None:
+            return self.indicator_state
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in KEYS and (key != "indicator_state" or self.indicator_state is not None)
+
+    def keys(self):
+        return [k for k in KEYS if k in self]
+
+    def to_dict(self) -> dict:
+        """기존 형태의 시세 dict (파이썬 리스트)"""
+        return {
+            "current": self.current,
+            "open": self.last_open,
+            "prev_close": self.prev_close,
+            "volume": self.last_volume,
+            "close_prices": self.close.astype(np.float64).tolist(),
+            "volumes": self.volume.astype(float).tolist(),
+        }
+
+    # ---- 배열 연산 ----
+    def __len__(self):
+        return len(self.close)
+
+    def _slice(self, sl: slice) -> "PriceSeries":
+        """view 슬라이스 (지표 상태는 봉 수가 달라지므로 버림)"""
+        out = PriceSeries.__new__(PriceSeries)
+        for name in ("dates", "open", "high", "low", "close", "volume"):
+            arr = getattr(self, name)
+            setattr(out, name, None if arr is None else arr[sl])
+        out.indicator_state = None
+        return out
+
+    def tail(self, n: int) -> "PriceSeries":
+        return self._slice(slice(-n, None)) if n < len(self) else self
+
+    def compact(self) -> "PriceSeries":
+        """가격을 손실 없이 float32 로 줄일 수 있으면 줄인다 (제자리 변경)"""
+        self.close = lossless_float32(self.close)
+        self.open = lossless_float32(self.open)
+        self.high = lossless_float32(self.high)
+        self.low = lossless_float32(self.low)
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.dates, self.open, self.high, self.low, self.close, self.volume)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def __repr__(self):
+        return f"PriceSeries({len(self)} bars, close={self.close.dtype})"
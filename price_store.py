@@ -0,0 +1,214 @@
+"""
+로컬 OHLCV 저장소 (SQLite)
+
+- 종목코드별 일봉을 디스크에 보관 → 재시작해도 네트워크 없이 바로 로드
+- 이미 이력이 있으면 네이버 1페이지만 받아 새 봉만 추가(upsert)
+- 증분 지표 상태(IndicatorState)를 시세 옆에 JSON 으로 보관 → 새 봉만 O(1) 반영
+- 경로: 환경변수 PRICE_STORE_PATH (기본 price_store.sqlite)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import indicators
+from naver_parser import SiseDayPage
+from price_series import PriceSeries
+
+DEFAULT_PATH = os.environ.get("PRICE_STORE_PATH", "price_store.sqlite")
+MAX_AGE_SECONDS = 600  # 이 시간 안에 갱신된 종목은 네트워크 없이 디스크만 사용
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ohlcv (
+    code   TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open   REAL,
+    high   REAL,
+    low    REAL,
+    close  REAL NOT NULL,
+    volume INTEGER,
+    PRIMARY KEY (code, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    code       TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS indicator_state (
+    code  TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+
+class PriceStore:
+    """스레드마다 별도 커넥션을 쓰는 SQLite 저장소"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, code: str) -> SiseDayPage | None:
+        """저장된 일봉 (날짜 오름차순). 없으면 None"""
+        rows = self._conn().execute(
+            "SELECT date, open, high, low, close, volume FROM ohlcv WHERE code = ? ORDER BY date",
+            (code,),
+        ).fetchall()
+        if not rows:
+            return None
+        dates, opens, highs, lows, closes, vols = zip(*rows)
+        return SiseDayPage(
+            dates=np.array(dates, dtype="datetime64[D]"),
+            open=np.array(opens, dtype=np.float64),
+            high=np.array(highs, dtype=np.float64),
+            low=np.array(lows, dtype=np.float64),
+            close=np.array(closes, dtype=np.float64),
+            volume=np.array(vols, dtype=np.int64),
+        )
+
+    @staticmethod
+    def _rows(code: str, page: SiseDayPage):
+        return zip(
+            [code] * len(page),
+            np.datetime_as_string(page.dates, unit="D").tolist(),
+            page.open.tolist(),
+            page.high.tolist(),
+            page.low.tolist(),
+            page.close.tolist(),
+            page.volume.tolist(),
+        )
+
+    def upsert(self, code: str, page: SiseDayPage):
+        """일봉 추가/갱신 (같은 날짜는 덮어씀) + 갱신 시각 기록"""
+        self.upsert_many({code: page})
+
+    def upsert_many(self, pages: dict):
+        """
+        {종목코드: 일봉} 을 한 트랜잭션으로 upsert (일괄 가져오기용)
+        지표 체크포인트가 반영한 구간의 봉을 바꾸거나 그 사이에 봉을 끼워 넣으면 체크포인트 삭제
+        (sync_state 는 봉 수와 마지막 날짜·종가만 비교하므로 앞쪽 정정은 알아채지 못함)
+        """
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            for code, page in pages.items():
+                if self._rewrites_checkpoint(conn, code, page):
+                    conn.execute("DELETE FROM indicator_state WHERE code = ?", (code,))
+                conn.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows(code, page))
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(code, now) for code in pages])
+
+    @staticmethod
+    def _rewrites_checkpoint(conn, code: str, page: SiseDayPage) -> bool:
+        """page 가 체크포인트 마지막 날짜 이하의 봉을 새로 넣거나 종가를 바꾸는지"""
+        row = conn.execute("SELECT state FROM indicator_state WHERE code = ?", (code,)).fetchone()
+        if not row:
+            return False
+        try:
+            last_date = json.loads(row[0]).get("last_date")
+        except ValueError:
+            return True
+        if last_date is None:
+            return True
+        imported = [
+            (d, c) for d, c in zip(np.datetime_as_string(page.dates, unit="D").tolist(), page.close.tolist())
+            if d <= last_date
+        ]
+        if not imported:
+            return False  # 체크포인트 뒤의 새 봉만 (라이브 갱신의 보통 경우)
+        stored = dict(conn.execute(
+            "SELECT date, close FROM ohlcv WHERE code = ? AND date >= ? AND date <= ?",
+            (code, min(d for d, _ in imported), last_date),
+        ).fetchall())
+        return any(stored.get(d) != c for d, c in imported)
+
+    def replace(self, code: str, page: SiseDayPage):
+        """
+        종목 이력을 page 로 통째로 교체 (지표 체크포인트도 삭제)
+        새로 받은 구간이 저장된 이력과 이어지지 않을 때 — 그대로 붙이면 중간이 빈 시계열이 됨
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM ohlcv WHERE code = ?", (code,))
+            conn.execute("DELETE FROM indicator_state WHERE code = ?", (code,))
+            conn.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?)", self._rows(code, page))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (code, time.time()))
+
+    def touch(self, code: str):
+        """새 봉이 없어도 '방금 확인했음'을 기록"""
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (code, time.time()))
+
+    def updated_at(self, code: str) -> float | None:
+        row = self._conn().execute("SELECT updated_at FROM meta WHERE code = ?", (code,)).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, code: str, max_age: float = MAX_AGE_SECONDS) -> bool:
+        ts = self.updated_at(code)
+        return ts is not None and (time.time() - ts) < max_age
+
+    def load_state(self, code: str) -> indicators.IndicatorState | None:
+        row = self._conn().execute("SELECT state FROM indicator_state WHERE code = ?", (code,)).fetchone()
+        if not row:
+            return None
+        try:
+            return indicators.IndicatorState.from_dict(json.loads(row[0]))
+        except Exception:
+            return None
+
+    def save_state(self, code: str, state: indicators.IndicatorState):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO indicator_state VALUES (?, ?)", (code, json.dumps(state.to_dict())))
+
+    def sync_state(self, code: str, page: SiseDayPage) -> indicators.IndicatorState:
+        """
+        저장된 체크포인트를 이력에 맞춰 따라잡고(새 봉만 반영) 저장한 뒤,
+        마지막 봉까지 반영된 상태를 반환
+        """
+        dates = np.datetime_as_string(page.dates, unit="D").tolist()
+        closes = page.close.tolist()
+        saved = self.load_state(code)
+        saved_key = (saved.bars, saved.last_date) if saved is not None else None
+        checkpoint = indicators.sync_state(saved, dates, closes)  # saved 를 제자리에서 이어감
+        if (checkpoint.bars, checkpoint.last_date) != saved_key:
+            self.save_state(code, checkpoint)
+        return checkpoint.copy().update(closes[-1], dates[-1])
+
+    def codes(self) -> list[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT code FROM ohlcv ORDER BY code")]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> PriceStore:
+    """프로세스 공용 저장소 (처음 호출 시 생성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceStore()
+    return _store
+
+
+def as_price_data(page: SiseDayPage, state: indicators.IndicatorState | None = None) -> PriceSeries:
+    """
+    일봉 → 스크리너 시세 (PriceSeries, 배열 복사 없음)
+    state 가 있으면 indicator_state 로 같이 넘겨 지표 재계산을 건너뛴다
+    """
+    return PriceSeries.from_page(page, indicator_state=state)
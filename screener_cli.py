@@ -0,0 +1,162 @@
+"""
+명령줄 스크리너 (Streamlit 없이 screener_core 사용)
+
+예:
+    python screener_cli.py --codes 005930 000660 --filters rsi-oversold --out result.csv
+    python screener_cli.py --all --market KOSPI --filters macd-golden macd-zero --out result.json
+    python screener_cli.py --all --ohlcv prices.zip --filters strong-buy          # 업로드 시세로 오프라인 스크리닝
+    python screener_cli.py --all --snapshot-days 60 --filters rsi-oversold        # KRX 전종목 스냅샷 사용
+    python screener_cli.py --all --archive prices.pxa --filters macd-golden       # 바이너리 시세 아카이브 (price_archive.py)
+
+결과는 --out 확장자(.csv / .json)나 --format 으로 형식 결정, --out 이 없거나 '-' 이면 표준 출력.
+진행 로그([INFO] ...)는 표준 에러로 나갑니다.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import screener_core
+
+# 명령줄에서 쓰기 쉬운 이름 → 앱의 필터 이름
+FILTER_ALIASES = {
+    "rsi-oversold": "RSI 과매도 (30 이하)",
+    "rsi-overbought": "RSI 과매수 (70 이상)",
+    "macd-golden": "MACD 골든크로스",
+    "macd-dead": "MACD 데드크로스",
+    "macd-zero": "MACD 0선 돌파",
+    "strong-buy": "RSI 과매도 + MACD 골든크로스 (강력 매수)",
+    "gap-down": "Gap Down",
+    "volume-surge": "Volume Surge",
+}
+
+
+def select_stocks(args) -> list:
+    """
+    [(종목코드, 종목명, 섹터), ...] — --codes 는 종목 DB 에 없어도 코드 그대로 사용
+    --market 은 KOSPI / 코스피 둘 다 받음. 종목 DB 에 시장구분이 없으면 ValueError
+    """
+    import stock_universe
+
+    db = screener_core.load_stock_db(args.stock_db)
+    if args.all:
+        target = db
+        if args.market:
+            if "시장구분" not in db.columns:
+                raise ValueError(
+                    f"--market needs a 시장구분 column in the stock DB ({args.stock_db}); "
+                    "regenerate it with update_stock_list.py"
+                )
+            markets = {stock_universe.normalize_market(m) for m in args.market}
+            unknown = sorted(markets - set(db["시장구분"].astype(str)))
+            if unknown:
+                print(f"[WARNING] No stocks in market(s): {', '.join(unknown)}")
+            target = target[target["시장구분"].isin(markets)]
+        if args.sector:
+            target = target[target["섹터"].isin(args.sector)]
+        return list(zip(target["종목코드"], target["회사명"], target["섹터"]))
+
+    by_code = {c: (n, s) for c, n, s in zip(db["종목코드"], db["회사명"], db["섹터"])}
+    stocks = []
+    for code in args.codes:
+        code = str(code).zfill(6)
+        name, sector = by_code.get(code, (code, "기타"))
+        stocks.append((code, name, sector))
+    return stocks
+
+
+def load_offline(files) -> dict:
+    """--ohlcv 파일들(long CSV/Parquet, 종목별 CSV, zip) → {code: PriceSeries}"""
+    import ohlcv_import
+    import price_store
+
+    payload = []
+    for path in files:
+        with open(path, "rb") as f:
+            payload.append((os.path.basename(path), f.read()))
+    result = ohlcv_import.import_ohlcv(payload)
+    for name, err in result.errors:
+        print(f"[ERROR] {name}: {err}")
+    return {
+        code: price_store.as_price_data(page).compact()
+        for code, page in result.pages.items()
+        if len(page) >= 35  # MACD 계산 최소 길이
+    }
+
+
+def write_results(rows: list, out: str | None, fmt: str | None):
+    fmt = fmt or ("json" if out and out.endswith(".json") else "csv")
+    if fmt == "json":
+        text = json.dumps(rows, ensure_ascii=False, indent=2) + "\n"
+    else:
+        import pandas as pd
+
+        text = pd.DataFrame(rows).to_csv(index=False)
+    if not out or out == "-":
+        sys.stdout.write(text)
+        return
+    # 엑셀에서 한글이 깨지지 않게 CSV 는 BOM 포함
+    with open(out, "w", encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="") as f:
+        f.write(text)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RSI/MACD 조건 스크리너 (명령줄)")
+    target = ap.add_mutually_exclusive_group(required=True)
+    target.add_argument("--codes", nargs="+", help="종목코드 목록")
+    target.add_argument("--all", action="store_true", help="종목 DB 전체")
+    ap.add_argument("--stock-db", default=screener_core.REPO_STOCK_DB, help="종목 DB CSV (회사명, 종목코드, 섹터)")
+    ap.add_argument("--market", nargs="+", help="--all 일 때 시장구분 필터 (예: KOSPI KOSDAQ 또는 코스피 코스닥)")
+    ap.add_argument("--sector", nargs="+", help="--all 일 때 섹터 필터")
+    ap.add_argument("--filters", nargs="*", default=[], choices=sorted(FILTER_ALIASES),
+                    help="조건 (없으면 시세가 있는 모든 종목을 출력)")
+    ap.add_argument("--gap-threshold", type=float, default=5.0, help="gap-down 기준 (%%)")
+    ap.add_argument("--vol-ratio", type=float, default=2.0, help="volume-surge 배수")
+    ap.add_argument("--ohlcv", nargs="+", default=[], help="오프라인 시세 파일 (csv / parquet / zip)")
+    ap.add_argument("--archive", default=None, help="바이너리 시세 아카이브 (--ohlcv 와 같이 주면 --ohlcv 우선)")
+    ap.add_argument("--snapshot-days", type=int, default=0, help="KRX 전종목 스냅샷 조회 거래일 수 (0 = 사용 안 함)")
+    ap.add_argument("--workers", type=int, default=8, help="라이브 시세 동시 수집 개수")
+    ap.add_argument("--processes", type=int, default=None,
+                    help="업로드/스냅샷 시세 평가 프로세스 수 (0 = 코어 수, 생략하면 단일 프로세스)")
+    ap.add_argument("--out", default=None, help="결과 파일 (.csv / .json, 없으면 표준 출력)")
+    ap.add_argument("--format", choices=["csv", "json"], default=None)
+    args = ap.parse_args(argv)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            stocks = select_stocks(args)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return 2
+        offline = load_offline(args.ohlcv) if args.ohlcv else {}
+        if args.archive:
+            import price_archive
+
+            archive = price_archive.PriceArchive(args.archive)
+            offline = {**archive, **offline} if offline else archive
+        snapshot = {}
+        if args.snapshot_days:
+            import krx_snapshot
+
+            snapshot = krx_snapshot.load_market_histories(days=args.snapshot_days)
+
+        screener = screener_core.StockScreener(offline=offline, snapshot=snapshot)
+        filters = [FILTER_ALIASES[f] for f in args.filters]
+        params = {"gap_threshold": args.gap_threshold, "vol_ratio": args.vol_ratio}
+        matches, missing = screener_core.screen(screener, stocks, filters, params, max_workers=args.workers,
+                                                processes=args.processes)
+
+    write_results(matches, args.out, args.format)
+    print(
+        f"[INFO] {len(stocks):,} stocks, {len(matches):,} matched, {len(missing):,} without data "
+        f"({time.perf_counter() - started:.1f}s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,561 @@
+"""
+스크리너 핵심 로직 (UI 없음 — Streamlit 없이 import 가능)
+
+stock_screener_web.py(Streamlit 앱), screener_cli.py(명령줄), 워커 프로세스·크론·벤치마크가 함께 사용
+- StockScreener: 시세 수집(업로드 → KRX 스냅샷 → 라이브) + 지표 + 분석/조건 필터
+- parse_ohlcv_csv: 종목 하나짜리 OHLCV CSV → PriceSeries
+- load_stock_db / screen: 종목 DB 로드, 일괄 스크리닝 (화면 없이)
+- ConditionEvaluator: 조건 필터를 다른 프로세스로 보낼 수 있는 형태로 (parallel_eval)
+
+시작 시간: 모듈 import 시에는 numpy 와 지표 엔진만 불러오고,
+pandas / requests / SQLite 저장소 / CSV 파서는 그 기능을 처음 쓸 때 import 합니다.
+"""
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+import indicators
+import metrics
+import naver_parser
+import price_series
+import screening
+
+REPO_STOCK_DB = "krx_stock_list.csv"
+
+LIVE_PAGES = 4  # 이력이 없을 때 처음 받는 네이버 일별 시세 페이지 수 (10행/페이지 → MACD 최소 35봉 이상)
+CATCHUP_MAX_PAGES = 40  # 저장된 이력 뒤를 이어 받을 때 최대 페이지 수 (≈ 400거래일), 못 이으면 이력 교체
+LIVE_TTL_SECONDS = 600  # 라이브 시세 캐시 유지 시간
+NAVER_FINANCE_URL = os.environ.get("NAVER_FINANCE_URL", "https://finance.naver.com")  # 로컬 대역 서버로 바꿀 수 있음
+
+AVAILABLE_FILTERS = [
+    "RSI 과매도 (30 이하)",
+    "RSI 과매수 (70 이상)",
+    "MACD 골든크로스",
+    "MACD 데드크로스",
+    "MACD 0선 돌파",
+    "RSI 과매도 + MACD 골든크로스 (강력 매수)",
+    "Gap Down",
+    "Volume Surge",
+]
+
+
+# =============================
+# 시세 데이터: 라이브 + 업로드(오프라인)
+# =============================
+def safe_get(url, params=None, headers=None, timeout=10, retries=2, sleep=0.3):
+    """
+    공용 HTTP 클라이언트(keep-alive 커넥션 풀 + 지수 백오프/지터)로 GET
+    sleep: 첫 재시도 대기 기준(초). 응답의 r.latency 로 요청 지연시간 확인 가능
+    """
+    import http_client  # requests 는 네트워크를 쓸 때만 import
+
+    return http_client.get_client().get(url, params=params, headers=headers, timeout=timeout, retries=retries, backoff=sleep)
+
+
+def parse_ohlcv_csv(file) -> price_series.PriceSeries | None:
+    """
+    업로드 OHLCV CSV 지원
+    컬럼 후보:
+    - date/날짜
+    - open/시가
+    - close/종가
+    - volume/거래량
+    (필수: close, volume)
+    """
+    import ohlcv_import  # pandas CSV 리더 (업로드 처리할 때만)
+
+    try:
+        print(f"[INFO] Parsing OHLCV CSV: {file.name if hasattr(file, 'name') else 'unknown'}")
+        started = time.perf_counter()
+        # 필요한 컬럼만 청크로 읽고 최근 ohlcv_import.TAIL_BARS 봉만 남김 (날짜순 정렬 포함)
+        with metrics.span("parse"):
+            df, rows = ohlcv_import.read_ohlcv_tail(file)
+
+        if len(df) < 35:  # MACD 계산 최소 길이
+            print(f"[ERROR] Not enough data rows: {len(df)} (need at least 35)")
+            return None
+
+        series = price_series.PriceSeries(
+            df["close"].to_numpy(),
+            np.nan_to_num(df["volume"].to_numpy()),
+            open=df["open"].to_numpy() if "open" in df.columns else None,  # 없으면 전일 종가를 시가로
+            dates=df["date"].to_numpy() if "date" in df.columns else None,
+        ).compact()
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"[SUCCESS] OHLCV parsed successfully. Rows: {rows:,} (kept {len(series)}), "
+            f"Current: {series.current}, {elapsed:.2f}s"
+        )
+        return series
+    except Exception as e:
+        print(f"[ERROR] Failed to parse OHLCV CSV: {str(e)}")
+        return None
+
+
+class LiveCache:
+    """
+    라이브 시세 TTL 캐시 (프로세스 공용, 스레드 안전)
+    실패 결과(None)도 TTL 동안 보관 → 막힌 종목을 반복 요청하지 않음 (기존 st.cache_data 와 같은 동작)
+    """
+
+    def __init__(self, ttl: float = LIVE_TTL_SECONDS, max_entries: int = 20_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, code: str):
+        """(적중 여부, 값)"""
+        with self._lock:
+            entry = self._data.get(code)
+            if entry is None or entry[0] < time.monotonic():
+                return False, None
+            return True, entry[1]
+
+    def put(self, code: str, value):
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                while len(self._data) >= self.max_entries:
+                    self._data.pop(next(iter(self._data)))
+            self._data[code] = (time.monotonic() + self.ttl, value)
+
+    def expires_in(self, code: str) -> float | None:
+        """남은 유효 시간(초), 없거나 만료됐으면 None"""
+        with self._lock:
+            entry = self._data.get(code)
+        if entry is None:
+            return None
+        left = entry[0] - time.monotonic()
+        return left if left > 0 else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_live_cache = LiveCache()
+
+
+def clear_live_cache():
+    _live_cache.clear()
+
+
+def live_cache() -> LiveCache:
+    return _live_cache
+
+
+class StockScreener:
+    """
+    offline: {code: 시세} 업로드(오프라인) 시세 — 1순위
+    snapshot: {code: 시세} KRX 전종목 스냅샷 — 2순위
+    (둘 다 호출 시점의 dict 를 그대로 참조하므로 밖에서 채워 넣어도 바로 반영,
+     dict 대신 price_archive.PriceArchive 같은 읽기 전용 Mapping 도 가능)
+    """
+
+    def __init__(self, offline: dict | None = None, snapshot: dict | None = None):
+        self.offline = {} if offline is None else offline
+        self.snapshot = {} if snapshot is None else snapshot
+        self.headers = {
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36"
+            ),
+            "Referer": "https://finance.naver.com/",
+        }
+
+    def fetch_pages(self, code: str, since=None, max_pages: int | None = None) -> naver_parser.SiseDayPage:
+        """
+        네이버 일별 시세 페이지 수집 (최신 페이지부터)
+        since(datetime64) 가 없으면 LIVE_PAGES 페이지,
+        있으면 그 날짜까지 겹치는 페이지에서 멈춤 → 보통 1페이지, 오래 안 열었으면 최대 CATCHUP_MAX_PAGES
+        (겹쳤는지는 반환값의 첫 날짜 <= since 로 확인)
+        """
+        if max_pages is None:
+            max_pages = LIVE_PAGES if since is None else CATCHUP_MAX_PAGES
+        pages = []
+        for page in range(1, max_pages + 1):
+            url = f"{NAVER_FINANCE_URL}/item/sise_day.naver"
+            with metrics.span("fetch"):
+                r = safe_get(url, params={"code": code, "page": page}, headers=self.headers, timeout=12, retries=1)
+            with metrics.span("parse"):
+                parsed = naver_parser.parse_sise_day(r.text)
+            if not len(parsed):
+                break
+            pages.append(parsed)
+            if since is not None and parsed.dates.min() <= since:
+                break
+            time.sleep(0.1)
+        return naver_parser.concat_pages(pages)
+
+    def get_stock_data_live(self, code: str) -> price_series.PriceSeries | None:
+        """
+        네이버 금융(라이브, LIVE_TTL_SECONDS 동안 캐시) - Streamlit Cloud에서 막힐 수 있음
+        캐시 적중 / 데이터 출처를 metrics 에 기록 (스크리닝 워커 스레드에서도 사용)
+        """
+        hit, data = _live_cache.get(code)
+        metrics.cache_result("live_prices", hit=hit)
+        if not hit:
+            data = self.load_live(code)
+            _live_cache.put(code, data)
+        metrics.incr("price_source_total", source="live" if data else "missing")
+        return data
+
+    def refresh_live(self, code: str) -> price_series.PriceSeries | None:
+        """
+        캐시 적중 여부와 상관없이 네트워크에서 다시 받아 캐시 갱신 (백그라운드 예열용, 사용자 계측에는 안 잡힘)
+        저장소 신선도(MAX_AGE_SECONDS)도 무시 — 안 그러면 디스크 사본을 다시 담기만 해서 캐시 나이가 누적됨
+        """
+        data = self.load_live(code, force=True)
+        _live_cache.put(code, data)
+        return data
+
+    def load_live(self, code: str, force: bool = False) -> price_series.PriceSeries | None:
+        """
+        캐시 없이 라이브 로드 (force 면 저장소가 최근 갱신이어도 네트워크 확인)
+        - 로컬 저장소(price_store)에 이력이 있으면 저장된 마지막 봉까지 거슬러 받아 새 봉만 추가 (보통 1페이지)
+          CATCHUP_MAX_PAGES 안에 못 닿으면 받은 구간으로 이력 교체 (중간이 빈 시계열 방지)
+        - 최근에 갱신했으면 네트워크 없이 디스크에서 바로 로드
+        """
+        import price_store  # SQLite 저장소 (라이브 경로에서만)
+
+        store = price_store.get_store()
+        stored = None
+        try:
+            stored = store.load(code)
+            fresh = stored is not None and not force and store.is_fresh(code)
+            metrics.cache_result("price_store", hit=fresh)
+            if fresh:
+                print(f"[INFO] Using stored prices: {code}")
+            else:
+                since = stored.dates[-1] if stored is not None else None
+                fetched = self.fetch_pages(code, since=since)
+                if len(fetched) and since is not None and fetched.dates[0] > since:
+                    # 저장된 마지막 봉까지 못 거슬러 올라감 → 붙이면 중간이 비므로 받은 구간으로 교체
+                    print(f"[WARNING] Stored prices too old to extend, replacing history: {code}")
+                    store.replace(code, fetched)
+                    stored = store.load(code)
+                elif len(fetched):
+                    store.upsert(code, fetched)
+                    stored = store.load(code)
+                elif stored is not None:
+                    store.touch(code)
+
+            if stored is None or len(stored) < 35:
+                return None
+            return price_store.as_price_data(stored, store.sync_state(code, stored))
+        except Exception as e:
+            print(f"[ERROR] Live data fetch failed ({code}): {str(e)}")
+            # 네트워크 실패 시 저장된 이력이라도 사용
+            if stored is not None and len(stored) >= 35:
+                print(f"[WARNING] Using stale stored prices: {code}")
+                return price_store.as_price_data(stored)
+            return None
+
+    def get_stock_data(self, code: str) -> price_series.PriceSeries | None:
+        """
+        완전 안정형:
+        1) 업로드된 오프라인 데이터가 있으면 그걸 우선
+        2) KRX 전종목 스냅샷을 불러왔다면 그 다음
+        3) 없으면 라이브 시도
+        """
+        # 오프라인 데이터 확인 (더 명확한 로깅)
+        offline_map = self.offline
+        if isinstance(offline_map, Mapping) and code in offline_map:
+            print(f"[INFO] Using offline data: {code}")
+            metrics.incr("price_source_total", source="offline")
+            return offline_map[code]
+
+        # KRX 전종목 스냅샷을 불러왔다면 그 다음 우선
+        market_map = self.snapshot
+        if isinstance(market_map, Mapping) and code in market_map:
+            print(f"[INFO] Using KRX snapshot data: {code}")
+            metrics.incr("price_source_total", source="snapshot")
+            return market_map[code]
+
+        # 라이브 시도
+        print(f"[INFO] Attempting live data fetch: {code}")
+        live_data = self.get_stock_data_live(code)
+        if live_data:
+            print(f"[SUCCESS] Live data fetch successful: {code}")
+        else:
+            print(f"[WARNING] Live data fetch failed: {code}")
+        return live_data
+
+    def calculate_rsi(self, prices, period=14):
+        if len(prices) < period + 1:
+            return None
+        import pandas as pd  # 기존 종목별 구현(검증·벤치마크 기준값)에서만 사용
+
+        s = pd.Series(prices)
+        d = s.diff()
+        gain = (d.where(d > 0, 0)).rolling(window=period).mean()
+        loss = (-d.where(d < 0, 0)).rolling(window=period).mean()
+        loss_val = loss.iloc[-1]
+        if loss_val == 0:
+            return 100.0
+        rs = gain.iloc[-1] / loss_val
+        return float(100 - (100 / (1 + rs)))
+
+    def calculate_macd(self, prices, fast=12, slow=26, signal=9):
+        if len(prices) < slow + signal:
+            return None, None, None
+        import pandas as pd
+
+        s = pd.Series(prices)
+        ema_fast = s.ewm(span=fast, adjust=False).mean()
+        ema_slow = s.ewm(span=slow, adjust=False).mean()
+        macd_line = ema_fast - ema_slow
+        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        hist = macd_line - signal_line
+        return float(macd_line.iloc[-1]), float(signal_line.iloc[-1]), float(hist.iloc[-1])
+
+    def check_macd_crossover(self, prices):
+        if len(prices) < 35:
+            return None
+        import pandas as pd
+
+        s = pd.Series(prices)
+        ema_fast = s.ewm(span=12, adjust=False).mean()
+        ema_slow = s.ewm(span=26, adjust=False).mean()
+        macd_line = ema_fast - ema_slow
+        signal_line = macd_line.ewm(span=9, adjust=False).mean()
+        macd_current = macd_line.iloc[-1]
+        macd_prev = macd_line.iloc[-2]
+        sig_current = signal_line.iloc[-1]
+        sig_prev = signal_line.iloc[-2]
+
+        if macd_prev <= sig_prev and macd_current > sig_current:
+            return "골든크로스"
+        if macd_prev >= sig_prev and macd_current < sig_current:
+            return "데드크로스"
+        return None
+
+    def get_indicators(self, code, data):
+        """
+        지표 원천 (row() 로 RSI/MACD/Signal/Histogram/크로스 제공)
+        - 저장소에서 따라온 증분 상태가 있으면 그걸 그대로
+        - 없으면 (종목코드, 데이터 버전)별로 메모이즈된 IndicatorBundle
+        어느 쪽이든 calculate_rsi / calculate_macd / check_macd_crossover 와 같은 값
+        """
+        with metrics.span("indicators"):
+            return indicators.source_for(code, data)
+
+    def analyze_stock(self, code, name, sector, data, ind=None):
+        try:
+            if ind is None:
+                ind = self.get_indicators(code, data).row()
+
+            rsi = ind["rsi"]
+            if rsi is None:
+                return None
+
+            macd, sig = ind["macd"], ind["signal"]
+            if macd is None:
+                return None
+
+            cross = ind["cross"]
+            gap = ((data["open"] - data["prev_close"]) / data["prev_close"]) * 100
+
+            volume_surge = False
+            if len(data["volumes"]) >= 5:
+                avg_vol = sum(data["volumes"][-5:]) / 5
+                if data["volume"] >= avg_vol * 2.0:
+                    volume_surge = True
+
+            signals = []
+            recommendation = "관망"
+            rec_color = "🟡"
+
+            if rsi <= 30 and cross == "골든크로스":
+                signals.append("⭐ 강력 매수 신호 (RSI 과매도 + 골든크로스)")
+                recommendation = "적극 매수"
+                rec_color = "🟢"
+            elif rsi <= 30:
+                signals.append("RSI 과매도 (반등 가능성)")
+                recommendation = "매수 고려"
+                rec_color = "🟢"
+            elif cross == "골든크로스":
+                signals.append("MACD 골든크로스 (상승 전환)")
+                recommendation = "매수 고려"
+                rec_color = "🟢"
+            elif macd > 0 and rsi < 70:
+                signals.append("상승 추세 지속 (MACD > 0)")
+                recommendation = "보유/추가 매수"
+                rec_color = "🟢"
+
+            if rsi >= 70:
+                signals.append("RSI 과매수 (조정 가능성)")
+                recommendation = "매도 고려"
+                rec_color = "🔴"
+            if cross == "데드크로스":
+                signals.append("MACD 데드크로스 (하락 전환)")
+                recommendation = "매도 고려"
+                rec_color = "🔴"
+
+            if gap < -3:
+                signals.append(f"갭 하락 {gap:.1f}%")
+            if volume_surge:
+                signals.append("거래량 급증 (최근 5일 평균 대비 2배↑)")
+            if macd > 0:
+                signals.append("MACD 0선 상단 (강세)")
+
+            return {
+                "sector": sector,
+                "code": code,
+                "name": name,
+                "current": data["current"],
+                "change": ((data["current"] - data["prev_close"]) / data["prev_close"]) * 100,
+                "rsi": rsi,
+                "macd": macd,
+                "signal": sig,
+                "macd_cross": cross,
+                "gap": gap,
+                "volume": data["volume"],
+                "signals": signals,
+                "recommendation": recommendation,
+                "recommendation_color": rec_color,
+            }
+        except Exception:
+            return None
+
+    def check_conditions(self, code, name, sector, data, selected_filters, params, ind=None):
+        try:
+            if ind is None:
+                ind = self.get_indicators(code, data).row()
+
+            rsi = ind["rsi"]
+            if rsi is None:
+                return None
+
+            macd, sig = ind["macd"], ind["signal"]
+            if macd is None:
+                return None
+
+            cross = ind["cross"]
+            signals = []
+
+            if "RSI 과매도 (30 이하)" in selected_filters:
+                if rsi > 30:
+                    return None
+                signals.append("RSI 과매도")
+
+            if "RSI 과매수 (70 이상)" in selected_filters:
+                if rsi < 70:
+                    return None
+                signals.append("RSI 과매수")
+
+            if "MACD 골든크로스" in selected_filters:
+                if cross != "골든크로스":
+                    return None
+                signals.append("MACD 골든크로스")
+
+            if "MACD 데드크로스" in selected_filters:
+                if cross != "데드크로스":
+                    return None
+                signals.append("MACD 데드크로스")
+
+            if "MACD 0선 돌파" in selected_filters:
+                if macd <= 0:
+                    return None
+                signals.append("MACD 0선 돌파")
+
+            if "RSI 과매도 + MACD 골든크로스 (강력 매수)" in selected_filters:
+                if not (rsi <= 30 and cross == "골든크로스"):
+                    return None
+                signals.append("⭐ 강력 매수 신호")
+
+            if "Gap Down" in selected_filters:
+                gap = ((data["open"] - data["prev_close"]) / data["prev_close"]) * 100
+                if gap > -params.get("gap_threshold", 5.0):
+                    return None
+                signals.append(f"갭하락 {gap:.1f}%")
+
+            if "Volume Surge" in selected_filters:
+                if len(data["volumes"]) >= 5:
+                    avg_vol = sum(data["volumes"][-5:]) / 5
+                    if data["volume"] < avg_vol * params.get("vol_ratio", 2.0):
+                        return None
+                    signals.append("거래량 급증")
+
+            return {
+                "섹터": sector,
+                "종목코드": code,
+                "종목명": name,
+                "현재가": int(data["current"]),
+                "등락율": f"{round(((data['current'] - data['prev_close']) / data['prev_close']) * 100, 2)}%",
+                "RSI": f"{rsi:.1f}",
+                "MACD": f"{macd:.2f}",
+                "Signal": f"{sig:.2f}",
+                "매매신호": " | ".join(signals) if signals else "-",
+                "거래량": int(data["volume"]),
+            }
+        except Exception:
+            return None
+
+
+# =============================
+# 화면 없이 쓰는 진입점
+# =============================
+def load_stock_db(path: str | None = None):
+    """
+    정규화된 종목 DB (종목코드 6자리, 섹터, 검색키 포함)
+    path 가 없으면 레포의 krx_stock_list.csv, 그것도 없으면 내장 최소 DB
+    """
+    import pandas as pd
+    import stock_universe
+
+    path = path or REPO_STOCK_DB
+    if os.path.exists(path):
+        return stock_universe.build_universe(pd.read_csv(path))
+    print(f"[WARNING] Stock DB not found: {path} (using embedded list)")
+    return stock_universe.load_embedded_universe()
+
+
+class ConditionEvaluator:
+    """
+    screening 의 evaluate 콜백 (check_conditions + 선택한 필터/파라미터)
+    클로저와 달리 pickle 가능 → 프로세스 풀 평가(processes)에 그대로 넘길 수 있음
+    check_conditions 는 시세 출처를 쓰지 않으므로 빈 StockScreener 로 평가
+    """
+
+    def __init__(self, filters, params=None):
+        self.filters = list(filters)
+        self.params = dict(params or {})
+
+    def __call__(self, code, name, sector, data, ind):
+        return _evaluator_screener().check_conditions(code, name, sector, data, self.filters, self.params, ind=ind)
+
+
+_plain_screener = None
+
+
+def _evaluator_screener() -> StockScreener:
+    global _plain_screener
+    if _plain_screener is None:
+        _plain_screener = StockScreener()
+    return _plain_screener
+
+
+def screen(screener: StockScreener, stocks, filters, params=None, max_workers=screening.DEFAULT_MAX_WORKERS,
+           on_event=None, processes=None):
+    """
+    stocks: [(종목코드, 종목명, 섹터), ...]
+    processes: 업로드/스냅샷 시세 평가 프로세스 수 (None 이면 현재 스레드, 0 이면 코어 수)
+    반환: (조건 충족 행 목록, 데이터 없는 종목 목록) — 업로드/스냅샷 시세는 배치로 먼저 평가
+    """
+    return screening.screen_stocks(
+        stocks,
+        fetch=screener.get_stock_data,
+        evaluate=ConditionEvaluator(filters, params),
+        max_workers=max_workers,
+        preloaded={**screener.snapshot, **screener.offline},
+        on_event=on_event,
+        processes=processes,
+    )
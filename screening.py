@@ -0,0 +1,254 @@
+"""
+일괄 스크리닝 오케스트레이터
+
+- 시세 수집(네트워크 대기)을 제한된 스레드 풀에서 동시에 처리
+- 끝난 종목부터 결과를 바로 흘려보냄(제너레이터) → UI 표에 즉시 반영
+- 이미 메모리에 있는 시세(오프라인 업로드 등)는 배치 지표 엔진으로 한 번에 평가
+  (processes 를 주면 parallel_eval 로 여러 프로세스에 나눠 평가)
+- Streamlit 없이 일반 파이썬에서도 그대로 사용 가능
+- ScreeningJob: 백그라운드 스레드 실행 + 진행률 / 취소 / 시간 제한 (전체 시장 스크리닝용)
+
+사용 예 (일반 파이썬):
+    screener = ...  # fetch(code) -> dict | None 를 제공하는 객체
+    matches, missing = screen_stocks(
+        [("005930", "삼성전자", "기타")],
+        fetch=screener.get_stock_data,
+        evaluate=lambda code, name, sector, data, ind: {...} or None,
+        max_workers=8,
+    )
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import indicators
+import metrics
+
+DEFAULT_MAX_WORKERS = 8
+
+MATCH = "match"
+NO_MATCH = "no_match"
+NO_DATA = "no_data"
+ERROR = "error"
+
+
+class ScreenEvent:
+    """종목 하나의 스크리닝 결과"""
+
+    __slots__ = ("code", "name", "sector", "status", "row", "error")
+
+    def __init__(self, code, name, sector, status, row=None, error=None):
+        self.code = code
+        self.name = name
+        self.sector = sector
+        self.status = status
+        self.row = row
+        self.error = error
+
+    def __repr__(self):
+        return f"ScreenEvent({self.code}, {self.status})"
+
+
+def _evaluate(evaluate, code, name, sector, data, bundle) -> ScreenEvent:
+    try:
+        with metrics.span("filter"):
+            row = evaluate(code, name, sector, data, bundle.row())
+    except Exception as e:
+        return ScreenEvent(code, name, sector, ERROR, error=e)
+    if row:
+        return ScreenEvent(code, name, sector, MATCH, row=row)
+    return ScreenEvent(code, name, sector, NO_MATCH)
+
+
+def _fetch_and_evaluate(fetch, evaluate, code, name, sector) -> ScreenEvent:
+    try:
+        data = fetch(code)
+    except Exception as e:
+        return ScreenEvent(code, name, sector, ERROR, error=e)
+    if not data:
+        return ScreenEvent(code, name, sector, NO_DATA)
+    try:
+        with metrics.span("indicators"):
+            bundle = indicators.source_for(code, data)
+    except Exception as e:
+        return ScreenEvent(code, name, sector, ERROR, error=e)
+    return _evaluate(evaluate, code, name, sector, data, bundle)
+
+
+def iter_screening(stocks, fetch, evaluate, max_workers=DEFAULT_MAX_WORKERS, preloaded=None, initializer=None,
+                   cancel_event=None, processes=None, deadline=None):
+    """
+    stocks: [(종목코드, 종목명, 섹터), ...]
+    fetch: code -> 시세 dict | None (스레드에서 호출됨)
+    evaluate: (code, name, sector, data, ind) -> 결과 행 | None
+    preloaded: {code: 시세 dict} 이미 있는 시세 (네트워크 없이 배치로 먼저 평가)
+    initializer: 워커 스레드 시작 시 호출 (Streamlit 컨텍스트 연결 등)
+    cancel_event: threading.Event — set 되면 아직 시작 안 한 종목은 버리고 종료
+    processes: preloaded 평가에 쓸 프로세스 수 (None 이면 현재 스레드, 0 이면 코어 수)
+               — evaluate 가 pickle 가능해야 함 (parallel_eval 참고)
+    deadline: 마감 시각(time.time() 기준) — 지나면 취소와 같이 종료. 결과를 기다리는 0.5초마다 확인하므로
+              응답 없는 수집이 있어도 마감 직후 끝남 (이미 돌고 있는 수집은 기다리지 않고 버림)
+
+    끝나는 순서대로 ScreenEvent 를 yield 한다.
+    """
+    preloaded = preloaded or {}
+    ready = [(c, n, s) for c, n, s in stocks if c in preloaded]
+    pending = [(c, n, s) for c, n, s in stocks if c not in preloaded]
+
+    def cancelled():
+        if deadline is not None and time.time() >= deadline:
+            return True
+        return cancel_event is not None and cancel_event.is_set()
+
+    # 1) 이미 있는 시세: 지표를 배치로 한 번에
+    if ready and processes is not None:
+        import parallel_eval
+
+        yield from parallel_eval.iter_evaluate(ready, preloaded, evaluate, processes=processes or None,
+                                               cancelled=cancelled)
+        if cancelled():
+            return
+    elif ready:
+        with metrics.span("indicators"):
+            bundles = indicators.get_bundles([(c, preloaded[c]["close_prices"]) for c, _, _ in ready])
+        for (code, name, sector), bundle in zip(ready, bundles):
+            if cancelled():
+                return
+            yield _evaluate(evaluate, code, name, sector, preloaded[code], bundle)
+
+    # 2) 나머지: 제한된 스레드 풀에서 수집 + 평가
+    if not pending or cancelled():
+        return
+    workers = max(1, min(int(max_workers), len(pending)))
+    pool = ThreadPoolExecutor(max_workers=workers, initializer=initializer)
+    futures = {pool.submit(_fetch_and_evaluate, fetch, evaluate, c, n, s) for c, n, s in pending}
+    try:
+        while futures:
+            done, futures = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+            if cancelled():
+                return
+    finally:
+        # 취소/마감이면 시작 안 한 종목은 버리고, 멈춘 수집이 끝나기를 기다리지 않음
+        pool.shutdown(wait=not futures, cancel_futures=True)
+
+
+def screen_stocks(stocks, fetch, evaluate, max_workers=DEFAULT_MAX_WORKERS, preloaded=None, on_event=None,
+                  processes=None):
+    """
+    iter_screening 을 끝까지 돌려서 (조건 충족 행 목록, 데이터 없는 종목 목록)을 반환.
+    on_event 가 있으면 이벤트마다 호출 (진행률 표시용)
+    """
+    matches, missing = [], []
+    events = iter_screening(stocks, fetch, evaluate, max_workers=max_workers, preloaded=preloaded,
+                            processes=processes)
+    for event in events:
+        if event.status == MATCH:
+            matches.append(event.row)
+        elif event.status == NO_DATA:
+            missing.append((event.code, event.name))
+        if on_event is not None:
+            on_event(event)
+    return matches, missing
+
+
+# =============================
+# 백그라운드 스크리닝 작업
+# =============================
+class ScreeningJob:
+    """
+    iter_screening 을 백그라운드 스레드에서 돌리는 작업
+    - done / total / results / missing 으로 진행 상황 조회 (UI 가 주기적으로 읽음)
+    - cancel() 로 취소, time_budget(초)을 넘기면 남은 종목을 버리고 종료
+      (마감은 iter_screening 안에서 확인 → 결과가 안 와도 마감 직후 TIMEOUT)
+    """
+
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    TIMEOUT = "timeout"
+    FAILED = "failed"
+
+    def __init__(self, stocks, fetch, evaluate, max_workers=DEFAULT_MAX_WORKERS, preloaded=None,
+                 initializer=None, time_budget=None, processes=None):
+        self.stocks = list(stocks)
+        self.total = len(self.stocks)
+        self.fetch = fetch
+        self.evaluate = evaluate
+        self.max_workers = max_workers
+        self.preloaded = preloaded
+        self.initializer = initializer
+        self.time_budget = time_budget
+        self.processes = processes
+
+        self.done = 0
+        self.results = []
+        self.missing = []
+        self.errors = 0
+        self.status = None
+        self.started_at = None
+        self.finished_at = None
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self) -> "ScreeningJob":
+        self.status = self.RUNNING
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="screening-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        deadline = self.started_at + self.time_budget if self.time_budget else None
+        status = self.DONE
+        try:
+            events = iter_screening(
+                self.stocks, self.fetch, self.evaluate,
+                max_workers=self.max_workers, preloaded=self.preloaded,
+                initializer=self.initializer, cancel_event=self._cancel, processes=self.processes,
+                deadline=deadline,
+            )
+            for event in events:
+                with self._lock:
+                    self.done += 1
+                    if event.status == MATCH:
+                        self.results.append(event.row)
+                    elif event.status == NO_DATA:
+                        self.missing.append((event.code, event.name))
+                    elif event.status == ERROR:
+                        self.errors += 1
+            if self._cancel.is_set():
+                status = self.CANCELLED
+            elif self.done < self.total and deadline is not None and time.time() >= deadline:
+                status = self.TIMEOUT
+        except Exception as e:
+            print(f"[ERROR] Screening job failed: {e}")
+            status = self.FAILED
+        self.finished_at = time.time()
+        self.status = status
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self.status == self.RUNNING
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def snapshot(self) -> tuple[int, list, list]:
+        """(처리 개수, 결과 행 복사본, 데이터 없는 종목 복사본)"""
+        with self._lock:
+            return self.done, list(self.results), list(self.missing)
+
+    def wait(self, timeout=None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
@@ -0,0 +1,80 @@
+"""
+회사명/업종 키워드 기반 섹터 분류 규칙
+
+규칙 표(SECTOR_RULES)를 위에서부터 순서대로 적용합니다 (먼저 맞는 규칙이 우선).
+규칙마다 키워드를 정규식 하나로 컴파일해 두고, 종목 전체 컬럼에 str.contains 로 한 번에 적용
+→ 행마다 any(k in name ...) 를 도는 apply 대신 규칙 수만큼의 벡터 연산
+
+- 회사명은 대문자로 바꿔 비교, 업종명은 그대로 비교 (기존 classify_sector 와 동일)
+- 어느 규칙에도 안 맞으면 업종명(없거나 'nan' 이면 '기타')
+- update_stock_list.py 와 앱(업로드 종목 DB 재분류)이 같이 사용
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+NAME = "name"            # 회사명에서만 찾음
+NAME_OR_INDUSTRY = "both"  # 회사명 또는 업종명에서 찾음
+
+DEFAULT_SECTOR = "기타"
+
+# (섹터, 검사 대상, 키워드) — 순서가 우선순위
+SECTOR_RULES = [
+    ("AI", NAME, ["NAVER", "네이버", "카카오", "NC", "엔씨", "넥슨", "크래프톤", "펄어비스", "위메이드", "넷마블", "SDS"]),
+    ("의약품", NAME_OR_INDUSTRY, ["바이오", "제약", "셀트리온", "팜", "메디", "의약", "알테오젠", "휴젤", "유한", "한미약품", "종근당"]),
+    ("양자컴퓨터", NAME_OR_INDUSTRY, ["삼성전자", "SK하이닉스", "하이닉스", "반도체", "DB하이텍", "한미반도체", "ISC", "주성엔지니어링"]),
+    ("2차전지", NAME_OR_INDUSTRY, ["LG에너지", "삼성SDI", "SDI", "에코프로", "포스코퓨처", "2차전지", "배터리", "양극재"]),
+    ("로봇", NAME, ["로봇"]),
+    ("우주항공", NAME, ["에어로스페이스", "인텔리안", "넥스원", "항공", "우주"]),
+    ("전기차", NAME, ["현대차", "기아", "전기차", "EV"]),
+]
+
+
+class SectorClassifier:
+    """규칙 표를 규칙별 정규식으로 컴파일해 둔 분류기"""
+
+    def __init__(self, rules=SECTOR_RULES, default: str = DEFAULT_SECTOR):
+        self.default = default
+        self.rules = [
+            (sector, target, re.compile("|".join(map(re.escape, keywords))))
+            for sector, target, keywords in rules
+        ]
+
+    def classify(self, names, industries=None) -> pd.Series:
+        """
+        names: 회사명 Series, industries: 업종명 Series (없으면 빈 값)
+        반환: 섹터 Series (names 와 같은 index)
+        """
+        names = pd.Series(names, dtype=object)
+        upper = names.astype(str).str.upper()
+        if industries is None:
+            industry = pd.Series("", index=names.index, dtype=object)
+        else:
+            industry = pd.Series(industries, index=names.index, dtype=object).astype(str)
+
+        conditions, choices = [], []
+        for sector, target, pattern in self.rules:
+            hit = upper.str.contains(pattern, regex=True).to_numpy()
+            if target == NAME_OR_INDUSTRY:
+                hit |= industry.str.contains(pattern, regex=True).to_numpy()
+            conditions.append(hit)
+            choices.append(sector)
+
+        fallback = industry.where((industry != "") & (industry != "nan"), self.default).to_numpy()
+        return pd.Series(np.select(conditions, choices, default=fallback), index=names.index, dtype=object)
+
+
+_classifier = None
+
+
+def get_classifier() -> SectorClassifier:
+    """기본 규칙 표 분류기 (처음 호출 시 컴파일)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = SectorClassifier()
+    return _classifier
+
+
+def classify_sectors(names, industries=None) -> pd.Series:
+    return get_classifier().classify(names, industries)
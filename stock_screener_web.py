@@ -1,11 +1,31 @@
+# Streamlit 화면 (로그인, 사이드바, 탭) — 수집·지표·필터 로직은 screener_core.py
 import streamlit as st
 import pandas as pd
-import requests
 import hashlib
+import os
+import threading
 import time
-import numpy as np
-from io import StringIO
 from datetime import datetime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import cache_warmer
+import krx_snapshot
+import metrics
+import ohlcv_import
+import price_archive
+import price_store
+import screening
+import stock_search
+import stock_universe
+from screener_core import AVAILABLE_FILTERS, REPO_STOCK_DB, ConditionEvaluator, StockScreener, parse_ohlcv_csv
+from stock_universe import EMBEDDED_MINI_CSV, normalize_stock_db
+
+# 설정하면 실행마다 Prometheus 텍스트를 이 파일에 기록 (node_exporter textfile collector 용)
+METRICS_TEXTFILE = os.environ.get("METRICS_TEXTFILE")
+# 이 파일(price_archive.py build 로 생성)이 있으면 시작 시 오프라인 시세로 등록 (memmap, 파싱 없음)
+PRICE_ARCHIVE_PATH = os.environ.get("PRICE_ARCHIVE_PATH", "price_archive.pxa")
+# 설정하면 전체 시장 스크리닝에서 업로드/스냅샷 시세를 이 수만큼 프로세스로 나눠 평가 (0 = 코어 수)
+SCREEN_PROCESSES = os.environ.get("SCREEN_PROCESSES")
 
 # =============================
 # 보안 및 설정
@@ -32,473 +52,205 @@ def check_password():
     return True
 
 
-# =============================
-# (옵션) 최소 내장 DB (CSV 없을 때도 앱은 뜨게)
-# =============================
-EMBEDDED_MINI_CSV = """
-회사명,종목코드,섹터
-삼성전자,005930,기타
-SK하이닉스,000660,기타
-NAVER,035420,AI
-네이버,035420,AI
-카카오,035720,AI
-셀트리온,068270,의약품
-삼성바이오로직스,207940,의약품
-현대차,005380,기타
-기아,000270,기타
-휴림로봇,090710,로봇
-""".strip()
-
-
 # =============================
 # 종목 DB 로딩 (완전 안정형)
-# - 1순위: 레포 내 파일 krx_stock_list.csv
-# - 2순위: 앱에서 업로드한 CSV (세션 유지)
+# - 1순위: 앱에서 업로드한 CSV (세션 유지)
+# - 2순위: 레포 내 파일 krx_stock_list.csv
 # - 3순위: 내장 최소 CSV
+# 정규화된 유니버스는 소스 버전(파일 mtime/크기, 업로드 해시)별로 한 번만 만들고
+# 모든 rerun·세션이 공유 (st.cache_resource)
 # =============================
-@st.cache_data(ttl=60 * 60 * 24)
-def load_stock_db_from_repo(filepath: str = "krx_stock_list.csv") -> pd.DataFrame | None:
-    try:
-        df = pd.read_csv(filepath)
-        return df
-    except Exception:
-        return None
-
-
-def normalize_stock_db(df: pd.DataFrame) -> pd.DataFrame:
+@st.cache_resource(max_entries=8)
+def load_universe(source: str, version: str, _df: pd.DataFrame | None = None) -> pd.DataFrame:
     """
-    요구 컬럼: 회사명, 종목코드, (선택) 섹터
+    source: "upload" / "repo" / "embedded", version: 소스 버전 문자열
+    (_df 는 해시하지 않음 — 업로드 DB 원본)
     """
-    df = df.copy()
-
-    # 다양한 컬럼명을 허용하고 표준화
-    col_map = {}
-    lower_cols = {c.lower(): c for c in df.columns}
-
-    # 회사명 후보
-    for cand in ["회사명", "name", "corp_name", "company", "companyname"]:
-        if cand.lower() in lower_cols:
-            col_map[lower_cols[cand.lower()]] = "회사명"
-            break
-
-    # 종목코드 후보
-    for cand in ["종목코드", "code", "symbol", "ticker", "stock_code"]:
-        if cand.lower() in lower_cols:
-            col_map[lower_cols[cand.lower()]] = "종목코드"
-            break
-
-    # 섹터 후보(없으면 생성)
-    for cand in ["섹터", "sector", "업종", "industry"]:
-        if cand.lower() in lower_cols:
-            col_map[lower_cols[cand.lower()]] = "섹터"
-            break
-
-    df = df.rename(columns=col_map)
-
-    # 필수 컬럼 확인
-    if "회사명" not in df.columns or "종목코드" not in df.columns:
-        raise ValueError("CSV에 '회사명'과 '종목코드' 컬럼이 필요합니다.")
-
-    if "섹터" not in df.columns:
-        df["섹터"] = "기타"
-
-    df["회사명"] = df["회사명"].astype(str).str.strip()
-    df["종목코드"] = df["종목코드"].astype(str).str.extract(r"(\d+)")[0].fillna(df["종목코드"].astype(str))
-    df["종목코드"] = df["종목코드"].astype(str).str.zfill(6)
-    df["섹터"] = df["섹터"].astype(str).fillna("기타")
+    print(f"[INFO] Building stock universe: {source} ({version})")
+    if source == "repo":
+        return stock_universe.build_universe(pd.read_csv(REPO_STOCK_DB))
+    if source == "upload":
+        return stock_universe.build_universe(_df)
+    return stock_universe.load_embedded_universe()
 
-    df = df.dropna(subset=["회사명", "종목코드"]).drop_duplicates(subset=["종목코드"]).reset_index(drop=True)
-    return df
 
-
-def get_stock_db() -> pd.DataFrame:
+def resolve_universe() -> tuple[str, str, pd.DataFrame]:
+    """(소스, 버전, 유니버스) — 검색 인덱스도 같은 (소스, 버전)으로 캐시"""
     # 1) 세션 업로드 DB
     if "uploaded_stock_db" in st.session_state and isinstance(st.session_state.uploaded_stock_db, pd.DataFrame):
         try:
-            return normalize_stock_db(st.session_state.uploaded_stock_db)
+            version = st.session_state.get("uploaded_stock_db_version", "unknown")
+            return "upload", version, load_universe("upload", version, _df=st.session_state.uploaded_stock_db)
         except Exception:
             pass
 
     # 2) 레포 파일 DB
-    repo_df = load_stock_db_from_repo("krx_stock_list.csv")
-    if repo_df is not None and not repo_df.empty:
+    version = stock_universe.file_version(REPO_STOCK_DB)
+    if version is not None:
         try:
-            return normalize_stock_db(repo_df)
+            df = load_universe("repo", version)
+            if not df.empty:
+                return "repo", version, df
         except Exception:
             pass
 
     # 3) 내장 미니 DB
-    df = pd.read_csv(StringIO(EMBEDDED_MINI_CSV))
-    return normalize_stock_db(df)
+    return "embedded", "embedded", load_universe("embedded", "embedded")
+
+
+def get_stock_db() -> pd.DataFrame:
+    return resolve_universe()[2]
+
+
+@st.cache_resource(max_entries=8)
+def load_search_index(source: str, version: str, _universe: pd.DataFrame) -> stock_search.StockSearchIndex:
+    """유니버스 버전별 검색 인덱스 (초성·별칭·오타 허용)"""
+    return stock_search.StockSearchIndex(_universe)
 
 
 def search_candidates(query: str, limit: int = 20) -> pd.DataFrame:
-    df = get_stock_db()
+    source, version, df = resolve_universe()
     q = (query or "").strip()
     if not q:
         return df.head(0)
-
-    q2 = q.replace(" ", "").upper()
-    name_norm = df["회사명"].astype(str).str.replace(" ", "", regex=False).str.upper()
-
-    exact = df[name_norm == q2]
-    if not exact.empty:
-        return exact.head(limit)
-
-    part = df[name_norm.str.contains(q2, na=False)]
-    return part.head(limit)
+    return load_search_index(source, version, df).search_frame(q, limit)
 
 
 # =============================
-# (완전 안정형) 시세 데이터: 라이브 + 업로드(오프라인)
+# 시세 데이터 (수집·분석 로직은 screener_core — 여기는 Streamlit 캐시/세션 연결만)
 # =============================
-def safe_get(url, params=None, headers=None, timeout=10, retries=2, sleep=0.3):
-    last_exc = None
-    for _ in range(retries + 1):
-        try:
-            r = requests.get(url, params=params, headers=headers, timeout=timeout)
-            r.raise_for_status()
-            return r
-        except Exception as e:
-            last_exc = e
-            time.sleep(sleep)
-    raise last_exc
-
-
-def parse_ohlcv_csv(file) -> dict | None:
+@st.cache_data(ttl=60 * 60)
+def load_market_snapshot(days: int) -> dict:
     """
-    업로드 OHLCV CSV 지원
-    컬럼 후보:
-    - date/날짜
-    - open/시가
-    - close/종가
-    - volume/거래량
-    (필수: close, volume)
+    KRX 전종목 일별 스냅샷 days 일치 → {code: 시세 dict}
+    (요청 수가 종목 수와 무관하게 ≈ days)
     """
+    return krx_snapshot.load_market_histories(days=days)
+
+
+@st.cache_resource
+def load_price_archive(path: str, mtime: float) -> price_archive.PriceArchive | None:
+    """바이너리 시세 아카이브 (프로세스 공용 memmap, 파일이 바뀌면 mtime 으로 다시 열기)"""
     try:
-        df = pd.read_csv(file)
-        print(f"[INFO] Parsing OHLCV CSV: {file.name if hasattr(file, 'name') else 'unknown'}")
-        print(f"[INFO] Columns found: {df.columns.tolist()}")
-
-        # 컬럼 표준화
-        cols = {c.lower(): c for c in df.columns}
-        def pick(*names):
-            for n in names:
-                if n in cols:
-                    return cols[n]
-            return None
-
-        c_date = pick("date", "날짜")
-        c_open = pick("open", "시가")
-        c_close = pick("close", "종가")
-        c_vol = pick("volume", "거래량")
-
-        if c_close is None or c_vol is None:
-            print(f"[ERROR] Missing required columns. Need 'close' and 'volume'")
-            return None
-
-        print(f"[INFO] Mapped columns - close: {c_close}, volume: {c_vol}, open: {c_open}, date: {c_date}")
-
-        # 날짜 정렬(있으면)
-        if c_date is not None:
-            df[c_date] = pd.to_datetime(df[c_date], errors="coerce")
-            df = df.dropna(subset=[c_date]).sort_values(c_date)
-
-        closes = df[c_close].astype(float).tolist()
-        vols = df[c_vol].astype(float).tolist()
-
-        if len(closes) < 35:  # MACD 계산 최소 길이
-            print(f"[ERROR] Not enough data rows: {len(closes)} (need at least 35)")
-            return None
-
-        current = float(closes[-1])
-        prev_close = float(closes[-2])
-        volume = float(vols[-1])
-
-        if c_open is not None:
-            openp = float(df[c_open].astype(float).iloc[-1])
-        else:
-            openp = prev_close  # open이 없으면 대충 prev_close로
-
-        print(f"[SUCCESS] OHLCV parsed successfully. Rows: {len(closes)}, Current: {current}")
-        return {
-            "current": current,
-            "open": openp,
-            "prev_close": prev_close,
-            "volume": volume,
-            "close_prices": closes,
-            "volumes": vols,
-        }
-    except Exception as e:
-        print(f"[ERROR] Failed to parse OHLCV CSV: {str(e)}")
+        archive = price_archive.PriceArchive(path)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Price archive load failed: {e}")
         return None
+    print(f"[INFO] {archive}")
+    return archive
 
 
-class StockScreener:
-    def __init__(self):
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Referer": "https://finance.naver.com/",
-        }
-
-    @st.cache_data(ttl=600)
-    def get_stock_data_live(_self, code: str) -> dict | None:
-        """
-        네이버 금융(라이브) - Streamlit Cloud에서 막힐 수 있음
-        """
-        all_data = []
-        try:
-            for page in range(1, 4):
-                url = "https://finance.naver.com/item/sise_day.naver"
-                r = safe_get(url, params={"code": code, "page": page}, headers=_self.headers, timeout=12, retries=1)
-                df_list = pd.read_html(r.text)
-                if not df_list:
-                    break
-                df = df_list[0].dropna()
-                if df.empty:
-                    break
-                all_data.append(df)
-                time.sleep(0.1)
-
-            if not all_data:
-                return None
-
-            combined = pd.concat(all_data, ignore_index=True).sort_values("날짜").reset_index(drop=True)
-            if len(combined) < 35:
-                return None
-
-            closes = combined["종가"].astype(float).tolist()
-            vols = combined["거래량"].astype(float).tolist()
-
-            return {
-                "current": float(combined.iloc[-1]["종가"]),
-                "open": float(combined.iloc[-1]["시가"]),
-                "prev_close": float(combined.iloc[-2]["종가"]),
-                "volume": float(combined.iloc[-1]["거래량"]),
-                "close_prices": closes,
-                "volumes": vols,
-            }
-        except Exception as e:
-            print(f"[ERROR] Live data fetch failed ({code}): {str(e)}")
-            return None
-
-    def get_stock_data(self, code: str) -> dict | None:
-        """
-        완전 안정형:
-        1) 업로드된 오프라인 데이터가 있으면 그걸 우선
-        2) 없으면 라이브 시도
-        """
-        # 오프라인 데이터 확인 (더 명확한 로깅)
-        offline_map = st.session_state.get("offline_price_data", {})
-        if isinstance(offline_map, dict) and code in offline_map:
-            print(f"[INFO] Using offline data: {code}")
-            return offline_map[code]
-
-        # 라이브 시도
-        print(f"[INFO] Attempting live data fetch: {code}")
-        live_data = self.get_stock_data_live(code)
-        if live_data:
-            print(f"[SUCCESS] Live data fetch successful: {code}")
-        else:
-            print(f"[WARNING] Live data fetch failed: {code}")
-        return live_data
-
-    def calculate_rsi(self, prices, period=14):
-        if len(prices) < period + 1:
-            return None
-        s = pd.Series(prices)
-        d = s.diff()
-        gain = (d.where(d > 0, 0)).rolling(window=period).mean()
-        loss = (-d.where(d < 0, 0)).rolling(window=period).mean()
-        loss_val = loss.iloc[-1]
-        if loss_val == 0:
-            return 100.0
-        rs = gain.iloc[-1] / loss_val
-        return float(100 - (100 / (1 + rs)))
-
-    def calculate_macd(self, prices, fast=12, slow=26, signal=9):
-        if len(prices) < slow + signal:
-            return None, None, None
-        s = pd.Series(prices)
-        ema_fast = s.ewm(span=fast, adjust=False).mean()
-        ema_slow = s.ewm(span=slow, adjust=False).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        hist = macd_line - signal_line
-        return float(macd_line.iloc[-1]), float(signal_line.iloc[-1]), float(hist.iloc[-1])
-
-    def check_macd_crossover(self, prices):
-        if len(prices) < 35:
-            return None
-        s = pd.Series(prices)
-        ema_fast = s.ewm(span=12, adjust=False).mean()
-        ema_slow = s.ewm(span=26, adjust=False).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        macd_current = macd_line.iloc[-1]
-        macd_prev = macd_line.iloc[-2]
-        sig_current = signal_line.iloc[-1]
-        sig_prev = signal_line.iloc[-2]
-
-        if macd_prev <= sig_prev and macd_current > sig_current:
-            return "골든크로스"
-        if macd_prev >= sig_prev and macd_current < sig_current:
-            return "데드크로스"
+def get_price_archive() -> price_archive.PriceArchive | None:
+    if not os.path.exists(PRICE_ARCHIVE_PATH):
         return None
+    return load_price_archive(PRICE_ARCHIVE_PATH, os.path.getmtime(PRICE_ARCHIVE_PATH))
 
-    def analyze_stock(self, code, name, sector, data):
-        try:
-            prices = data["close_prices"]
-
-            rsi = self.calculate_rsi(prices)
-            if rsi is None:
-                return None
-
-            macd, sig, hist = self.calculate_macd(prices)
-            if macd is None:
-                return None
-
-            cross = self.check_macd_crossover(prices)
-            gap = ((data["open"] - data["prev_close"]) / data["prev_close"]) * 100
-
-            volume_surge = False
-            if len(data["volumes"]) >= 5:
-                avg_vol = sum(data["volumes"][-5:]) / 5
-                if data["volume"] >= avg_vol * 2.0:
-                    volume_surge = True
-
-            signals = []
-            recommendation = "관망"
-            rec_color = "🟡"
-
-            if rsi <= 30 and cross == "골든크로스":
-                signals.append("⭐ 강력 매수 신호 (RSI 과매도 + 골든크로스)")
-                recommendation = "적극 매수"
-                rec_color = "🟢"
-            elif rsi <= 30:
-                signals.append("RSI 과매도 (반등 가능성)")
-                recommendation = "매수 고려"
-                rec_color = "🟢"
-            elif cross == "골든크로스":
-                signals.append("MACD 골든크로스 (상승 전환)")
-                recommendation = "매수 고려"
-                rec_color = "🟢"
-            elif macd > 0 and rsi < 70:
-                signals.append("상승 추세 지속 (MACD > 0)")
-                recommendation = "보유/추가 매수"
-                rec_color = "🟢"
-
-            if rsi >= 70:
-                signals.append("RSI 과매수 (조정 가능성)")
-                recommendation = "매도 고려"
-                rec_color = "🔴"
-            if cross == "데드크로스":
-                signals.append("MACD 데드크로스 (하락 전환)")
-                recommendation = "매도 고려"
-                rec_color = "🔴"
-
-            if gap < -3:
-                signals.append(f"갭 하락 {gap:.1f}%")
-            if volume_surge:
-                signals.append("거래량 급증 (최근 5일 평균 대비 2배↑)")
-            if macd > 0:
-                signals.append("MACD 0선 상단 (강세)")
-
-            return {
-                "sector": sector,
-                "code": code,
-                "name": name,
-                "current": data["current"],
-                "change": ((data["current"] - data["prev_close"]) / data["prev_close"]) * 100,
-                "rsi": rsi,
-                "macd": macd,
-                "signal": sig,
-                "macd_cross": cross,
-                "gap": gap,
-                "volume": data["volume"],
-                "signals": signals,
-                "recommendation": recommendation,
-                "recommendation_color": rec_color,
-            }
-        except Exception:
-            return None
 
-    def check_conditions(self, code, name, sector, data, selected_filters, params):
-        try:
-            prices = data["close_prices"]
-
-            rsi = self.calculate_rsi(prices)
-            if rsi is None:
-                return None
-
-            macd, sig, hist = self.calculate_macd(prices)
-            if macd is None:
-                return None
-
-            cross = self.check_macd_crossover(prices)
-            signals = []
-
-            if "RSI 과매도 (30 이하)" in selected_filters:
-                if rsi > 30:
-                    return None
-                signals.append("RSI 과매도")
-
-            if "RSI 과매수 (70 이상)" in selected_filters:
-                if rsi < 70:
-                    return None
-                signals.append("RSI 과매수")
-
-            if "MACD 골든크로스" in selected_filters:
-                if cross != "골든크로스":
-                    return None
-                signals.append("MACD 골든크로스")
-
-            if "MACD 데드크로스" in selected_filters:
-                if cross != "데드크로스":
-                    return None
-                signals.append("MACD 데드크로스")
-
-            if "MACD 0선 돌파" in selected_filters:
-                if macd <= 0:
-                    return None
-                signals.append("MACD 0선 돌파")
-
-            if "RSI 과매도 + MACD 골든크로스 (강력 매수)" in selected_filters:
-                if not (rsi <= 30 and cross == "골든크로스"):
-                    return None
-                signals.append("⭐ 강력 매수 신호")
-
-            if "Gap Down" in selected_filters:
-                gap = ((data["open"] - data["prev_close"]) / data["prev_close"]) * 100
-                if gap > -params.get("gap_threshold", 5.0):
-                    return None
-                signals.append(f"갭하락 {gap:.1f}%")
-
-            if "Volume Surge" in selected_filters:
-                if len(data["volumes"]) >= 5:
-                    avg_vol = sum(data["volumes"][-5:]) / 5
-                    if data["volume"] < avg_vol * params.get("vol_ratio", 2.0):
-                        return None
-                    signals.append("거래량 급증")
-
-            return {
-                "섹터": sector,
-                "종목코드": code,
-                "종목명": name,
-                "현재가": int(data["current"]),
-                "등락율": f"{round(((data['current'] - data['prev_close']) / data['prev_close']) * 100, 2)}%",
-                "RSI": f"{rsi:.1f}",
-                "MACD": f"{macd:.2f}",
-                "Signal": f"{sig:.2f}",
-                "매매신호": " | ".join(signals) if signals else "-",
-                "거래량": int(data["volume"]),
+def script_ctx_initializer():
+    """
+    워커 스레드 initializer: 현재 스크립트 실행 컨텍스트를 연결해서
+    스레드 안에서도 st.cache_data / session_state 를 쓸 수 있게 한다
+    """
+    ctx = get_script_run_ctx()
+
+    def attach():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    return attach
+
+
+def render_universe_job(was_running: bool):
+    """전체 시장 스크리닝 작업 진행 상황 (실행 중에는 1초마다 부분 갱신)"""
+    job = st.session_state.get("universe_job")
+    if job is None:
+        return
+    if was_running and not job.running:
+        st.rerun()  # 끝나면 전체 갱신 → 주기 갱신 중단
+
+    done, results, missing = job.snapshot()
+    st.progress(done / max(job.total, 1), text=f"{done:,}/{job.total:,} 처리 · {job.elapsed:.0f}초 경과")
+
+    if job.running:
+        st.caption("⏳ 진행 중... (조건에 맞는 종목은 끝나는 순서대로 아래 표에 추가됩니다)")
+    elif job.status == screening.ScreeningJob.CANCELLED:
+        st.warning("⏹️ 사용자가 중지했습니다. (중지 전까지의 결과)")
+    elif job.status == screening.ScreeningJob.TIMEOUT:
+        st.warning("⏱️ 시간 제한을 넘겨 중단했습니다. (제한 전까지의 결과)")
+    elif job.status == screening.ScreeningJob.FAILED:
+        st.error("❌ 스크리닝 중 오류가 발생했습니다.")
+    else:
+        st.success(f"✅ 완료! 조건에 맞는 종목 **{len(results)}개**")
+
+    if missing:
+        st.caption(f"시세 데이터 없음: {len(missing):,}개 종목")
+    if results:
+        with metrics.span("render"):
+            st.dataframe(pd.DataFrame(results), use_container_width=True)
+
+
+def count_preloaded_sources(stocks, offline: dict, market: dict):
+    """스크리닝에 미리 넘기는 시세(업로드/KRX 스냅샷)를 데이터 출처 카운터에 반영"""
+    n_offline = sum(1 for code, _, _ in stocks if code in offline)
+    n_snapshot = sum(1 for code, _, _ in stocks if code not in offline and code in market)
+    if n_offline:
+        metrics.incr("price_source_total", n_offline, source="offline")
+    if n_snapshot:
+        metrics.incr("price_source_total", n_snapshot, source="snapshot")
+
+
+def render_diagnostics():
+    """사이드바 진단 패널: 단계별 시간, 캐시 적중률, 데이터 출처 + JSON / Prometheus 내보내기"""
+    registry = metrics.get_registry()
+    snap = registry.snapshot()
+
+    stages = snap["stages"]
+    if stages:
+        rows = [
+            {
+                "단계": stage,
+                "횟수": s["count"],
+                "합계(s)": round(s["total_seconds"], 3),
+                "평균(ms)": round(s["avg_ms"], 1),
+                "p95(ms)": round(s["p95_ms"], 1),
+                "최대(ms)": round(s["max_ms"], 1),
             }
-        except Exception:
-            return None
+            for stage, s in sorted(stages.items(), key=lambda kv: metrics.STAGES.index(kv[0])
+                                   if kv[0] in metrics.STAGES else len(metrics.STAGES))
+        ]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+    else:
+        st.caption("아직 기록된 단계가 없습니다.")
+
+    caches = {}
+    sources = {}
+    for c in snap["counters"]:
+        if c["name"] == "cache_requests_total":
+            caches.setdefault(c["labels"]["cache"], {"hit": 0, "miss": 0})[c["labels"]["result"]] += c["value"]
+        elif c["name"] == "price_source_total":
+            sources[c["labels"]["source"]] = c["value"]
+    for cache, v in sorted(caches.items()):
+        total = v["hit"] + v["miss"]
+        st.caption(f"캐시 {cache}: 적중 {v['hit']:,} / 미적중 {v['miss']:,} ({v['hit'] / total:.0%})")
+    if sources:
+        st.caption("데이터 출처: " + " · ".join(f"{k} {v:,}" for k, v in sorted(sources.items())))
+
+    warmer = cache_warmer.get_warmer()
+    if warmer.running:
+        last = datetime.fromtimestamp(warmer.last_run_at).strftime("%H:%M:%S") if warmer.last_run_at else "-"
+        st.caption(f"캐시 예열: 대상 {len(warmer.targets()):,}개 · 마지막 확인 {last} (갱신 {warmer.last_refreshed:,}개)")
+    else:
+        st.caption("캐시 예열: 꺼짐 (CACHE_WARMER=0)")
+
+    d1, d2 = st.columns(2)
+    with d1:
+        st.download_button("JSON", registry.to_json(), file_name="screener_metrics.json",
+                           mime="application/json", key="metrics_json", use_container_width=True)
+    with d2:
+        st.download_button("Prometheus", registry.to_prometheus(), file_name="screener_metrics.prom",
+                           mime="text/plain", key="metrics_prom", use_container_width=True)
+    if st.button("계측 초기화", key="metrics_reset"):
+        registry.reset()
+        st.rerun()
 
 
 # =============================
@@ -511,12 +263,15 @@ if "custom_stocks" not in st.session_state:
     st.session_state.custom_stocks = []
 
 if "offline_price_data" not in st.session_state:
-    st.session_state.offline_price_data = {}  # {code: data_dict}
+    # {code: PriceSeries} — 아카이브가 있으면 그 종목들(memmap view)로 시작
+    archive = get_price_archive()
+    st.session_state.offline_price_data = dict(archive) if archive is not None else {}
 
+if "market_price_data" not in st.session_state:
+    st.session_state.market_price_data = {}  # KRX 전종목 스냅샷 {code: PriceSeries}
 
-if check_password():
-    screener = StockScreener()
 
+if check_password():
     with st.sidebar:
         st.success("✅ 로그인 성공!")
         if st.button("로그아웃", key="logout_btn"):
@@ -524,20 +279,9 @@ if check_password():
             st.rerun()
 
         st.header("⚙️ 필터 설정")
-        available_filters = [
-            "RSI 과매도 (30 이하)",
-            "RSI 과매수 (70 이상)",
-            "MACD 골든크로스",
-            "MACD 데드크로스",
-            "MACD 0선 돌파",
-            "RSI 과매도 + MACD 골든크로스 (강력 매수)",
-            "Gap Down",
-            "Volume Surge",
-        ]
-
         selected_filters = st.multiselect(
             "적용할 스크리닝 조건을 선택하세요",
-            options=available_filters,
+            options=AVAILABLE_FILTERS,
             default=["RSI 과매도 (30 이하)"],
             key="selected_filters",
         )
@@ -559,10 +303,20 @@ if check_password():
             type=["csv"],
             key="stock_db_uploader",
         )
+        auto_sector = st.checkbox(
+            "🏷️ 회사명/업종 키워드로 섹터 다시 분류", key="auto_sector",
+            help="업로드한 종목 DB 의 섹터를 규칙 표로 일괄 재분류합니다. (규칙에 안 맞으면 기존 섹터 유지)",
+        )
         if stock_db_file is not None:
             try:
-                df_up = pd.read_csv(stock_db_file)
-                st.session_state.uploaded_stock_db = df_up
+                # 같은 파일(+ 같은 분류 옵션)이면 rerun 마다 다시 파싱하지 않음
+                version = stock_universe.bytes_version(stock_db_file.getvalue()) + ("-sector" if auto_sector else "")
+                if st.session_state.get("uploaded_stock_db_version") != version:
+                    db = pd.read_csv(stock_db_file)
+                    if auto_sector:
+                        db = stock_universe.reclassify_sectors(stock_universe.normalize_stock_db(db, dedupe=False))
+                    st.session_state.uploaded_stock_db = db
+                    st.session_state.uploaded_stock_db_version = version
                 st.success("✅ 종목 DB 업로드 완료! (이 세션에서 즉시 검색에 반영됩니다)")
             except Exception as e:
                 st.error("❌ 종목 DB CSV 파싱 실패")
@@ -574,8 +328,40 @@ if check_password():
         st.subheader("📌 시세 데이터(오프라인) 업로드")
         st.caption("라이브가 막히면, 종목별 OHLCV CSV 업로드로 분석/스크리닝이 가능합니다.")
         st.caption("필수 컬럼: close(또는 종가), volume(또는 거래량). date/날짜 있으면 정렬에 사용.")
+        archive = get_price_archive()
+        if archive is not None:
+            st.caption(f"📦 시세 아카이브 `{PRICE_ARCHIVE_PATH}`: {len(archive):,}개 종목 ({archive.nbytes / 1e6:.1f} MB)")
+        st.divider()
+
+        st.subheader("📌 KRX 전종목 일별 시세")
+        st.caption("거래일마다 전종목 표를 한 번씩 받아 종목별 시계열로 만듭니다. (요청 수 ≈ 조회 일수)")
+        snapshot_days = st.number_input("조회 거래일 수", 35, 250, 60, key="snapshot_days")
+        if st.button("📥 전종목 시세 불러오기", key="load_snapshot"):
+            with st.spinner("KRX 전종목 시세 수집 중..."):
+                st.session_state.market_price_data = load_market_snapshot(int(snapshot_days))
+            if st.session_state.market_price_data:
+                st.success(f"✅ {len(st.session_state.market_price_data):,}개 종목 시세 로드 완료")
+            else:
+                st.error("❌ KRX 시세를 가져오지 못했습니다.")
+        elif st.session_state.market_price_data:
+            st.caption(f"로드된 전종목 시세: {len(st.session_state.market_price_data):,}개 종목")
 
-    tab1, tab2, tab3 = st.tabs(["✏️ 내 종목 추가", "⭐ 관심종목 스크리닝", "🔍 개별 종목 분석"])
+        st.divider()
+        # 이번 실행의 계측까지 보이도록 내용은 화면을 다 그린 뒤(스크립트 끝)에 채움
+        diagnostics_panel = st.expander("🩺 진단 (단계별 시간 · 캐시)")
+
+    # 사이드바에서 스냅샷을 새로 불러왔을 수 있으므로 그 뒤에 생성 (세션 dict 를 그대로 참조)
+    screener = StockScreener(
+        offline=st.session_state.offline_price_data, snapshot=st.session_state.market_price_data
+    )
+    # 관심종목 중 업로드/스냅샷 시세가 없는 종목은 백그라운드에서 라이브 캐시를 미리 채움
+    warmer = cache_warmer.get_warmer()
+    warmer.watch(
+        code for code, _, _ in st.session_state.custom_stocks
+        if code not in st.session_state.offline_price_data and code not in st.session_state.market_price_data
+    )
+
+    tab1, tab2, tab3, tab4 = st.tabs(["✏️ 내 종목 추가", "⭐ 관심종목 스크리닝", "🔍 개별 종목 분석", "🌐 전체 시장 스크리닝"])
 
     # =========================================================
     # Tab1: 내 종목 추가
@@ -583,7 +369,7 @@ if check_password():
     with tab1:
         st.info("기업명을 검색해 관심종목에 추가합니다. (종목 DB는 로컬 CSV 기반으로 안정 동작)")
 
-        query = st.text_input("🔍 기업명 입력", placeholder="예: 휴림로봇, 삼성전자", key="add_query")
+        query = st.text_input("🔍 기업명 입력", placeholder="예: 휴림로봇, 삼성전자, ㅅㅅㅈㅈ, 삼전", key="add_query")
 
         if query:
             cands = search_candidates(query, limit=20)
@@ -615,6 +401,7 @@ if check_password():
 
                 with col2:
                     if st.button("📌 지금 바로 미리 분석", use_container_width=True, key="preview_btn"):
+                        warmer.record_view(code)
                         with st.spinner(f"{name} 데이터 수집 및 분석 중..."):
                             data = screener.get_stock_data(code)
 
@@ -634,6 +421,7 @@ if check_password():
                             if not analysis:
                                 st.error("분석 실패(데이터 부족/계산 오류)")
                             else:
+                                render_started = time.perf_counter()
                                 st.divider()
                                 st.subheader(f"📈 {name} ({code}) 미리 분석")
 
@@ -659,12 +447,13 @@ if check_password():
                                     st.subheader("🎯 감지된 신호")
                                     for s in analysis["signals"]:
                                         st.markdown(f"- {s}")
+                                metrics.observe("render", time.perf_counter() - render_started)
 
         st.divider()
         st.subheader("📌 현재 종목 DB 상태")
         db = get_stock_db()
         st.caption(f"현재 로드된 종목 수: {len(db):,}개")
-        st.dataframe(db.head(30), use_container_width=True)
+        st.dataframe(db[stock_universe.display_columns(db)].head(30), use_container_width=True)
 
     # =========================================================
     # Tab2: 관심종목 스크리닝
@@ -693,55 +482,87 @@ if check_password():
 
             st.divider()
 
-            st.subheader("📎 (옵션) 관심종목 OHLCV 업로드")
-            st.caption("라이브 차단 시, 여기서 업로드해두면 '일괄 스크리닝'이 안정적으로 가능합니다.")
-            up_bulk = st.file_uploader("OHLCV CSV 여러 개 업로드(각 파일은 1종목)", type=["csv"], accept_multiple_files=True, key="bulk_ohlcv")
+            st.subheader("📎 (옵션) OHLCV 일괄 업로드")
+            st.caption(
+                "라이브 차단 시, 여기서 업로드해두면 '일괄 스크리닝'이 안정적으로 가능합니다. "
+                "long 포맷(code, date, open, high, low, close, volume) CSV/Parquet, "
+                "종목별 CSV(파일명에 6자리 종목코드), 또는 그 zip 을 올리면 종목 DB 의 모든 종목에 등록됩니다."
+            )
+            up_bulk = st.file_uploader(
+                "OHLCV 파일 업로드", type=["csv", "parquet", "zip"], accept_multiple_files=True, key="bulk_ohlcv"
+            )
             if up_bulk:
-                loaded = 0
-                for f in up_bulk:
-                    parsed = parse_ohlcv_csv(f)
-                    if parsed:
-                        # 파일명에 코드가 포함되면 그걸 우선으로
-                        # 예: 005930.csv / samsung_005930.csv 등
-                        fname = f.name
-                        found = None
-                        for (code, _, _) in st.session_state.custom_stocks:
-                            if code in fname:
-                                found = code
-                                break
-                        if found:
-                            st.session_state.offline_price_data[found] = parsed
-                            loaded += 1
-                st.success(f"✅ 오프라인 시세 등록 완료: {loaded}개 (파일명에 종목코드가 포함된 경우 자동 매칭)")
+                files = [(f.name, f.getvalue()) for f in up_bulk]
+                version = stock_universe.bytes_version(b"".join(name.encode() + data for name, data in files))
+                # 같은 파일이면 rerun 마다 다시 가져오지 않음
+                if st.session_state.get("bulk_ohlcv_version") != version:
+                    result = ohlcv_import.import_ohlcv(
+                        files, universe_codes=get_stock_db()["종목코드"], store=price_store.get_store()
+                    )
+                    for code, page in result.pages.items():
+                        if len(page) >= 35:  # MACD 계산 최소 길이
+                            st.session_state.offline_price_data[code] = price_store.as_price_data(page).compact()
+                    st.session_state.bulk_ohlcv_version = version
+                    st.session_state.bulk_ohlcv_result = result
+                result = st.session_state.bulk_ohlcv_result
+                st.success(f"✅ 오프라인 시세 등록 완료: {len(result.pages)}개 종목 ({result.rows:,}행)")
+                if result.pages:
+                    # 받은 파일을 PRICE_ARCHIVE_PATH 로 두면 다음 시작부터 CSV 파싱 없이 바로 로드
+                    st.download_button(
+                        "📦 바이너리 시세 아카이브로 받기",
+                        data=lambda: price_archive.archive_bytes(result.pages),
+                        file_name=os.path.basename(PRICE_ARCHIVE_PATH),
+                        mime="application/octet-stream",
+                        key="bulk_ohlcv_archive",
+                    )
+                if result.unknown:
+                    st.warning(f"⚠️ 종목 DB에 없는 종목코드 {len(result.unknown)}개는 건너뜀: {', '.join(result.unknown[:10])}")
+                for name, err in result.errors:
+                    st.error(f"❌ {name}: {err}")
 
             st.divider()
 
+            max_workers = st.slider(
+                "동시 수집 개수", 1, 16, screening.DEFAULT_MAX_WORKERS, key="max_workers",
+                help="라이브 시세를 동시에 가져올 최대 종목 수",
+            )
+
             if st.button("🔍 관심종목 일괄 스크리닝", type="primary", key="bulk_screen"):
                 results = []
                 progress = st.progress(0)
                 status = st.empty()
-
-                total = len(st.session_state.custom_stocks)
-                for i, (code, name, sector) in enumerate(st.session_state.custom_stocks):
-                    status.text(f"분석 중: {name} ({i+1}/{total})")
-                    data = screener.get_stock_data(code)
-
-                    if data:
-                        res = screener.check_conditions(code, name, sector, data, selected_filters, params)
-                        if res:
-                            results.append(res)
-                    else:
-                        st.warning(f"⚠️ {name} ({code}) 데이터 없음 (라이브 차단 또는 업로드 필요)")
-
+                table = st.empty()
+
+                def evaluate(code, name, sector, data, ind):
+                    return screener.check_conditions(code, name, sector, data, selected_filters, params, ind=ind)
+
+                stocks = list(st.session_state.custom_stocks)
+                total = len(stocks)
+                preloaded = {**st.session_state.market_price_data, **st.session_state.offline_price_data}
+                count_preloaded_sources(stocks, st.session_state.offline_price_data, st.session_state.market_price_data)
+                events = screening.iter_screening(
+                    stocks,
+                    fetch=screener.get_stock_data,
+                    evaluate=evaluate,
+                    max_workers=max_workers,
+                    preloaded=preloaded,
+                    initializer=script_ctx_initializer(),
+                )
+                for i, event in enumerate(events):
+                    status.text(f"분석 중: {event.name} ({i+1}/{total})")
+                    if event.status == screening.MATCH:
+                        results.append(event.row)
+                        with metrics.span("render"):
+                            table.dataframe(pd.DataFrame(results), use_container_width=True)
+                    elif event.status == screening.NO_DATA:
+                        st.warning(f"⚠️ {event.name} ({event.code}) 데이터 없음 (라이브 차단 또는 업로드 필요)")
                     progress.progress((i + 1) / total)
-                    time.sleep(0.1)
 
                 status.empty()
                 progress.empty()
 
                 if results:
                     st.success(f"✅ 조건에 맞는 종목 **{len(results)}개**를 찾았습니다!")
-                    st.dataframe(pd.DataFrame(results), use_container_width=True)
                 else:
                     st.warning("⚠️ 조건에 부합하는 종목이 없습니다. (또는 시세 데이터가 없는 종목이 많음)")
 
@@ -781,6 +602,7 @@ if check_password():
                         st.error("❌ OHLCV CSV 형식이 올바르지 않습니다. (close/volume 필수)")
 
                 if st.button("📊 상세 분석 시작", type="primary", key="start_analysis"):
+                    warmer.record_view(code)
                     with st.spinner(f"{name} 데이터 수집 및 분석 중..."):
                         data = screener.get_stock_data(code)
 
@@ -793,6 +615,7 @@ if check_password():
                         if not analysis:
                             st.error("⚠️ 분석 실패(데이터 부족/계산 오류)")
                         else:
+                            render_started = time.perf_counter()
                             st.divider()
                             st.header(f"📈 {name} ({code}) 상세 분석 리포트")
                             st.caption(f"섹터: {sector}")
@@ -849,6 +672,72 @@ if check_password():
                                 st.subheader("🎯 감지된 신호")
                                 for s in analysis["signals"]:
                                     st.markdown(f"- {s}")
+                            metrics.observe("render", time.perf_counter() - render_started)
+
+    # =========================================================
+    # Tab4: 전체 시장 스크리닝
+    # =========================================================
+    with tab4:
+        st.info("종목 DB 전체를 사이드바의 필터 조건으로 스크리닝합니다. (KRX 전종목 시세를 먼저 불러오면 네트워크 없이 빠르게 끝납니다)")
+
+        universe = get_stock_db()
+        u1, u2 = st.columns(2)
+        with u1:
+            markets = sorted(universe["시장구분"].dropna().unique()) if "시장구분" in universe.columns else []
+            if markets:
+                pick_markets = st.multiselect("시장", markets, key="universe_markets")
+            else:
+                pick_markets = []
+                st.caption("종목 DB에 시장구분 컬럼이 없어 시장 필터는 생략됩니다. (update_stock_list.py 로 다시 만들면 포함)")
+        with u2:
+            pick_sectors = st.multiselect("섹터", sorted(universe["섹터"].unique()), key="universe_sectors")
+
+        target = universe
+        if pick_markets:
+            target = target[target["시장구분"].isin(pick_markets)]
+        if pick_sectors:
+            target = target[target["섹터"].isin(pick_sectors)]
+
+        time_budget = st.number_input("시간 제한(초)", 10, 3600, 300, key="universe_budget")
+        st.caption(f"대상 종목: {len(target):,}개 · 동시 수집: {st.session_state.get('max_workers', screening.DEFAULT_MAX_WORKERS)}개")
+
+        job = st.session_state.get("universe_job")
+        running = job is not None and job.running
+        b1, b2 = st.columns(2)
+        with b1:
+            start_job = st.button("🌐 전체 시장 스크리닝 시작", type="primary", key="universe_start", disabled=running)
+        with b2:
+            if st.button("⏹️ 중지", key="universe_cancel", disabled=not running):
+                job.cancel()
+
+        if start_job and not target.empty:
+            # 백그라운드 스레드는 session_state 대신 시작 시점의 값을 캡처해서 사용 (프로세스로도 보낼 수 있는 형태)
+            evaluate = ConditionEvaluator(selected_filters, params)
+            stocks = list(zip(target["종목코드"], target["회사명"], target["섹터"]))
+            count_preloaded_sources(stocks, st.session_state.offline_price_data, st.session_state.market_price_data)
+            job = screening.ScreeningJob(
+                stocks,
+                fetch=screener.get_stock_data_live,
+                evaluate=evaluate,
+                max_workers=st.session_state.get("max_workers", screening.DEFAULT_MAX_WORKERS),
+                preloaded={**st.session_state.market_price_data, **st.session_state.offline_price_data},
+                initializer=script_ctx_initializer(),
+                time_budget=float(time_budget),
+                processes=int(SCREEN_PROCESSES) if SCREEN_PROCESSES else None,
+            ).start()
+            st.session_state.universe_job = job
+            running = True
+
+        st.fragment(render_universe_job, run_every=1.0 if running else None)(running)
+
+    with diagnostics_panel:
+        st.caption("프로세스 시작(또는 초기화) 이후 누적 값입니다.")
+        render_diagnostics()
+    if METRICS_TEXTFILE:
+        try:
+            metrics.get_registry().write_textfile(METRICS_TEXTFILE)
+        except OSError as e:
+            print(f"[WARNING] Metrics textfile write failed: {e}")
 
 else:
     st.info("🔒 왼쪽 사이드바에서 비밀번호로 로그인해 주세요.")
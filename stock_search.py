@@ -0,0 +1,184 @@
+"""
+종목명 검색 인덱스
+
+종목 DB(유니버스)에서 한 번 만들어 두고 검색마다 재사용합니다.
+- 회사명 + 별칭(예: NAVER/네이버 → 035420)을 공백 제거·대문자 키로 색인
+- 초성 키(삼성전자 → ㅅㅅㅈㅈ)로 초성 검색
+- 글자 역색인으로 후보를 먼저 좁힌 뒤
+  정확 일치 > 접두 > 부분 문자열 > 초성 > 약어(삼전) > 오타(편집거리) 순으로 순위화
+"""
+from collections import Counter
+
+from stock_universe import ALIAS_COL, search_key
+
+# 자주 쓰는 줄임말/영문명 (종목 DB 중복 행에서 나온 별칭과 합쳐서 사용)
+ALIASES = {
+    "035420": ["NAVER", "네이버"],
+    "005930": ["삼전"],
+    "000660": ["하이닉스", "하닉"],
+    "373220": ["엘지엔솔", "엔솔"],
+    "005380": ["현차"],
+    "035720": ["카카오톡"],
+}
+
+CHOSUNG = [
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+_CHOSUNG_SET = set(CHOSUNG)
+
+# 순위 점수 (높을수록 위)
+SCORE_EXACT = 100
+SCORE_PREFIX = 90
+SCORE_SUBSTRING = 80
+SCORE_CHOSUNG = 70
+SCORE_ABBREV = 60
+SCORE_TYPO = 50
+
+
+def chosung_key(text: str) -> str:
+    """한글 음절은 초성으로, 나머지 글자는 그대로 (공백 제거·대문자)"""
+    out = []
+    for ch in search_key(text):
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSUNG[code // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def is_chosung_query(q: str) -> bool:
+    return bool(q) and all(ch in _CHOSUNG_SET for ch in q)
+
+
+def is_subsequence(q: str, key: str) -> bool:
+    it = iter(key)
+    return all(ch in it for ch in q)
+
+
+def edit_distance(a: str, b: str, max_dist: int) -> int:
+    """레벤슈타인 거리 (max_dist 를 넘으면 max_dist + 1)"""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        best = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            best = min(best, cur[j])
+        if best > max_dist:
+            return max_dist + 1
+        prev = cur
+    return prev[-1]
+
+
+class StockSearchIndex:
+    """
+    universe: stock_universe.build_universe 결과
+    search(query) → [(행 위치, 점수), ...] 점수순
+    """
+
+    def __init__(self, universe):
+        self.universe = universe
+        self.keys = []       # 항목별 검색키 (회사명 또는 별칭)
+        self.initials = []   # 항목별 초성 키
+        self.rows = []       # 항목 → 유니버스 행 위치
+        self.exact = {}      # 검색키 → [항목]
+        self.char_index = {}  # 글자 → {항목}
+        self.chosung_index = {}  # 초성 → {항목}
+
+        code_pos = {code: i for i, code in enumerate(universe["종목코드"])}
+        names = universe["회사명"].tolist()
+        aliases = universe[ALIAS_COL].tolist() if ALIAS_COL in universe.columns else [""] * len(names)
+
+        for pos, (name, alias) in enumerate(zip(names, aliases)):
+            self._add(name, pos)
+            for a in filter(None, alias.split("|")):
+                self._add(a, pos)
+        for code, extra in ALIASES.items():
+            if code in code_pos:
+                for a in extra:
+                    self._add(a, code_pos[code])
+
+    def _add(self, text: str, pos: int):
+        key = search_key(text)
+        if not key:
+            return
+        idx = len(self.keys)
+        self.keys.append(key)
+        self.initials.append(chosung_key(text))
+        self.rows.append(pos)
+        self.exact.setdefault(key, []).append(idx)
+        for ch in set(key):
+            self.char_index.setdefault(ch, set()).add(idx)
+        for ch in set(self.initials[idx]) & _CHOSUNG_SET:
+            self.chosung_index.setdefault(ch, set()).add(idx)
+
+    @staticmethod
+    def _intersect(index: dict, q: str) -> set:
+        """q 의 글자를 모두 포함하는 항목"""
+        sets = sorted((index.get(ch, set()) for ch in set(q)), key=len)
+        if not sets or not sets[0]:
+            return set()
+        return set.intersection(*sets)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        q = search_key(query)
+        if not q:
+            return []
+
+        best = {}  # 유니버스 행 → 점수
+
+        def hit(idx, score):
+            pos = self.rows[idx]
+            if score > best.get(pos, -1):
+                best[pos] = score
+
+        for idx in self.exact.get(q, ()):
+            hit(idx, SCORE_EXACT)
+
+        if is_chosung_query(q):
+            # 초성 검색: 초성 키의 접두/부분 일치
+            for idx in self._intersect(self.chosung_index, q):
+                at = self.initials[idx].find(q)
+                if at >= 0:
+                    hit(idx, SCORE_CHOSUNG + (5 if at == 0 else 0))
+        else:
+            # 글자를 모두 포함하는 항목만 후보 → 접두 / 부분 문자열 / 약어
+            for idx in self._intersect(self.char_index, q):
+                key = self.keys[idx]
+                at = key.find(q)
+                if at == 0:
+                    hit(idx, SCORE_PREFIX - len(key) / 100)
+                elif at > 0:
+                    hit(idx, SCORE_SUBSTRING - at / 100)
+                elif is_subsequence(q, key):
+                    hit(idx, SCORE_ABBREV - len(key) / 100)
+
+            # 결과가 모자라면 오타 허용 (편집거리 1, 긴 검색어는 2)
+            if len(best) < limit and len(q) >= 2:
+                self._typo_search(q, hit)
+
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:limit]
+
+    def _typo_search(self, q: str, hit):
+        max_dist = 1 if len(q) < 6 else 2
+        need = max(1, len(set(q)) - max_dist)
+        counts = Counter()
+        for ch in set(q):
+            counts.update(self.char_index.get(ch, ()))
+        for idx, shared in counts.items():
+            if shared < need:
+                continue
+            key = self.keys[idx]
+            d = edit_distance(q, key, max_dist)
+            if d <= max_dist:
+                hit(idx, SCORE_TYPO - d * 5)
+
+    def search_frame(self, query: str, limit: int = 20):
+        """search 결과를 유니버스 DataFrame 행으로 (순위순)"""
+        hits = self.search(query, limit)
+        return self.universe.iloc[[pos for pos, _ in hits]]
@@ -0,0 +1,162 @@
+"""
+종목 DB(유니버스) 정규화 + 버전별 캐시용 산출물
+
+- normalize_stock_db: 다양한 컬럼명 → 회사명 / 종목코드 / 섹터 / (선택) 시장구분
+- normalize_market: KOSPI / KOSDAQ / 유가증권 같은 시장 표기 → 코스피 / 코스닥 / 코넥스
+- reclassify_sectors: 규칙 표(sector_rules)로 섹터 일괄 재분류 (기존 섹터는 업종처럼 fallback)
+- build_universe: 정규화 + 검색키(공백 제거·대문자) 미리 계산 + 섹터/시장구분 category 변환
+  같은 종목코드의 다른 이름(NAVER/네이버)은 별칭 컬럼으로 보존 → 검색 인덱스(stock_search)에서 사용
+- 소스 버전(파일 mtime·크기, 업로드 파일 해시)이 같으면 같은 산출물을 재사용하도록
+  버전 문자열을 만드는 함수 제공
+"""
+import hashlib
+import os
+from io import StringIO
+
+import pandas as pd
+
+import sector_rules
+
+SEARCH_KEY = "검색키"  # 회사명에서 공백 제거 + 대문자 (검색 전용, 화면에는 숨김)
+ALIAS_COL = "별칭"  # 같은 종목코드의 다른 회사명들 ("|" 구분, 검색 전용, 화면에는 숨김)
+INTERNAL_COLUMNS = (SEARCH_KEY, ALIAS_COL)
+
+# 시장 표기 → 종목 DB 의 시장구분 값 (대문자·공백 제거 후 비교, 없는 값은 그대로)
+MARKET_ALIASES = {
+    "KOSPI": "코스피", "STK": "코스피", "유가증권": "코스피", "유가증권시장": "코스피", "코스피": "코스피",
+    "KOSDAQ": "코스닥", "KSQ": "코스닥", "코스닥": "코스닥", "KOSDAQGLOBAL": "코스닥",
+    "KONEX": "코넥스", "KNX": "코넥스", "코넥스": "코넥스",
+}
+
+
+def normalize_market(value) -> str:
+    """시장 표기 하나를 코스피 / 코스닥 / 코넥스 로 (모르는 값은 앞뒤 공백만 제거)"""
+    text = str(value).strip()
+    return MARKET_ALIASES.get(text.replace(" ", "").upper(), text)
+
+# =============================
+# (옵션) 최소 내장 DB (CSV 없을 때도 앱은 뜨게)
+# =============================
+EMBEDDED_MINI_CSV = """
+회사명,종목코드,섹터
+삼성전자,005930,기타
+SK하이닉스,000660,기타
+NAVER,035420,AI
+네이버,035420,AI
+카카오,035720,AI
+셀트리온,068270,의약품
+삼성바이오로직스,207940,의약품
+현대차,005380,기타
+기아,000270,기타
+휴림로봇,090710,로봇
+""".strip()
+
+
+def normalize_stock_db(df: pd.DataFrame, dedupe: bool = True) -> pd.DataFrame:
+    """
+    요구 컬럼: 회사명, 종목코드, (선택) 섹터, (선택) 시장구분
+    dedupe=False 면 같은 종목코드 행을 그대로 둔다 (별칭 수집용)
+    """
+    df = df.copy()
+
+    # 다양한 컬럼명을 허용하고 표준화
+    col_map = {}
+    lower_cols = {c.lower(): c for c in df.columns}
+
+    # 회사명 후보
+    for cand in ["회사명", "name", "corp_name", "company", "companyname"]:
+        if cand.lower() in lower_cols:
+            col_map[lower_cols[cand.lower()]] = "회사명"
+            break
+
+    # 종목코드 후보
+    for cand in ["종목코드", "code", "symbol", "ticker", "stock_code"]:
+        if cand.lower() in lower_cols:
+            col_map[lower_cols[cand.lower()]] = "종목코드"
+            break
+
+    # 섹터 후보(없으면 생성)
+    for cand in ["섹터", "sector", "업종", "industry"]:
+        if cand.lower() in lower_cols:
+            col_map[lower_cols[cand.lower()]] = "섹터"
+            break
+
+    # 시장구분 후보(있을 때만)
+    for cand in ["시장구분", "market", "시장"]:
+        if cand.lower() in lower_cols:
+            col_map[lower_cols[cand.lower()]] = "시장구분"
+            break
+
+    df = df.rename(columns=col_map)
+
+    # 필수 컬럼 확인
+    if "회사명" not in df.columns or "종목코드" not in df.columns:
+        raise ValueError("CSV에 '회사명'과 '종목코드' 컬럼이 필요합니다.")
+
+    if "섹터" not in df.columns:
+        # 섹터가 없으면 회사명 키워드로 분류 (sector_rules, 안 맞으면 기타)
+        df["섹터"] = sector_rules.classify_sectors(df["회사명"].astype(str).str.strip())
+
+    df["회사명"] = df["회사명"].astype(str).str.strip()
+    df["종목코드"] = df["종목코드"].astype(str).str.extract(r"(\d+)")[0].fillna(df["종목코드"].astype(str))
+    df["종목코드"] = df["종목코드"].astype(str).str.zfill(6)
+    df["섹터"] = df["섹터"].astype(str).fillna("기타")
+    if "시장구분" in df.columns:
+        df["시장구분"] = df["시장구분"].map(normalize_market)
+
+    df = df.dropna(subset=["회사명", "종목코드"])
+    if dedupe:
+        df = df.drop_duplicates(subset=["종목코드"])
+    return df.reset_index(drop=True)
+
+
+def reclassify_sectors(df: pd.DataFrame) -> pd.DataFrame:
+    """정규화된 종목 DB 의 섹터를 규칙 표로 다시 분류 (규칙에 안 맞으면 기존 섹터 유지)"""
+    df = df.copy()
+    df["섹터"] = sector_rules.classify_sectors(df["회사명"], df["섹터"].astype(str))
+    return df
+
+
+def search_key(text: str) -> str:
+    """검색 비교용 키 (공백 제거 + 대문자)"""
+    return (text or "").replace(" ", "").upper()
+
+
+def build_universe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    정규화 + 검색키 + category 컬럼까지 끝낸 유니버스
+    (공유 캐시에 올라가므로 호출 측에서 수정하지 말 것)
+    """
+    full = normalize_stock_db(df, dedupe=False)
+    df = full.drop_duplicates(subset=["종목코드"]).reset_index(drop=True)
+    extra = full[full.duplicated(subset=["종목코드"])]
+    aliases = extra.groupby("종목코드")["회사명"].agg(lambda s: "|".join(dict.fromkeys(s)))
+    df[ALIAS_COL] = df["종목코드"].map(aliases).fillna("")
+    df[SEARCH_KEY] = df["회사명"].str.replace(" ", "", regex=False).str.upper()
+    df["섹터"] = df["섹터"].astype("category")
+    if "시장구분" in df.columns:
+        df["시장구분"] = df["시장구분"].astype("category")
+    return df
+
+
+def load_embedded_universe() -> pd.DataFrame:
+    return build_universe(pd.read_csv(StringIO(EMBEDDED_MINI_CSV)))
+
+
+def display_columns(df: pd.DataFrame) -> list[str]:
+    """화면 표시용 컬럼 (검색키·별칭 등 내부 컬럼 제외)"""
+    return [c for c in df.columns if c not in INTERNAL_COLUMNS]
+
+
+def file_version(path: str) -> str | None:
+    """파일 버전 (수정시각 + 크기). 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def bytes_version(data: bytes) -> str:
+    """업로드 파일 내용 해시"""
+    return hashlib.sha1(data).hexdigest()
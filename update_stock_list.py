@@ -1,15 +1,26 @@
-import requests
 import pandas as pd
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import os
+import re
 import time
 import sys
 
+import http_client
+import sector_rules
+import stock_universe
+
+# 로컬 대역 서버(benchmarks/standin_server.py)로 바꿔 테스트할 수 있게 환경변수로 덮어쓸 수 있음
+KRX_BASE_URL = os.environ.get("KRX_BASE_URL", "http://data.krx.co.kr")
+
 def method1_krx_otp():
     """방법 1: KRX OTP 방식 (기본)"""
     print("\n[방법 1] KRX OTP 방식 시도 중...")
     
     try:
-        session = requests.Session()
+        session = http_client.get_client()
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -19,12 +30,12 @@ def method1_krx_otp():
         }
         
         # 메인 페이지 접속
-        session.get('http://data.krx.co.kr/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201', 
+        session.get(f'{KRX_BASE_URL}/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201', 
                    headers=headers, timeout=30)
         time.sleep(1)
         
         # OTP 생성
-        gen_otp_url = 'http://data.krx.co.kr/comm/fileDn/GenerateOTP/generate.cmd'
+        gen_otp_url = f'{KRX_BASE_URL}/comm/fileDn/GenerateOTP/generate.cmd'
         otp_data = {
             'mktId': 'ALL',
             'share': '1',
@@ -43,7 +54,7 @@ def method1_krx_otp():
         time.sleep(1)
         
         # CSV 다운로드
-        down_url = 'http://data.krx.co.kr/comm/fileDn/download_csv/download.cmd'
+        down_url = f'{KRX_BASE_URL}/comm/fileDn/download_csv/download.cmd'
         down_response = session.post(down_url, data={'code': otp}, headers=headers, timeout=60)
         
         if len(down_response.content) < 1000:
@@ -64,7 +75,7 @@ def method2_krx_json():
     print("\n[방법 2] KRX JSON API 방식 시도 중...")
     
     try:
-        session = requests.Session()
+        session = http_client.get_client()
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -75,12 +86,12 @@ def method2_krx_json():
         }
         
         # 메인 페이지
-        session.get('http://data.krx.co.kr/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201',
+        session.get(f'{KRX_BASE_URL}/contents/MDC/MDI/mdiLoader/index.cmd?menuId=MDC0201',
                    headers=headers, timeout=30)
         time.sleep(1)
         
         # JSON 데이터 요청
-        json_url = 'http://data.krx.co.kr/comm/bldAttendant/getJsonData.cmd'
+        json_url = f'{KRX_BASE_URL}/comm/bldAttendant/getJsonData.cmd'
         json_data = {
             'bld': 'dbms/MDC/STAT/standard/MDCSTAT01901',
             'locale': 'ko_KR',
@@ -113,6 +124,61 @@ def method2_krx_json():
         return None
 
 
+PYKRX_NAME_CACHE = os.environ.get("PYKRX_NAME_CACHE", ".pykrx_name_cache.json")
+
+
+def load_name_cache(path=PYKRX_NAME_CACHE):
+    """{티커: 종목명} 로컬 캐시 (없으면 빈 dict)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_name_cache(names, path=PYKRX_NAME_CACHE):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(names, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️  종목명 캐시 저장 실패: {e}")
+
+
+def resolve_pykrx_names(stock, date, markets, cache_path=PYKRX_NAME_CACHE):
+    """
+    markets: {"KOSPI": [티커, ...], ...} → {티커: 종목명}
+    1) 시장별 등락률 표(get_market_price_change, 종목명 포함)로 한 번에 — 이름 변경도 여기서 반영
+    2) 그래도 없는 티커는 로컬 캐시
+    3) 캐시에도 없으면 get_market_ticker_name 으로 하나씩
+    """
+    wanted = {t for tickers in markets.values() for t in tickers}
+    cache = load_name_cache(cache_path)
+    names = {}
+    
+    for market in markets:
+        try:
+            df = stock.get_market_price_change(date, date, market=market)
+            names.update(df['종목명'].astype(str).to_dict())
+        except Exception as e:
+            print(f"⚠️  {market} 종목명 일괄 조회 실패: {e}")
+    
+    missing = wanted - names.keys()
+    names.update({t: cache[t] for t in missing if t in cache})
+    missing -= names.keys()
+    if missing:
+        print(f"🔎 종목명 개별 조회: {len(missing)}개")
+    for t in sorted(missing):
+        try:
+            names[t] = stock.get_market_ticker_name(t)
+        except Exception:
+            pass
+    
+    names = {t: n for t, n in names.items() if t in wanted}
+    if names.items() - cache.items():
+        save_name_cache({**cache, **names}, cache_path)
+    return names
+
+
 def method3_pykrx():
     """방법 3: pykrx 라이브러리 사용"""
     print("\n[방법 3] pykrx 라이브러리 방식 시도 중...")
@@ -127,32 +193,27 @@ def method3_pykrx():
             subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pykrx', '--quiet'])
             from pykrx import stock
         
-        from datetime import datetime
         today = datetime.today().strftime('%Y%m%d')
         
-        # 코스피 + 코스닥 티커 가져오기
+        # 코스피 + 코스닥 티커 가져오기 (둘 다 있으면 코스피)
         kospi_tickers = stock.get_market_ticker_list(today, market="KOSPI")
         kosdaq_tickers = stock.get_market_ticker_list(today, market="KOSDAQ")
-        all_tickers = kospi_tickers + kosdaq_tickers
-        
-        print(f"📊 총 {len(all_tickers)}개 종목 발견")
-        
-        # 종목명 가져오기
-        stock_list = []
-        for ticker in all_tickers:
-            try:
-                name = stock.get_market_ticker_name(ticker)
-                market = "코스피" if ticker in kospi_tickers else "코스닥"
-                stock_list.append({
-                    '단축코드': ticker,
-                    '한글 종목약명': name,
-                    '시장구분': market,
-                    '업종명': ''
-                })
-            except:
-                pass
-        
-        df = pd.DataFrame(stock_list)
+        market_of = dict.fromkeys(kospi_tickers, "코스피")
+        for t in kosdaq_tickers:
+            market_of.setdefault(t, "코스닥")
+        
+        print(f"📊 총 {len(market_of)}개 종목 발견")
+        
+        # 종목명: 시장 전체 한 번에 → 캐시 → 남은 것만 하나씩
+        names = resolve_pykrx_names(stock, today, {"KOSPI": kospi_tickers, "KOSDAQ": kosdaq_tickers})
+        tickers = [t for t in market_of if t in names]
+        
+        df = pd.DataFrame({
+            '단축코드': tickers,
+            '한글 종목약명': [names[t] for t in tickers],
+            '시장구분': [market_of[t] for t in tickers],
+            '업종명': '',
+        })
         print(f"✅ 방법 3 성공! {len(df)}개 종목 다운로드")
         return df
         
@@ -173,12 +234,9 @@ def method4_investing():
         # Investing.com 한국 주식 리스트
         url = 'https://www.investing.com/stock-screener/?sp=country::37|sector::a|industry::a|equityType::a|exchange::a%3Ceq_market_cap;1'
         
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get_client().get(url, headers=headers, timeout=30)
         
-        # 간단한 HTML 파싱
-        import re
-        
-        # 종목 코드 패턴 찾기
+        # 간단한 HTML 파싱 — 종목 코드 패턴 찾기
         codes = re.findall(r'data-symbol="([0-9]{6})"', response.text)
         names = re.findall(r'title="([^"]+)"', response.text)
         
@@ -204,8 +262,50 @@ def method4_investing():
         return None
 
 
+NAVER_FINANCE_URL = os.environ.get("NAVER_FINANCE_URL", "https://finance.naver.com")
+NAVER_MARKETS = [(0, "코스피"), (1, "코스닥")]
+NAVER_MAX_PAGES = 40
+NAVER_WORKERS = 8  # 동시에 요청하는 페이지 수
+
+# 시가총액 표의 종목 링크: <a href="/item/main.naver?code=005930" class="tltle">삼성전자</a>
+_MARKET_SUM_ROW = re.compile(r'<a href="/item/main\.naver\?code=(\d{6})" class="tltle">([^<]+)</a>')
+
+
+def fetch_market_sum_page(client, headers, sosok, page):
+    """시가총액 페이지 하나 → (종목코드, 종목명) DataFrame (빈 페이지면 빈 DataFrame, 실패하면 None)"""
+    url = f'{NAVER_FINANCE_URL}/sise/sise_market_sum.naver'
+    try:
+        response = client.get(url, params={'sosok': sosok, 'page': page}, headers=headers, timeout=10)
+    except Exception as e:
+        print(f"  - {page}페이지 실패: {e}")
+        return None
+    rows = _MARKET_SUM_ROW.findall(response.text)
+    return pd.DataFrame(rows, columns=['단축코드', '한글 종목약명'])
+
+
+def crawl_market_sum(client, headers, sosok, market, pool):
+    """
+    한 시장의 시가총액 페이지를 NAVER_WORKERS 개씩 동시에 요청
+    빈 페이지(또는 앞 페이지와 같은 내용)나 실패한 페이지가 나오면 거기서 멈춤
+    """
+    frames = []
+    seen = set()
+    for start in range(1, NAVER_MAX_PAGES + 1, NAVER_WORKERS):
+        pages = range(start, min(start + NAVER_WORKERS, NAVER_MAX_PAGES + 1))
+        results = pool.map(lambda p: fetch_market_sum_page(client, headers, sosok, p), pages)
+        for page, df in zip(pages, results):
+            codes = set(df['단축코드']) if df is not None else set()
+            if not codes or codes <= seen:
+                print(f"  - {market}: {page - 1}페이지에서 종료 ({sum(map(len, frames))}개 종목)")
+                return frames
+            seen |= codes
+            frames.append(df.assign(시장구분=market, 업종명=''))
+    print(f"  - {market}: {NAVER_MAX_PAGES}페이지 완료 ({sum(map(len, frames))}개 종목)")
+    return frames
+
+
 def method5_naver_finance():
-    """방법 5: 네이버 금융 크롤링"""
+    """방법 5: 네이버 금융 크롤링 (시장별 페이지 병렬 수집)"""
     print("\n[방법 5] 네이버 금융 방식 시도 중...")
     
     try:
@@ -214,64 +314,15 @@ def method5_naver_finance():
             'Referer': 'https://finance.naver.com/'
         }
         
-        all_stocks = []
+        client = http_client.get_client()
+        frames = []
+        with ThreadPoolExecutor(max_workers=NAVER_WORKERS) as pool:
+            for sosok, market in NAVER_MARKETS:
+                print(f"📊 {market} 종목 수집 중...")
+                frames += crawl_market_sum(client, headers, sosok, market, pool)
         
-        # 코스피 (1~40페이지 정도)
-        print("📊 코스피 종목 수집 중...")
-        for page in range(1, 41):
-            try:
-                url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok=0&page={page}'
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                df_list = pd.read_html(response.text)
-                if df_list:
-                    df = df_list[1]
-                    df = df.dropna(subset=['종목명'])
-                    
-                    for _, row in df.iterrows():
-                        all_stocks.append({
-                            '단축코드': str(row['종목코드']).zfill(6) if '종목코드' in df.columns else '',
-                            '한글 종목약명': row['종목명'],
-                            '시장구분': '코스피',
-                            '업종명': ''
-                        })
-                
-                if page % 10 == 0:
-                    print(f"  - {page}페이지 완료 ({len(all_stocks)}개 종목)")
-                
-                time.sleep(0.1)
-            except:
-                break
-        
-        # 코스닥 (1~40페이지 정도)
-        print("📊 코스닥 종목 수집 중...")
-        for page in range(1, 41):
-            try:
-                url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok=1&page={page}'
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                df_list = pd.read_html(response.text)
-                if df_list:
-                    df = df_list[1]
-                    df = df.dropna(subset=['종목명'])
-                    
-                    for _, row in df.iterrows():
-                        all_stocks.append({
-                            '단축코드': str(row['종목코드']).zfill(6) if '종목코드' in df.columns else '',
-                            '한글 종목약명': row['종목명'],
-                            '시장구분': '코스닥',
-                            '업종명': ''
-                        })
-                
-                if page % 10 == 0:
-                    print(f"  - {page}페이지 완료 ({len(all_stocks)}개 종목)")
-                
-                time.sleep(0.1)
-            except:
-                break
-        
-        if all_stocks:
-            df = pd.DataFrame(all_stocks)
+        if frames:
+            df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=['단축코드'])
             print(f"✅ 방법 5 성공! {len(df)}개 종목 다운로드")
             return df
         else:
@@ -282,8 +333,78 @@ def method5_naver_finance():
         return None
 
 
-def process_and_save(df_raw):
-    """다운로드한 데이터를 가공하고 저장"""
+OUTPUT_FILE = 'krx_stock_list.csv'
+CHANGELOG_FILE = 'krx_stock_list_changes.json'
+
+
+def load_existing(output_file=OUTPUT_FILE):
+    """기존 종목 리스트 (없거나 읽기 실패면 None)"""
+    if not os.path.exists(output_file):
+        return None
+    try:
+        df = pd.read_csv(output_file, dtype={'종목코드': str}, encoding='utf-8-sig')
+    except Exception as e:
+        print(f"⚠️  기존 파일 읽기 실패 → 전체 갱신: {e}")
+        return None
+    if not {'회사명', '종목코드', '섹터'} <= set(df.columns):
+        return None
+    df['종목코드'] = df['종목코드'].str.zfill(6)
+    return df
+
+
+def diff_stock_lists(old, new):
+    """
+    종목코드 기준 비교
+    반환: {"added": [...], "removed": [...], "renamed": [...], "moved": [...]} (종목코드 정렬)
+    moved: 시장구분이 바뀐 종목 (이전 파일에 시장구분 컬럼이 없었으면 전 종목)
+    """
+    old_names = dict(zip(old['종목코드'], old['회사명']))
+    new_names = dict(zip(new['종목코드'], new['회사명']))
+    sectors = dict(zip(new['종목코드'], new['섹터']))
+    old_sectors = dict(zip(old['종목코드'], old['섹터']))
+    markets = dict(zip(new['종목코드'], new['시장구분']))
+    old_markets = dict(zip(old['종목코드'], old['시장구분'])) if '시장구분' in old.columns else {}
+    return {
+        'added': [
+            {'종목코드': c, '회사명': new_names[c], '섹터': sectors[c]}
+            for c in sorted(new_names.keys() - old_names.keys())
+        ],
+        'removed': [
+            {'종목코드': c, '회사명': old_names[c], '섹터': old_sectors[c]}
+            for c in sorted(old_names.keys() - new_names.keys())
+        ],
+        'renamed': [
+            {'종목코드': c, '이전': old_names[c], '현재': new_names[c], '섹터': sectors[c]}
+            for c in sorted(old_names.keys() & new_names.keys())
+            if old_names[c] != new_names[c]
+        ],
+        'moved': [
+            {'종목코드': c, '회사명': new_names[c], '이전': old_markets.get(c, ''), '현재': markets[c]}
+            for c in sorted(old_names.keys() & new_names.keys())
+            if old_markets.get(c) != markets[c]
+        ],
+    }
+
+
+def write_changelog(changes, changelog_file=CHANGELOG_FILE):
+    payload = {
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'counts': {k: len(v) for k, v in changes.items()},
+        **changes,
+    }
+    with open(changelog_file, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def process_and_save(df_raw, full=False, output_file=OUTPUT_FILE, changelog_file=CHANGELOG_FILE):
+    """
+    다운로드한 데이터를 가공하고 저장
+    - 기본(증분): 기존 파일과 종목코드로 비교해 신규/이름 변경 종목만 섹터 분류,
+      나머지는 기존 섹터 유지. 바뀐 게 없으면 파일을 건드리지 않음
+    - full=True: 전체 재분류 후 다시 씀
+    시장구분은 코스피 / 코스닥 / 코넥스로 맞춰 저장 (원본에 없거나 모르는 값이면 기존 파일 값, 그것도 없으면 기타)
+    변경 내역(added/removed/renamed/moved)은 changelog_file 에 JSON 으로 기록
+    """
     print("\n" + "="*60)
     print("🔄 데이터 가공 중...")
     print("="*60)
@@ -292,55 +413,46 @@ def process_and_save(df_raw):
     df = pd.DataFrame({
         '회사명': df_raw['한글 종목약명'].astype(str).str.strip(),
         '종목코드': df_raw['단축코드'].astype(str).str.strip().str.zfill(6),
-        '시장구분': df_raw['시장구분'].astype(str) if '시장구분' in df_raw.columns else '기타',
+        '시장구분': df_raw['시장구분'].map(stock_universe.normalize_market) if '시장구분' in df_raw.columns else '기타',
         '업종명': df_raw['업종명'].astype(str) if '업종명' in df_raw.columns else ''
     })
+    df = df.drop_duplicates(subset=['종목코드'])
+    df = df[df['종목코드'].str.len() == 6]  # 6자리 코드만
+    df = df.sort_values('종목코드').reset_index(drop=True)
     
-    # 섹터 분류
-    def classify_sector(row):
-        name = row['회사명'].upper()
-        industry = row['업종명']
-        
-        # AI/IT
-        if any(k in name for k in ['NAVER', '네이버', '카카오', 'NC', '엔씨', '넥슨', '크래프톤', '펄어비스', '위메이드', '넷마블', 'SDS']):
-            return 'AI'
-        
-        # 바이오/제약
-        if any(k in name or k in industry for k in ['바이오', '제약', '셀트리온', '팜', '메디', '의약', '알테오젠', '휴젤', '유한', '한미약품', '종근당']):
-            return '의약품'
-        
-        # 반도체
-        if any(k in name or k in industry for k in ['삼성전자', 'SK하이닉스', '하이닉스', '반도체', 'DB하이텍', '한미반도체', 'ISC', '주성엔지니어링']):
-            return '양자컴퓨터'
-        
-        # 2차전지
-        if any(k in name or k in industry for k in ['LG에너지', '삼성SDI', 'SDI', '에코프로', '포스코퓨처', '2차전지', '배터리', '양극재']):
-            return '2차전지'
-        
-        # 로봇
-        if '로봇' in name:
-            return '로봇'
-        
-        # 우주항공
-        if any(k in name for k in ['에어로스페이스', '인텔리안', '넥스원', '항공', '우주']):
-            return '우주항공'
-        
-        # 전기차
-        if any(k in name for k in ['현대차', '기아', '전기차', 'EV']):
-            return '전기차'
-        
-        return industry if industry and industry != 'nan' else '기타'
-    
-    df['섹터'] = df.apply(classify_sector, axis=1)
+    old = None if full else load_existing(output_file)
+    if old is None:
+        # 섹터 분류 (sector_rules 규칙 표, 컬럼 단위 벡터 연산)
+        df['섹터'] = sector_rules.classify_sectors(df['회사명'], df['업종명'])
+    else:
+        # 이름이 같은 기존 종목은 섹터 재사용, 신규/이름 변경 종목만 분류
+        old_idx = old.drop_duplicates(subset=['종목코드']).set_index('종목코드')
+        prev_name = df['종목코드'].map(old_idx['회사명'])
+        keep = prev_name.eq(df['회사명'])
+        df['섹터'] = df['종목코드'].map(old_idx['섹터']).where(keep)
+        todo = ~keep
+        if todo.any():
+            df.loc[todo, '섹터'] = sector_rules.classify_sectors(df.loc[todo, '회사명'], df.loc[todo, '업종명'])
+        print(f"🔁 증분 모드: 기존 {len(old_idx):,}개, 분류 대상 {int(todo.sum()):,}개")
+        if '시장구분' in old_idx.columns:
+            # 이번 출처가 시장을 모르면(investing 의 KRX 등) 기존 시장구분 유지
+            unknown = ~df['시장구분'].isin(set(stock_universe.MARKET_ALIASES.values()))
+            df.loc[unknown, '시장구분'] = df.loc[unknown, '종목코드'].map(old_idx['시장구분']).fillna('기타')
     
     # 최종 정리
-    df_final = df[['회사명', '종목코드', '섹터']].copy()
-    df_final = df_final.drop_duplicates(subset=['종목코드'])
-    df_final = df_final[df_final['종목코드'].str.len() == 6]  # 6자리 코드만
-    df_final = df_final.sort_values('종목코드').reset_index(drop=True)
+    df_final = df[['회사명', '종목코드', '섹터', '시장구분']].copy()
+    
+    if old is not None:
+        changes = diff_stock_lists(old, df_final)
+        counts = {k: len(v) for k, v in changes.items()}
+        print(f"📋 변경: 신규 {counts['added']}개, 삭제 {counts['removed']}개, 이름 변경 {counts['renamed']}개, "
+              f"시장 변경 {counts['moved']}개")
+        if not any(counts.values()):
+            print(f"✅ 변경 없음 → {output_file} 그대로 유지")
+            return True
+        write_changelog(changes, changelog_file)
     
     # 저장
-    output_file = 'krx_stock_list.csv'
     df_final.to_csv(output_file, index=False, encoding='utf-8-sig')
     
     # 결과 출력
@@ -348,7 +460,10 @@ def process_and_save(df_raw):
     print("✅ 저장 완료!")
     print("="*60)
     print(f"📁 파일: {output_file}")
+    if old is not None:
+        print(f"📝 변경 내역: {changelog_file}")
     print(f"📊 총 종목: {len(df_final):,}개")
+    print("   " + ", ".join(f"{m} {n:,}개" for m, n in df_final['시장구분'].value_counts().items()))
     print("\n📌 섹터별 통계:")
     print("-"*60)
     
@@ -360,8 +475,11 @@ def process_and_save(df_raw):
     return True
 
 
-def main():
-    """메인 함수: 여러 방법을 순차적으로 시도"""
+METHOD_RETRY_DELAY = 0.5  # 실패한 방법 다음 방법까지 대기(초)
+
+
+def main(full=False):
+    """메인 함수: 여러 방법을 순차적으로 시도 (full=True 면 증분 대신 전체 갱신)"""
     print("\n" + "="*60)
     print("🚀 KRX 전체 종목 다운로더 v3.0")
     print("="*60)
@@ -385,7 +503,7 @@ def main():
             
             if df is not None and len(df) > 100:  # 최소 100개 이상이어야 성공
                 print(f"\n✅ 성공! {name}으로 {len(df):,}개 종목 다운로드 완료")
-                return process_and_save(df)
+                return process_and_save(df, full=full)
             else:
                 print(f"⚠️  데이터 부족 ({len(df) if df is not None else 0}개)")
                 
@@ -393,8 +511,9 @@ def main():
             print(f"❌ 오류: {e}")
         
         if i < len(methods):
-            print(f"\n⏳ 다음 방법 시도까지 3초 대기...")
-            time.sleep(3)
+            # 각 방법 안에서 이미 재시도/백오프(http_client)를 하므로 짧게만 쉼
+            print(f"\n⏳ 다음 방법 시도까지 {METHOD_RETRY_DELAY}초 대기...")
+            time.sleep(METHOD_RETRY_DELAY)
     
     # 모든 방법 실패
     print("\n" + "="*60)
@@ -415,5 +534,5 @@ def main():
 
 
 if __name__ == '__main__':
-    success = main()
-    exit(0 if success else 1)
\ No newline at end of file
+    success = main(full='--full' in sys.argv[1:])
+    exit(0 if success else 1)
\ No newline at end of file